@@ -3,17 +3,39 @@
 基于Flask的现代化后台管理界面
 """
 
-from flask import Flask, render_template, send_from_directory, redirect
+from flask import Flask, render_template, send_file, redirect, request, abort
 from flask_cors import CORS
+from werkzeug.security import safe_join
 import os
+from pathlib import Path
 
+from src.utils.static_assets import (
+    STATIC_DIR, HTML_CACHE_CONTROL, COMPRESSIBLE_SUFFIXES,
+    asset_url, cache_control_for, guess_content_type, select_precompressed
+)
+
+# 静态文件由下面的 static_files 路由提供（带缓存头与预压缩文件协商）
 app = Flask(__name__, 
             template_folder='templates',
-            static_folder='static')
+            static_folder=None)
 
 # 启用CORS以便与FastAPI通信
 CORS(app)
 
+# 模板中通过 {{ asset_url('css/admin.css') }} 引用带内容哈希的资源
+app.jinja_env.globals['asset_url'] = asset_url
+
+
+@app.after_request
+def add_page_validators(response):
+    """HTML页面：每次向服务器验证，内容未变时返回304"""
+    if response.mimetype == 'text/html' and response.status_code == 200 and not response.direct_passthrough:
+        response.headers['Cache-Control'] = HTML_CACHE_CONTROL
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+
 @app.route('/')
 def index():
     """默认跳转到登录页面"""
@@ -32,7 +54,24 @@ def register():
 @app.route('/static/<path:filename>')
 def static_files(filename):
     """静态文件服务"""
-    return send_from_directory('static', filename)
+    full_path = safe_join(str(STATIC_DIR), filename)
+    if full_path is None or not os.path.isfile(full_path):
+        abort(404)
+
+    path = Path(full_path)
+    send_path, encoding = select_precompressed(path, request.headers.get('Accept-Encoding'))
+    response = send_file(
+        send_path,
+        mimetype=guess_content_type(path, charset=False),  # werkzeug 自动补充charset
+        conditional=True,
+        etag=True,
+    )
+    response.headers['Cache-Control'] = cache_control_for(filename)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+        response.vary.add('Accept-Encoding')
+    return response
 
 # ================= 新增全国城市预测页面 =================
 @app.route('/input')
@@ -0,0 +1,20 @@
+-- 保存城市预测生成的省份热力与监控点数据
+-- 说明：预测时把完整生成结果以压缩形式写入 artifacts 字段，
+--       历史详情直接主键读取并解码，不再重新计算
+
+USE traffic_prediction;
+
+ALTER TABLE city_predictions
+ADD COLUMN artifacts BLOB DEFAULT NULL COMMENT '生成的省份热力与监控点数据（zlib压缩JSON）' AFTER extra_payload;
+
+-- 验证修改结果
+SELECT
+    COLUMN_NAME AS '字段名',
+    COLUMN_TYPE AS '类型',
+    COLUMN_COMMENT AS '注释'
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = 'traffic_prediction'
+  AND TABLE_NAME = 'city_predictions'
+  AND COLUMN_NAME = 'artifacts';
+
+SELECT '✅ city_predictions.artifacts 字段已添加！旧记录的详情会通过预测引擎按原始输入重建。' AS message;
@@ -0,0 +1,45 @@
+-- 城市预测按天汇总表
+-- 说明：写入城市预测记录时按 (用户, 城市, 日期, 拥堵等级) 增量累加，
+--       /city/history/summary 读取汇总行，不再扫描 city_predictions
+--       之后如需修复，可运行: python src/scripts/rebuild_city_rollups.py
+
+USE traffic_prediction;
+
+-- 1. 创建汇总表
+CREATE TABLE IF NOT EXISTS city_prediction_daily_rollups (
+    user_id INT NOT NULL COMMENT '用户ID',
+    city VARCHAR(64) NOT NULL COMMENT '城市',
+    day DATE NOT NULL COMMENT '预测记录创建日期',
+    severity VARCHAR(20) NOT NULL COMMENT '拥堵等级',
+    prediction_count INT NOT NULL DEFAULT 0 COMMENT '预测次数',
+    sum_flow BIGINT NOT NULL DEFAULT 0 COMMENT '小时流量之和',
+    sum_speed DOUBLE NOT NULL DEFAULT 0 COMMENT '平均车速之和',
+    sum_congestion_index DOUBLE NOT NULL DEFAULT 0 COMMENT '拥堵指数之和',
+    PRIMARY KEY (user_id, city, day, severity)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='城市预测按天汇总表';
+
+-- 2. 用现有预测记录回填
+DELETE FROM city_prediction_daily_rollups;
+
+INSERT INTO city_prediction_daily_rollups
+    (user_id, city, day, severity, prediction_count, sum_flow, sum_speed, sum_congestion_index)
+SELECT
+    user_id,
+    city,
+    DATE(created_at),
+    severity,
+    COUNT(*),
+    SUM(flow_per_hour),
+    SUM(avg_speed),
+    SUM(congestion_index)
+FROM city_predictions
+WHERE user_id IS NOT NULL
+GROUP BY user_id, city, DATE(created_at), severity;
+
+-- 3. 验证回填结果（汇总行的次数之和应等于原始记录数）
+SELECT
+    (SELECT COUNT(*) FROM city_predictions WHERE user_id IS NOT NULL) AS '原始记录数',
+    (SELECT COALESCE(SUM(prediction_count), 0) FROM city_prediction_daily_rollups) AS '汇总次数之和',
+    (SELECT COUNT(*) FROM city_prediction_daily_rollups) AS '汇总行数';
+
+SELECT '✅ city_prediction_daily_rollups 汇总表已创建并回填！' AS message;
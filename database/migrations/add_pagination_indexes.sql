@@ -0,0 +1,26 @@
+-- 历史记录游标分页的复合索引
+-- 说明：/history/{sensor_id}、/history/recent、/city/history/records
+--       按 (created_at, id) 倒序游标分页，每页一次索引范围扫描
+
+USE traffic_prediction;
+
+-- 1. 传感器预测记录
+ALTER TABLE predictions
+ADD INDEX idx_predictions_sensor_created (sensor_id, created_at, id),
+ADD INDEX idx_predictions_created (created_at, id);
+
+-- 2. 城市预测记录
+ALTER TABLE city_predictions
+ADD INDEX idx_city_predictions_user_created (user_id, created_at, id);
+
+-- 验证索引
+SELECT
+    TABLE_NAME AS '表名',
+    INDEX_NAME AS '索引名',
+    GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS '字段'
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = 'traffic_prediction'
+  AND INDEX_NAME IN ('idx_predictions_sensor_created', 'idx_predictions_created', 'idx_city_predictions_user_created')
+GROUP BY TABLE_NAME, INDEX_NAME;
+
+SELECT '✅ 游标分页索引已添加！' AS message;
@@ -0,0 +1,19 @@
+-- 系统统计的索引
+-- 说明：/stats/summary 在数据库端按拥堵状态 GROUP BY 计数，
+--       该索引让统计只需扫描索引而不读取整行
+
+USE traffic_prediction;
+
+ALTER TABLE predictions
+ADD INDEX idx_predictions_congestion (congestion_prediction);
+
+-- 验证索引
+SELECT
+    INDEX_NAME AS '索引名',
+    COLUMN_NAME AS '字段'
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = 'traffic_prediction'
+  AND TABLE_NAME = 'predictions'
+  AND INDEX_NAME = 'idx_predictions_congestion';
+
+SELECT '✅ idx_predictions_congestion 索引已添加！' AS message;
@@ -0,0 +1,55 @@
+-- predictions / api_logs 按 created_at 做 RANGE 分区
+-- 说明：MySQL 要求分区列包含在主键中，因此主键改为 (id, created_at)；
+--       TIMESTAMP 列按 UNIX_TIMESTAMP(created_at) 分区。
+--       初始只建两个分区：p_history（当前周期之前的全部数据）和 p_future（MAXVALUE），
+--       之后由 src/scripts/maintain_partitions.py 从 p_future 拆分出未来分区，
+--       并整分区删除过期数据（p_history 在全部过期后一并删除）。
+--       执行后将 configs/database.yaml 中对应表的 partition.enabled 设为 true。
+-- 注意：转换分区会重建整张表，请在低峰期执行。
+
+USE traffic_prediction;
+
+-- 1. predictions：按月分区
+ALTER TABLE predictions
+MODIFY COLUMN created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+DROP PRIMARY KEY,
+ADD PRIMARY KEY (id, created_at);
+
+SET @boundary = DATE_FORMAT(CURRENT_DATE, '%Y-%m-01 00:00:00');
+SET @sql = CONCAT(
+    'ALTER TABLE predictions PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (',
+    'PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP(''', @boundary, ''')), ',
+    'PARTITION p_future VALUES LESS THAN MAXVALUE)'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 2. api_logs：按天分区
+ALTER TABLE api_logs
+MODIFY COLUMN created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+DROP PRIMARY KEY,
+ADD PRIMARY KEY (id, created_at);
+
+SET @boundary = DATE_FORMAT(CURRENT_DATE, '%Y-%m-%d 00:00:00');
+SET @sql = CONCAT(
+    'ALTER TABLE api_logs PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (',
+    'PARTITION p_history VALUES LESS THAN (UNIX_TIMESTAMP(''', @boundary, ''')), ',
+    'PARTITION p_future VALUES LESS THAN MAXVALUE)'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 验证分区
+SELECT
+    TABLE_NAME AS '表名',
+    PARTITION_NAME AS '分区',
+    PARTITION_DESCRIPTION AS '上界',
+    TABLE_ROWS AS '行数（估算）'
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = 'traffic_prediction'
+  AND TABLE_NAME IN ('predictions', 'api_logs')
+ORDER BY TABLE_NAME, PARTITION_ORDINAL_POSITION;
+
+SELECT '✅ predictions / api_logs 已按时间分区！请运行 python src/scripts/maintain_partitions.py 预建未来分区' AS message;
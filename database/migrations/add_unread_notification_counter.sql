@@ -0,0 +1,33 @@
+-- 消息中心未读计数器
+-- 说明：users.unread_notification_count 在创建通知/标记已读时增减，
+--       /message/unread-count 与消息中心不再对 user_notifications 做 COUNT；
+--       (user_id, send_time, id) 索引用于按用户取最近的通知
+
+USE traffic_prediction;
+
+-- 1. 添加计数器字段
+ALTER TABLE users
+ADD COLUMN unread_notification_count INT NOT NULL DEFAULT 0 COMMENT '未读通知数（创建通知/标记已读时增减）' AFTER last_prediction_time;
+
+-- 2. 回填现有未读数
+UPDATE users u
+SET u.unread_notification_count = (
+    SELECT COUNT(*)
+    FROM user_notifications n
+    WHERE n.user_id = u.id AND n.is_read = FALSE
+);
+
+-- 3. 消息中心索引
+ALTER TABLE user_notifications
+ADD INDEX idx_user_notifications_user_send (user_id, send_time, id);
+
+-- 验证
+SELECT
+    id,
+    username,
+    unread_notification_count AS '未读通知数'
+FROM users
+ORDER BY unread_notification_count DESC
+LIMIT 10;
+
+SELECT '✅ 未读通知计数器已添加并回填！' AS message;
@@ -0,0 +1,54 @@
+-- 增量维护的用户预测统计
+-- 说明：写入城市预测记录时在同一事务内更新以下统计，
+--       个人中心不再对 city_predictions 做 COUNT 扫描
+--   1. users.last_prediction_time：最后预测时间
+--   2. user_city_prediction_counts：每个用户按城市的预测次数
+
+USE traffic_prediction;
+
+-- 1. 用户表添加最后预测时间
+ALTER TABLE users
+ADD COLUMN last_prediction_time DATETIME DEFAULT NULL COMMENT '最后预测时间' AFTER prediction_count;
+
+-- 2. 创建按城市的预测次数表
+CREATE TABLE IF NOT EXISTS user_city_prediction_counts (
+    user_id INT NOT NULL COMMENT '用户ID',
+    city VARCHAR(64) NOT NULL COMMENT '城市',
+    prediction_count INT NOT NULL DEFAULT 0 COMMENT '预测次数',
+    last_prediction_time DATETIME DEFAULT NULL COMMENT '最后预测时间',
+    PRIMARY KEY (user_id, city)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户按城市的预测次数';
+
+-- 3. 用现有预测记录回填统计
+INSERT INTO user_city_prediction_counts (user_id, city, prediction_count, last_prediction_time)
+SELECT user_id, city, COUNT(*), MAX(created_at)
+FROM city_predictions
+WHERE user_id IS NOT NULL
+GROUP BY user_id, city
+ON DUPLICATE KEY UPDATE
+    prediction_count = VALUES(prediction_count),
+    last_prediction_time = VALUES(last_prediction_time);
+
+UPDATE users u
+LEFT JOIN (
+    SELECT user_id, COUNT(*) AS cnt, MAX(created_at) AS last_time
+    FROM city_predictions
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+) s ON s.user_id = u.id
+SET u.prediction_count = COALESCE(s.cnt, 0),
+    u.last_prediction_time = s.last_time;
+
+-- 4. 验证回填结果
+SELECT
+    u.id,
+    u.username,
+    u.prediction_count,
+    u.last_prediction_time,
+    COUNT(c.city) AS city_count
+FROM users u
+LEFT JOIN user_city_prediction_counts c ON c.user_id = u.id
+GROUP BY u.id, u.username, u.prediction_count, u.last_prediction_time
+ORDER BY u.prediction_count DESC;
+
+SELECT '✅ 用户预测统计已创建并回填！之后的预测会在写入记录时同步更新统计。' AS message;
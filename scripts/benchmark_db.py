@@ -0,0 +1,245 @@
+"""数据库与API基准测试（SQLite本地模式，无需MySQL）
+
+在本地SQLite文件上建表、灌入模拟数据，测量：
+  - 批量写入：城市预测记录（含用户统计/按天汇总）、传感器预测记录
+  - 历史查询：游标分页、汇总统计、最近预测
+  - 系统统计：数据库汇总 vs 缓存
+  - 认证缓存：冷/热令牌验证
+  - API：通过TestClient请求主要接口
+
+用法: python scripts/benchmark_db.py [数据库文件] [城市预测条数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+DB_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+CITY_RECORDS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+SENSOR_RECORDS = 50000
+USER_COUNT = 20
+BATCH_SIZE = 500
+
+# 必须在导入数据库模块之前设置
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = DB_PATH
+os.environ.setdefault('STATS_REFRESH_INTERVAL', '0')
+os.environ.setdefault('POOL_STATS_INTERVAL', '0')
+
+from sqlalchemy import insert
+
+from src.models_db.base import DatabaseConnection
+from src.models_db.prediction import Prediction
+from src.models_db.user import User
+from src.utils.db_utils import get_db_manager, get_session
+from src.utils.auth import create_access_token
+from src.utils.city_store import save_city_predictions, get_city_prediction_page, get_city_history_summary
+from src.utils.prediction_store import get_recent_prediction_page, get_sensor_prediction_page
+from src.utils.stats_store import compute_system_stats, get_system_stats
+from src.utils.token_cache import invalidate_token
+from src.utils.user_cache import invalidate_user
+from src.api.dependencies import authenticate
+
+CITIES = ['北京', '上海', '广州', '深圳', '杭州', '成都', '武汉', '西安']
+SEVERITIES = ['畅通', '缓行', '拥堵', '严重拥堵']
+CONGESTION = ['畅通', '正常', '拥堵', '严重拥堵']
+
+
+def measure(fn, repeat: int = 1):
+    """执行repeat次，返回(平均毫秒, P95毫秒, 最后一次结果)"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    p95 = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+    return sum(durations) / len(durations), p95, result
+
+
+def report(name: str, avg_ms: float, p95_ms: float, extra: str = ''):
+    print(f"  {name:<28} 平均 {avg_ms:9.3f} ms   P95 {p95_ms:9.3f} ms  {extra}")
+
+
+def seed_users():
+    session = get_session()
+    try:
+        users = [
+            User(username=f'bench_{i}', email=f'bench_{i}@example.com',
+                 password_hash='x', role='admin' if i == 0 else 'user', status=1)
+            for i in range(USER_COUNT)
+        ]
+        session.add_all(users)
+        session.commit()
+        return [user.id for user in users]
+    finally:
+        session.close()
+
+
+def city_record(rng: random.Random, user_id: int, now: datetime):
+    return {
+        'user_id': user_id,
+        'model_type': 'lstm',
+        'city': rng.choice(CITIES),
+        'prediction_date': now.date(),
+        'time_range': '08:00-09:00',
+        'weather': '晴',
+        'district': None,
+        'other': None,
+        'flow_per_hour': rng.randint(500, 6000),
+        'avg_speed': rng.uniform(10, 80),
+        'congestion_index': rng.uniform(1, 10),
+        'severity': rng.choice(SEVERITIES),
+        'confidence': rng.uniform(0.6, 0.99),
+        'index_score': rng.uniform(0, 100),
+        'created_at': now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+    }
+
+
+def bench_writes(user_ids):
+    print("\n[1] 批量写入")
+    rng = random.Random(42)
+    now = datetime.now()
+
+    start = time.perf_counter()
+    for offset in range(0, CITY_RECORDS, BATCH_SIZE):
+        batch = [city_record(rng, rng.choice(user_ids), now) for _ in range(min(BATCH_SIZE, CITY_RECORDS - offset))]
+        save_city_predictions(batch)
+    elapsed = time.perf_counter() - start
+    print(f"  城市预测（含统计/汇总）      {CITY_RECORDS} 条，{elapsed:.2f}s，{CITY_RECORDS / elapsed:,.0f} 条/秒")
+
+    rows = [
+        {
+            'sensor_id': rng.randint(0, 306),
+            'prediction_time': now,
+            'target_time': now,
+            'flow_prediction': rng.uniform(0, 500),
+            'density_prediction': rng.uniform(0, 1),
+            'congestion_prediction': rng.choice(CONGESTION),
+            'confidence': rng.uniform(0.6, 0.99),
+            'model_version': 'lstm_v1.0',
+            'created_at': now - timedelta(seconds=rng.randint(0, 90 * 86400)),
+        }
+        for _ in range(SENSOR_RECORDS)
+    ]
+    session = get_session()
+    try:
+        start = time.perf_counter()
+        for offset in range(0, len(rows), 5000):
+            session.execute(insert(Prediction), rows[offset:offset + 5000])
+        session.commit()
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    print(f"  传感器预测                    {SENSOR_RECORDS} 条，{elapsed:.2f}s，{SENSOR_RECORDS / elapsed:,.0f} 条/秒")
+
+
+def bench_history(user_ids):
+    print("\n[2] 历史查询")
+    user_id = user_ids[1]
+
+    def walk_pages():
+        pages, cursor = 0, None
+        while True:
+            _, cursor = get_city_prediction_page(user_id, limit=100, cursor=cursor)
+            pages += 1
+            if not cursor:
+                return pages
+
+    avg, p95, pages = measure(walk_pages, 5)
+    report('城市历史完整翻页', avg, p95, f'({pages} 页)')
+    avg, p95, _ = measure(lambda: get_city_prediction_page(user_id, limit=100, range_days=7, city='北京'), 50)
+    report('城市历史首页（7天+城市）', avg, p95)
+    avg, p95, _ = measure(lambda: get_city_history_summary(user_id), 50)
+    report('城市历史汇总（全部）', avg, p95)
+    avg, p95, _ = measure(lambda: get_city_history_summary(user_id, range_days=30), 50)
+    report('城市历史汇总（30天）', avg, p95)
+    avg, p95, _ = measure(lambda: get_recent_prediction_page(50), 50)
+    report('最近预测首页', avg, p95)
+    avg, p95, _ = measure(lambda: get_sensor_prediction_page('sensor_42', 100), 50)
+    report('传感器预测首页', avg, p95)
+
+
+def bench_stats():
+    print("\n[3] 系统统计")
+    avg, p95, _ = measure(compute_system_stats, 20)
+    report('数据库汇总', avg, p95)
+    get_system_stats()
+    avg, p95, _ = measure(get_system_stats, 1000)
+    report('缓存命中', avg, p95)
+
+
+def bench_auth(user_ids):
+    print("\n[4] 认证")
+    token = create_access_token({'user_id': user_ids[1]})
+
+    def cold():
+        invalidate_token(token)
+        invalidate_user(user_ids[1])
+        return authenticate(token)
+
+    avg, p95, _ = measure(cold, 200)
+    report('冷缓存（验签+查库）', avg, p95)
+    avg, p95, _ = measure(lambda: authenticate(token), 5000)
+    report('热缓存', avg, p95)
+
+
+def bench_api(user_ids):
+    print("\n[5] API（TestClient）")
+    from fastapi.testclient import TestClient
+    from src.api.main import app
+
+    token = create_access_token({'user_id': user_ids[1]})
+    admin_token = create_access_token({'user_id': user_ids[0]})
+    endpoints = [
+        ('/auth/current', {'token': token}),
+        ('/city/history/records', {'token': token, 'limit': 100}),
+        ('/city/history/summary', {'token': token}),
+        ('/history/recent', {'limit': 50}),
+        ('/stats/summary', {}),
+    ]
+    with TestClient(app) as client:
+        for path, params in endpoints:
+            response = client.get(path, params=params)
+            if response.status_code != 200:
+                print(f"  [WARN] {path} 返回 {response.status_code}: {response.text[:200]}")
+                continue
+            avg, p95, _ = measure(lambda: client.get(path, params=params), 100)
+            report(path, avg, p95)
+
+        queries = client.get('/admin/db/queries', params={'token': admin_token, 'top': 5}).json()
+        print("\n  耗时最多的SQL:")
+        for row in queries.get('statements', []):
+            print(f"    {row['total_ms']:10.1f} ms  x{row['count']:<6} {row['statement'][:90]}")
+
+
+def main():
+    print("=" * 70)
+    print(f"数据库基准测试（SQLite: {DB_PATH}）")
+    print("=" * 70)
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+    get_db_manager()
+    DatabaseConnection().create_all_tables()
+    user_ids = seed_users()
+
+    bench_writes(user_ids)
+    bench_history(user_ids)
+    bench_stats()
+    bench_auth(user_ids)
+    bench_api(user_ids)
+
+    print("\n✅ 基准测试完成")
+
+
+if __name__ == "__main__":
+    main()
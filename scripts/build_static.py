@@ -0,0 +1,187 @@
+"""静态资源构建：内容哈希文件名 + 预压缩 + 清单
+
+  static/css/admin.css  ->  static/dist/css/admin.3f2a1b9c.css
+                            static/dist/css/admin.3f2a1b9c.css.gz
+                            static/dist/css/admin.3f2a1b9c.css.br（已安装brotli时）
+  static/dist/manifest.json 记录原路径到带哈希文件的映射，模板通过 asset_url() 引用
+
+可压缩的原文件（如 static/data/maps/china.json，页面脚本按原路径请求）同样在旁边生成 .gz/.br。
+头像目录（内容寻址，运行时写入）与 dist/ 本身不参与构建。
+重复执行只处理有变化的文件，并删除已不再对应任何源文件的旧产物。
+
+用法: python scripts/build_static.py [--no-originals]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.static_assets import COMPRESSIBLE_SUFFIXES, DIST_DIR, DIST_DIRNAME, ENCODINGS, MANIFEST_PATH, STATIC_DIR
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只生成 .gz
+    brotli = None
+
+# 不参与构建的目录（相对static/）
+EXCLUDED_DIRS = {DIST_DIRNAME, 'avatars'}
+
+# 小于该大小的文件不压缩（压缩收益抵不过额外请求头开销）
+MIN_COMPRESS_BYTES = 512
+
+HASH_LENGTH = 8
+
+PRECOMPRESSED_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+
+def iter_sources():
+    """static/ 下需要构建的源文件（相对路径）"""
+    for root, dirs, files in os.walk(STATIC_DIR):
+        rel_root = Path(root).relative_to(STATIC_DIR)
+        if rel_root == Path('.'):
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.startswith('.') or name.endswith(PRECOMPRESSED_SUFFIXES):
+                continue
+            yield (rel_root / name).as_posix()
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprinted_name(rel_path: str, digest: str) -> str:
+    path = Path(rel_path)
+    return (path.parent / f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}").as_posix()
+
+
+def write_precompressed(path: Path) -> list:
+    """生成 .gz/.br（已是最新时跳过），返回生成的文件名"""
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < MIN_COMPRESS_BYTES:
+        return []
+
+    data = None
+    written = []
+    source_mtime = path.stat().st_mtime
+    for encoding, suffix in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        target = path.with_name(path.name + suffix)
+        if target.exists() and target.stat().st_mtime >= source_mtime:
+            written.append(target.name)
+            continue
+        if data is None:
+            data = path.read_bytes()
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        # 压缩后反而更大时不生成
+        if len(compressed) >= len(data):
+            if target.exists():
+                target.unlink()
+            continue
+        target.write_bytes(compressed)
+        written.append(target.name)
+    return written
+
+
+def prune_dist(keep: set) -> int:
+    """删除dist中不再属于当前构建的文件"""
+    removed = 0
+    for path in DIST_DIR.rglob('*'):
+        if not path.is_file() or path == MANIFEST_PATH:
+            continue
+        rel = path.relative_to(DIST_DIR).as_posix()
+        base = rel
+        for suffix in PRECOMPRESSED_SUFFIXES:
+            if rel.endswith(suffix):
+                base = rel[:-len(suffix)]
+        if base not in keep:
+            path.unlink()
+            removed += 1
+    for directory in sorted(DIST_DIR.rglob('*'), reverse=True):
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
+
+
+def build(compress_originals: bool = True) -> dict:
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    assets = {}
+    raw_bytes = 0
+    compressed_count = 0
+
+    for rel_path in sorted(iter_sources()):
+        source = STATIC_DIR / rel_path
+        digest = file_digest(source)
+        target_rel = fingerprinted_name(rel_path, digest)
+        target = DIST_DIR / target_rel
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+
+        variants = write_precompressed(target)
+        if compress_originals:
+            write_precompressed(source)
+
+        size = source.stat().st_size
+        raw_bytes += size
+        compressed_count += bool(variants)
+        assets[rel_path] = {
+            'file': target_rel,
+            'sha256': digest,
+            'size': size,
+            'encodings': [name.rsplit('.', 1)[-1] for name in variants],
+        }
+
+    removed = prune_dist({entry['file'] for entry in assets.values()})
+
+    manifest = {'generated_at': datetime.now().isoformat(timespec='seconds'), 'assets': assets}
+    tmp_path = MANIFEST_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+    return {
+        'assets': len(assets),
+        'bytes': raw_bytes,
+        'compressed': compressed_count,
+        'removed': removed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建带内容哈希的静态资源')
+    parser.add_argument('--no-originals', action='store_true', help='不为原路径文件生成预压缩版本')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("静态资源构建")
+    print("=" * 60)
+    if brotli is None:
+        print("[WARN] 未安装brotli，只生成 .gz（pip install Brotli）")
+
+    result = build(compress_originals=not args.no_originals)
+
+    print(f"✅ {result['assets']} 个文件（{result['bytes'] / 1024:.1f} KB），"
+          f"{result['compressed']} 个已预压缩，清理旧文件 {result['removed']} 个")
+    print(f"📄 清单: {MANIFEST_PATH.relative_to(project_root)}")
+
+
+if __name__ == "__main__":
+    main()
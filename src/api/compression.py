@@ -0,0 +1,174 @@
+"""
+响应压缩中间件
+- 按 Accept-Encoding 协商：br（安装了 brotli 时）优先于 gzip，q=0 的编码不使用
+- 小于 minimum_size 的响应、图片等已压缩类型、已带 Content-Encoding 的响应
+  （如预压缩的静态文件）、206 分段响应原样发送
+- 大响应体在线程池中压缩，不阻塞事件循环
+- 每个请求的原始/发送字节数、序列化与压缩耗时计入 response_metrics
+
+流式响应（StreamingResponse）不压缩，只统计字节数。
+"""
+
+import gzip
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.api.responses import SERIALIZE_MS_SCOPE_KEY
+from src.utils.response_metrics import response_metrics
+from src.utils.static_assets import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只使用gzip
+    brotli = None
+
+DEFAULT_MINIMUM_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 4
+
+# 超过该大小的响应体放到线程池中压缩
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+# 不压缩的内容类型（本身已压缩或是事件流）
+EXCLUDED_CONTENT_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+    'text/event-stream',
+)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """选择响应编码：br > gzip，客户端都不接受时返回None"""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def _endpoint_name(scope) -> str:
+    """路由的路径模板（同一接口不同参数归为一类）"""
+    route = scope.get('route')
+    path_format = getattr(route, 'path_format', None) or getattr(route, 'path', None)
+    if path_format:
+        return f"{scope.get('method', 'GET')} {path_format}"
+    # 挂载的子应用（如 /static）按挂载点汇总
+    if scope.get('root_path') and scope.get('endpoint') is not None:
+        return f"{scope.get('method', 'GET')} {scope['root_path']}/*"
+    return f"{scope.get('method', 'GET')} {scope.get('path', '')}"
+
+
+class CompressionMiddleware:
+    """协商压缩 + 响应体统计"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        brotli_quality: int = DEFAULT_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding'))
+        start_message = None
+        passthrough = False
+        streaming = False
+        raw_bytes = 0
+        sent_bytes = 0
+        compress_ms = 0.0
+        used_encoding = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough, streaming, raw_bytes, sent_bytes, compress_ms, used_encoding
+
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                content_type = headers.get('content-type', '').lower()
+                passthrough = (
+                    'content-encoding' in headers
+                    or message['status'] in (204, 206, 304)
+                    or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+                )
+                if passthrough:
+                    used_encoding = headers.get('content-encoding')
+                    await send(message)
+                else:
+                    # 等到响应体确定是否压缩后再发送响应头
+                    start_message = message
+                return
+
+            if message['type'] != 'http.response.body':
+                # http.response.pathsend 等扩展消息：不压缩，先补发响应头
+                if start_message is not None and not (passthrough or streaming):
+                    streaming = True
+                    await send(start_message)
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            raw_bytes += len(body)
+
+            if passthrough or streaming:
+                sent_bytes += len(body)
+                await send(message)
+                return
+
+            if more_body:
+                # 流式响应：原样发送
+                streaming = True
+                sent_bytes += len(body)
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message['headers'])
+            if encoding and len(body) >= self.minimum_size:
+                started = time.perf_counter()
+                if len(body) >= THREAD_MINIMUM_SIZE:
+                    compressed = await run_in_threadpool(self.compress, body, encoding)
+                else:
+                    compressed = self.compress(body, encoding)
+                compress_ms = (time.perf_counter() - started) * 1000
+                headers.add_vary_header('Accept-Encoding')
+                if len(compressed) < len(body):
+                    headers['Content-Encoding'] = encoding
+                    headers['Content-Length'] = str(len(compressed))
+                    body = compressed
+                    used_encoding = encoding
+            elif len(body) >= self.minimum_size:
+                headers.add_vary_header('Accept-Encoding')
+
+            sent_bytes += len(body)
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+        await self.app(scope, receive, send_wrapper)
+
+        if raw_bytes or sent_bytes:
+            response_metrics.record(
+                _endpoint_name(scope),
+                raw_bytes=raw_bytes,
+                sent_bytes=sent_bytes,
+                encoding=used_encoding,
+                serialize_ms=scope.get(SERIALIZE_MS_SCOPE_KEY),
+                compress_ms=compress_ms,
+            )
@@ -0,0 +1,65 @@
+"""
+API公共依赖
+认证：令牌payload和用户资料都走进程内缓存，稳态下认证不访问数据库
+"""
+
+from typing import Dict
+
+from fastapi import HTTPException, Query
+
+from src.utils.token_cache import verify_token
+from src.utils.user_cache import get_user_profile
+
+
+def authenticate(token: str) -> Dict:
+    """
+    验证令牌并返回当前用户资料快照
+
+    Raises:
+        HTTPException: 401 令牌无效 / 404 用户不存在 / 403 账户已禁用
+    """
+    user_id = authenticate_user_id(token)
+
+    profile = get_user_profile(user_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    if profile.get('status') != 1:
+        raise HTTPException(status_code=403, detail="账户已被禁用")
+
+    return profile
+
+
+def authenticate_user_id(token: str) -> int:
+    """
+    只验证令牌，返回其中的user_id（不读取用户资料）
+
+    Raises:
+        HTTPException: 401 令牌无效
+    """
+    payload = verify_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="令牌无效或已过期")
+
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="令牌数据无效")
+
+    return user_id
+
+
+def get_current_user_profile(token: str = Query(..., description="用户token")) -> Dict:
+    """FastAPI依赖：当前用户资料快照"""
+    return authenticate(token)
+
+
+def get_current_user_id(token: str = Query(..., description="用户token")) -> int:
+    """FastAPI依赖：当前用户ID"""
+    return authenticate_user_id(token)
+
+
+def get_current_admin(token: str = Query(..., description="管理员token")) -> Dict:
+    """FastAPI依赖：当前管理员资料快照（非管理员返回403）"""
+    profile = authenticate(token)
+    if profile.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="需要管理员权限")
+    return profile
@@ -0,0 +1,74 @@
+"""
+快速JSON响应
+- 安装了 orjson 时用它序列化（原生支持 numpy 数组/标量、datetime、date、UUID），
+  否则回退到标准库 json（通过 default 处理同样的类型）
+- 序列化耗时写入 ASGI scope，由压缩中间件计入接口统计
+
+大响应的接口直接返回 FastJSONResponse，可跳过 FastAPI 的 jsonable_encoder 遍历。
+"""
+
+import json
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+# 序列化耗时（毫秒）在 scope 中的键
+SERIALIZE_MS_SCOPE_KEY = 'response.serialize_ms'
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any):
+    """orjson/json 不能直接序列化的类型"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date, dt_time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """序列化为UTF-8 JSON字节串（紧凑格式，不转义中文）"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # 非连续/非原生dtype的numpy数组等orjson不支持的情况，回退到标准库
+            pass
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 序列化的JSON响应，并记录序列化耗时"""
+
+    serialize_ms: float = 0.0
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = dumps_json(content)
+        self.serialize_ms = (time.perf_counter() - start) * 1000
+        return body
+
+    async def __call__(self, scope, receive, send) -> None:
+        scope[SERIALIZE_MS_SCOPE_KEY] = self.serialize_ms
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,112 @@
+"""
+系统管理相关路由（仅管理员）
+"""
+
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from src.api.dependencies import get_current_admin
+from src.models_db.query_stats import query_monitor
+from src.utils.notification_fanout import start_fanout, get_fanout_job, list_fanout_jobs
+from src.utils.pool_monitor import get_pool_stats, reset_pool_stats
+from src.utils.response_metrics import response_metrics
+
+router = APIRouter(prefix="/admin", tags=["系统管理"])
+
+
+class BroadcastRequest(BaseModel):
+    """全员通知请求"""
+    title: str
+    content: str
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats(reset: bool = False, admin: Dict = Depends(get_current_admin)):
+    """
+    查看数据库连接池状态与累计统计
+
+    - 当前：连接池大小、已借出/空闲连接、溢出连接
+    - 累计：取连接次数、超时次数、等待时间（平均/P95/最大）、连接存活时长
+    - reset=true 时返回后清空累计统计
+    """
+    stats = get_pool_stats()
+    if reset:
+        reset_pool_stats()
+    return stats
+
+
+@router.get("/db/queries")
+async def get_db_query_stats(
+    top: int = Query(20, ge=1, le=200, description="返回前N类语句"),
+    order_by: str = Query("total_ms", description="排序指标：total_ms/avg_ms/p95_ms/max_ms/count"),
+    reset: bool = False,
+    admin: Dict = Depends(get_current_admin)
+):
+    """
+    查看SQL语句耗时统计与最近的慢查询
+
+    - statements：按归一化语句汇总的次数、错误数、平均/P95/最大耗时与延迟直方图
+    - slow_queries：超过 monitoring.performance.slow_query_threshold 的最近语句（参数已脱敏）
+    - reset=true 时返回后清空统计
+    """
+    try:
+        report = query_monitor.report(limit=top, order_by=order_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if reset:
+        query_monitor.reset()
+    return report
+
+
+@router.get("/api/responses")
+async def get_api_response_stats(
+    top: int = Query(20, ge=1, le=200, description="返回前N个接口"),
+    order_by: str = Query("raw_bytes", description="排序指标：raw_bytes/sent_bytes/saved_bytes/count/avg_serialize_ms/avg_raw_bytes"),
+    reset: bool = False,
+    admin: Dict = Depends(get_current_admin)
+):
+    """
+    查看各接口响应体大小、压缩率与JSON序列化耗时
+
+    - raw_bytes/sent_bytes：压缩前/实际发送的字节数
+    - encodings：各编码（br/gzip/identity）的响应次数
+    - avg_serialize_ms：FastJSONResponse 序列化耗时
+    - reset=true 时返回后清空统计
+    """
+    try:
+        report = response_metrics.report(limit=top, order_by=order_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if reset:
+        response_metrics.reset()
+    return report
+
+
+@router.post("/notifications/broadcast")
+async def broadcast_notification(request: BroadcastRequest, admin: Dict = Depends(get_current_admin)):
+    """
+    向全部正常用户下发通知（后台分块写入，立即返回任务ID）
+    """
+    job = start_fanout(request.title, request.content)
+    return {"success": True, "message": "通知下发任务已提交", "data": job}
+
+
+@router.get("/notifications/jobs")
+async def get_broadcast_jobs(admin: Dict = Depends(get_current_admin)):
+    """
+    最近的通知下发任务
+    """
+    return {"success": True, "data": list_fanout_jobs()}
+
+
+@router.get("/notifications/jobs/{job_id}")
+async def get_broadcast_job(job_id: str, admin: Dict = Depends(get_current_admin)):
+    """
+    查询通知下发任务进度
+    """
+    job = get_fanout_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return {"success": True, "data": job}
@@ -19,6 +19,9 @@ from src.utils.auth import (
     validate_email,
     validate_username
 )
+from src.utils.token_cache import verify_token
+from src.utils.user_cache import invalidate_user
+from src.api.dependencies import authenticate
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 
@@ -116,7 +119,7 @@ def register(request: RegisterRequest):
         
         # 创建欢迎通知（直接使用当前session，避免依赖外部管理器）
         try:
-            from src.models_db.message import UserNotification
+            from src.utils.message_store import insert_notifications
             import logging
             
             logger = logging.getLogger(__name__)
@@ -152,26 +155,21 @@ def register(request: RegisterRequest):
 
 智能交通流预测系统团队"""
             
-            # 直接在当前session中创建通知
-            welcome_notification = UserNotification(
-                user_id=new_user.id,
-                title="🎉 欢迎加入智能交通流预测系统！",
-                content=notification_content,
-                send_time=datetime.now(),
-                is_read=False
-            )
-            
-            session.add(welcome_notification)
+            # 直接在当前session中创建通知（同一事务内增加未读计数）
+            welcome_title = "🎉 欢迎加入智能交通流预测系统！"
+            send_time = datetime.now()
+            insert_notifications(session, [{
+                'user_id': new_user.id,
+                'title': welcome_title,
+                'content': notification_content,
+                'send_time': send_time,
+            }])
             session.commit()
-            session.refresh(welcome_notification)
-            
-            notification_id = welcome_notification.id
             
-            logger.info(f"[欢迎通知] ✅ 成功创建通知 ID: {notification_id}")
+            logger.info(f"[欢迎通知] ✅ 成功创建通知 - 用户ID: {new_user.id}")
             print(f"✅ [欢迎通知] 成功！用户 {new_user.username} (ID: {new_user.id}) 的欢迎通知已创建")
-            print(f"   通知ID: {notification_id}")
-            print(f"   标题: {welcome_notification.title}")
-            print(f"   发送时间: {welcome_notification.send_time}")
+            print(f"   标题: {welcome_title}")
+            print(f"   发送时间: {send_time}")
             
         except Exception as e:
             # 通知发送失败不影响注册流程，但要详细记录错误
@@ -243,6 +241,7 @@ def login(request: LoginRequest, http_request: Request):
         user.last_login_ip = http_request.client.host if http_request.client else None
         user.login_count = (user.login_count or 0) + 1
         session.commit()
+        invalidate_user(user.id)
         
         # 生成JWT令牌
         token_data = {
@@ -273,38 +272,15 @@ def get_current_user(token: str):
     获取当前用户信息
     
     - **token**: JWT令牌（通过查询参数传递）
-    """
-    from src.utils.auth import decode_access_token
-    
-    # 解码令牌
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="令牌无效或已过期")
-    
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="令牌数据无效")
-    
-    session = get_session()
     
+    令牌和用户资料走进程内缓存，命中时不查询数据库
+    """
     try:
-        # 查找用户
-        user = session.query(User).filter(User.id == user_id).first()
-        
-        if not user:
-            raise HTTPException(status_code=404, detail="用户不存在")
-        
-        if user.status != 1:
-            raise HTTPException(status_code=403, detail="账户已被禁用")
-        
-        return UserResponse(**user.to_dict())
-        
+        return UserResponse(**authenticate(token))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取用户信息失败: {str(e)}")
-    finally:
-        session.close()
 
 
 @router.post("/logout")
@@ -327,9 +303,7 @@ def check_auth(token: str):
     
     - **token**: JWT令牌
     """
-    from src.utils.auth import decode_access_token
-    
-    payload = decode_access_token(token)
+    payload = verify_token(token)
     
     if payload:
         return {
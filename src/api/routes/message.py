@@ -2,13 +2,15 @@
 消息中心相关路由
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from src.utils.db_utils import get_db_manager
-from src.api.routes.auth import get_current_user
+from src.utils.async_db import get_async_db_manager
+from src.utils.message_store import make_etag, etag_matches
+from src.utils.notification_fanout import start_fanout
+from src.api.dependencies import get_current_user_profile, get_current_admin
 
 router = APIRouter(prefix="/message", tags=["消息中心"])
 
@@ -38,30 +40,51 @@ class MessageCenterResponse(BaseModel):
     unread_count: int
 
 
+class AnnouncementCreateRequest(BaseModel):
+    """发布公告请求"""
+    title: str
+    content: str
+    publish_time: Optional[datetime] = None
+    notify_users: bool = False  # 同时向全部用户下发通知（后台任务）
+
+
+# 消息中心返回的公告/通知条数
+MESSAGE_CENTER_LIMIT = 50
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
 @router.get("/center", response_model=MessageCenterResponse)
-async def get_message_center(token: str = Query(..., description="用户token")):
+async def get_message_center(
+    request: Request,
+    response: Response,
+    user: Dict[str, Any] = Depends(get_current_user_profile)
+):
     """
     获取消息中心数据（系统公告 + 用户通知）
+    
+    公告读缓存；先用一次轻量查询（未读数 + 最新通知ID）生成ETag，
+    与 If-None-Match 相同时直接返回304，否则一条查询取出通知与未读数。
     """
     try:
-        # 验证用户token
-        user_info = get_current_user(token)
-        if not user_info:
-            raise HTTPException(status_code=401, detail="未授权访问")
-        
-        db = get_db_manager()
+        db = get_async_db_manager()
         
-        # 获取系统公告
-        announcements = db.get_system_announcements(limit=50)
+        announcement_entry = await db.get_announcement_entry()
+        unread_count, latest_id = await db.get_notification_state(user_id=user['id'])
+        etag = make_etag('center', user['id'], announcement_entry['version'], unread_count, latest_id)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return _not_modified(etag)
         
-        # 获取用户通知
-        notifications = db.get_user_notifications(user_id=user_info.id, limit=50)
-        
-        # 获取未读通知数量
-        unread_count = db.get_unread_notification_count(user_id=user_info.id)
+        notifications, unread_count = await db.get_user_notifications_with_unread(
+            user_id=user['id'], limit=MESSAGE_CENTER_LIMIT
+        )
         
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
         return {
-            "announcements": announcements,
+            "announcements": announcement_entry['announcements'][:MESSAGE_CENTER_LIMIT],
             "notifications": notifications,
             "unread_count": unread_count
         }
@@ -74,32 +97,72 @@ async def get_message_center(token: str = Query(..., description="用户token"))
 @router.get("/announcements")
 async def get_announcements(limit: int = Query(50, description="返回数量")):
     """
-    获取系统公告列表
+    获取系统公告列表（读进程内缓存，发布/停用公告时失效）
     """
     try:
-        db = get_db_manager()
-        announcements = db.get_system_announcements(limit=limit)
+        db = get_async_db_manager()
+        announcements = await db.get_system_announcements(limit=limit)
         return {"success": True, "data": announcements}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取公告失败: {str(e)}")
 
 
+@router.post("/announcements")
+async def publish_announcement(
+    request: AnnouncementCreateRequest,
+    admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    发布系统公告（仅管理员）
+    
+    notify_users=true 时同时提交全员通知下发任务，进度见 /admin/notifications/jobs/{job_id}
+    """
+    try:
+        db = get_async_db_manager()
+        announcement = await db.publish_announcement(
+            title=request.title,
+            content=request.content,
+            publish_time=request.publish_time
+        )
+        result = {"success": True, "message": "公告已发布", "data": announcement}
+        if request.notify_users:
+            result["fanout_job"] = start_fanout(request.title, request.content)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"发布公告失败: {str(e)}")
+
+
+@router.post("/announcements/{announcement_id}/deactivate")
+async def deactivate_announcement(
+    announcement_id: int,
+    admin: Dict[str, Any] = Depends(get_current_admin)
+):
+    """
+    停用系统公告（仅管理员）
+    """
+    try:
+        db = get_async_db_manager()
+        success = await db.deactivate_announcement(announcement_id)
+        if not success:
+            raise HTTPException(status_code=404, detail="公告不存在")
+        return {"success": True, "message": "公告已停用"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"停用公告失败: {str(e)}")
+
+
 @router.get("/notifications")
 async def get_notifications(
-    token: str = Query(..., description="用户token"),
+    user: Dict[str, Any] = Depends(get_current_user_profile),
     limit: int = Query(50, description="返回数量")
 ):
     """
     获取用户通知列表
     """
     try:
-        # 验证用户token
-        user_info = get_current_user(token)
-        if not user_info:
-            raise HTTPException(status_code=401, detail="未授权访问")
-        
-        db = get_db_manager()
-        notifications = db.get_user_notifications(user_id=user_info.id, limit=limit)
+        db = get_async_db_manager()
+        notifications = await db.get_user_notifications(user_id=user['id'], limit=limit)
         return {"success": True, "data": notifications}
     except HTTPException:
         raise
@@ -110,19 +173,14 @@ async def get_notifications(
 @router.post("/notifications/{notification_id}/read")
 async def mark_notification_read(
     notification_id: int,
-    token: str = Query(..., description="用户token")
+    user: Dict[str, Any] = Depends(get_current_user_profile)
 ):
     """
-    标记通知为已读
+    标记通知为已读（只能标记自己的通知，未读计数同步减一）
     """
     try:
-        # 验证用户token
-        user_info = get_current_user(token)
-        if not user_info:
-            raise HTTPException(status_code=401, detail="未授权访问")
-        
-        db = get_db_manager()
-        success = db.mark_notification_as_read(notification_id)
+        db = get_async_db_manager()
+        success = await db.mark_notification_as_read(notification_id, user_id=user['id'])
         
         if not success:
             raise HTTPException(status_code=404, detail="通知不存在")
@@ -135,19 +193,24 @@ async def mark_notification_read(
 
 
 @router.get("/unread-count")
-async def get_unread_count(token: str = Query(..., description="用户token")):
+async def get_unread_count(
+    request: Request,
+    response: Response,
+    user: Dict[str, Any] = Depends(get_current_user_profile)
+):
     """
-    获取未读通知数量
+    获取未读通知数量（读取users表计数器，支持ETag/304）
     """
     try:
-        # 验证用户token
-        user_info = get_current_user(token)
-        if not user_info:
-            raise HTTPException(status_code=401, detail="未授权访问")
+        db = get_async_db_manager()
+        count = await db.get_unread_notification_count(user_id=user['id'])
         
-        db = get_db_manager()
-        count = db.get_unread_notification_count(user_id=user_info.id)
+        etag = make_etag('unread', user['id'], count)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return _not_modified(etag)
         
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
         return {"success": True, "count": count}
     except HTTPException:
         raise
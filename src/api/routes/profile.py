@@ -6,18 +6,23 @@ from datetime import datetime
 import sys
 from pathlib import Path
 import os
-import uuid
 
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.models_db.user import User
-from src.models_db.city_prediction import CityPrediction
+from src.models_db.city_prediction import UserCityPredictionCount
 from src.utils.db_utils import get_session
-from src.utils.auth import hash_password, verify_password, decode_access_token
+from src.utils.auth import hash_password, verify_password
+from src.utils.user_cache import invalidate_user
+from src.utils.avatar_store import store_avatar, avatar_urls
+from src.api.dependencies import authenticate_user_id
 
 router = APIRouter(prefix="/profile", tags=["个人中心"])
 
+# 后端生产地址（头像URL前缀）
+AVATAR_BASE_URL = os.getenv('AVATAR_BASE_URL', "https://yjwkusxabeto.sealoshzh.site")
+
 
 # Pydantic模型
 class UpdateProfileRequest(BaseModel):
@@ -50,14 +55,12 @@ class ModelConfigRequest(BaseModel):
 
 
 def get_user_from_token(token: str):
-    """从token获取用户"""
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="令牌无效或已过期")
+    """
+    从token获取用户（返回ORM对象和会话，供读写用户数据的接口使用）
     
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="令牌数据无效")
+    令牌验证走缓存；修改用户数据后需调用invalidate_user清除资料快照
+    """
+    user_id = authenticate_user_id(token)
     
     session = get_session()
     try:
@@ -85,23 +88,14 @@ def get_profile_info(token: str):
     user, session = get_user_from_token(token)
     
     try:
-        # 从city_predictions表统计真实预测次数
-        try:
-            prediction_count = session.query(CityPrediction).filter(
-                CityPrediction.user_id == user.id
-            ).count()
-            
-            # 同步更新用户表中的预测次数
-            if user.prediction_count != prediction_count:
-                user.prediction_count = prediction_count
-                session.commit()
-        except Exception as count_error:
-            print(f"[WARN] 统计预测次数失败: {count_error}")
-            # 如果统计失败，使用用户表中的值
-            prediction_count = user.prediction_count if user.prediction_count is not None else 0
+        # 预测次数在写入预测记录时增量维护，直接读取，无需统计city_predictions表
+        city_counts = session.query(UserCityPredictionCount).filter(
+            UserCityPredictionCount.user_id == user.id
+        ).order_by(UserCityPredictionCount.prediction_count.desc()).all()
         
         user_data = user.to_dict()
-        user_data['prediction_count'] = prediction_count
+        user_data['prediction_count'] = user.prediction_count or 0
+        user_data['city_prediction_counts'] = [row.to_dict() for row in city_counts]
         
         return {
             "success": True,
@@ -145,6 +139,7 @@ def update_profile(token: str, request: UpdateProfileRequest):
         user.updated_at = datetime.now()
         session.commit()
         session.refresh(user)
+        invalidate_user(user.id)
         
         return {
             "success": True,
@@ -188,6 +183,7 @@ def change_password(token: str, request: ChangePasswordRequest):
         user.password_hash = hash_password(request.new_password)
         user.updated_at = datetime.now()
         session.commit()
+        invalidate_user(user.id)
         
         return {
             "success": True,
@@ -220,6 +216,7 @@ def update_settings(token: str, request: UpdateSettingsRequest):
         user.updated_at = datetime.now()
         session.commit()
         session.refresh(user)
+        invalidate_user(user.id)
         
         return {
             "success": True,
@@ -322,6 +319,7 @@ def update_model_config(token: str, request: ModelConfigRequest):
         user.updated_at = datetime.now()
         session.commit()
         session.refresh(user)
+        invalidate_user(user.id)
         
         return {
             "success": True,
@@ -367,6 +365,7 @@ def reset_model_config(token: str):
         
         session.commit()
         session.refresh(user)
+        invalidate_user(user.id)
         
         return {
             "success": True,
@@ -395,49 +394,38 @@ async def upload_avatar(token: str, file: UploadFile = File(...)):
     
     - **token**: JWT令牌
     - **file**: 头像文件
+    
+    文件在工作线程中分块落盘并计算哈希，按内容去重；缩放和缩略图在图片线程池中生成
     """
-    user, session = get_user_from_token(token)
+    authenticate_user_id(token)
     
+    # 验证文件类型
+    if not (file.content_type or '').startswith('image/'):
+        raise HTTPException(status_code=400, detail="只支持图片文件")
+    
+    # 保存文件（限制10MB，超限时中途停止读取）
+    try:
+        stored = await store_avatar(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"上传头像失败: {str(e)}")
+    
+    user, session = get_user_from_token(token)
     try:
-        # 验证文件类型
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="只支持图片文件")
-        
-        # 验证文件大小（限制10MB）
-        content = await file.read()
-        if len(content) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="图片文件大小不能超过10MB")
-        
-        # 创建上传目录
-        upload_dir = Path(project_root) / "static" / "avatars"
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 生成唯一文件名
-        file_ext = Path(file.filename).suffix
-        new_filename = f"{user.id}_{uuid.uuid4().hex[:8]}{file_ext}"
-        file_path = upload_dir / new_filename
-        
-        # 保存文件
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
         # 更新用户头像URL（使用完整的后端公网地址）
-        # 后端生产地址
-        backend_url = "https://yjwkusxabeto.sealoshzh.site"
-        avatar_url = f"{backend_url}/static/avatars/{new_filename}"
-        user.avatar = avatar_url
+        urls = avatar_urls(stored, AVATAR_BASE_URL)
+        user.avatar = urls['avatar_url']
         user.updated_at = datetime.now()
         session.commit()
-        session.refresh(user)
+        invalidate_user(user.id)
         
         return {
             "success": True,
             "message": "头像上传成功",
-            "avatar_url": avatar_url
+            "avatar_url": urls['avatar_url'],
+            "thumbnail_url": urls['thumbnail_url']
         }
-    except HTTPException:
-        session.rollback()
-        raise
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=f"上传头像失败: {str(e)}")
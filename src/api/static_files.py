@@ -0,0 +1,54 @@
+"""
+带缓存策略的静态文件服务
+- 带内容哈希的资源（static/dist/、内容寻址头像）返回 immutable 长缓存
+- 其他文件短缓存，依赖 ETag/Last-Modified 条件请求返回304
+- 存在预压缩文件（.br/.gz）且客户端接受时直接发送，不在请求时压缩
+"""
+
+import os
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from src.utils.static_assets import (
+    COMPRESSIBLE_SUFFIXES, cache_control_for, guess_content_type, select_precompressed
+)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles + Cache-Control + 预压缩文件协商"""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = Path(full_path)
+
+        send_path, encoding = select_precompressed(path, request_headers.get('accept-encoding'))
+        if encoding:
+            stat_result = os.stat(send_path)
+
+        response = FileResponse(
+            send_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=guess_content_type(path),
+        )
+        response.headers['Cache-Control'] = cache_control_for(self._relative_path(path))
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            response.headers['Vary'] = 'Accept-Encoding'
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _relative_path(self, path: Path) -> str:
+        return Path(os.path.relpath(path, os.path.realpath(self.directory))).as_posix()
@@ -0,0 +1,209 @@
+"""
+预处理结果缓存
+预处理（插值、异常值裁剪、逐传感器归一化）结果与scaler缓存在 data/processed/cache/<指纹>/ 下。
+指纹由原始数据文件内容（SHA-256）、data_config.yaml 的 preprocessing 配置和
+预处理版本号共同决定，任一变化都会重新预处理。
+
+命中时各数组以 np.load(mmap_mode='r') 打开，不再执行预处理；
+原始文件的SHA-256按 (大小, 修改时间) 记在 fingerprints.json 中，重复运行无需重新计算。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from src.utils.config import config
+
+project_root = Path(__file__).parent.parent.parent
+
+DATA_CONFIG_PATH = project_root / 'configs' / 'data_config.yaml'
+
+# 预处理流程变化时递增，使旧缓存失效
+PREPROCESS_VERSION = 2
+
+# 保留的缓存条目数（按最近使用时间）
+MAX_ENTRIES = 4
+
+SCALER_FILENAME = 'scaler.npz'
+MANIFEST_FILENAME = 'manifest.json'
+FINGERPRINTS_FILENAME = 'fingerprints.json'
+
+
+def default_cache_dir() -> Path:
+    return Path(config.get('paths.data_processed')) / 'cache'
+
+
+def load_preprocessing_settings(config_path: Path = DATA_CONFIG_PATH) -> Dict:
+    """读取 data_config.yaml 的 preprocessing 段"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data_config = yaml.safe_load(f) or {}
+    except OSError as e:
+        print(f"[WARN] 读取数据配置失败，使用默认预处理参数: {e}")
+        return {}
+    return data_config.get('preprocessing') or {}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprints(paths: List[Path], cache_dir: Path) -> List[Dict]:
+    """原始文件内容指纹（大小和修改时间未变时复用上次的SHA-256）"""
+    record_path = cache_dir / FINGERPRINTS_FILENAME
+    try:
+        with open(record_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        records = {}
+
+    result = []
+    changed = False
+    for path in paths:
+        stat = path.stat()
+        key = str(path.resolve())
+        record = records.get(key)
+        if not record or record['size'] != stat.st_size or record['mtime_ns'] != stat.st_mtime_ns:
+            record = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _sha256(path)}
+            records[key] = record
+            changed = True
+        result.append({'name': path.name, 'size': record['size'], 'sha256': record['sha256']})
+
+    if changed:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = record_path.with_name(record_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, record_path)
+    return result
+
+
+def cache_key(sources: List[Dict], settings: Dict) -> str:
+    payload = json.dumps(
+        {'version': PREPROCESS_VERSION, 'sources': sources, 'settings': settings},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_entry(entry_dir: Path) -> Optional[Dict[str, np.ndarray]]:
+    try:
+        with open(entry_dir / MANIFEST_FILENAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = {
+            name: np.load(entry_dir / f'{name}.npy', mmap_mode='r')
+            for name in manifest['arrays']
+        }
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] 预处理缓存损坏，将重新生成: {e}")
+        return None
+    # 更新访问时间，用于清理最久未用的条目
+    os.utime(entry_dir)
+    return arrays
+
+
+def _write_entry(entry_dir: Path, processed: Dict[str, np.ndarray], preprocessor, manifest: Dict):
+    """先写临时目录再改名，中途失败不会留下不完整的缓存"""
+    tmp_dir = entry_dir.with_name(f'.{entry_dir.name}.tmp{os.getpid()}')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    try:
+        for name, array in processed.items():
+            np.save(tmp_dir / f'{name}.npy', np.ascontiguousarray(array))
+        if preprocessor.scaler is not None:
+            preprocessor.save_scaler(str(tmp_dir / SCALER_FILENAME))
+        with open(tmp_dir / MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump({**manifest, 'arrays': list(processed.keys())}, f, ensure_ascii=False, indent=2)
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def prune_cache(cache_dir: Path, keep: int = MAX_ENTRIES) -> int:
+    """删除最久未使用的缓存条目"""
+    entries = [
+        path for path in cache_dir.iterdir()
+        if path.is_dir() and not path.name.startswith('.') and (path / MANIFEST_FILENAME).exists()
+    ] if cache_dir.exists() else []
+    entries.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+    return max(len(entries) - keep, 0)
+
+
+def load_processed_data(
+    loader,
+    preprocessor,
+    save_scaler: bool = True,
+    cache_dir: Optional[Path] = None,
+    refresh: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    读取预处理结果，缓存未命中时执行预处理并写入缓存
+
+    Args:
+        loader: TrafficDataLoader
+        preprocessor: TrafficDataPreprocessor（命中时加载缓存的scaler）
+        save_scaler: 是否把scaler写到 paths.data_processed/scaler.npz（与 process_data 一致）
+        cache_dir: 缓存目录（默认 data/processed/cache）
+        refresh: 忽略已有缓存重新预处理
+
+    Returns:
+        处理后的数据（命中时为只读内存映射数组）
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    settings = load_preprocessing_settings()
+
+    start = time.perf_counter()
+    sources = file_fingerprints(loader.source_files(), cache_dir)
+    key = cache_key(sources, settings)
+    entry_dir = cache_dir / key
+
+    if not refresh and (entry_dir / MANIFEST_FILENAME).exists():
+        processed = _load_entry(entry_dir)
+        if processed is not None:
+            scaler_path = entry_dir / SCALER_FILENAME
+            if scaler_path.exists():
+                preprocessor.load_scaler(str(scaler_path))
+                if save_scaler:
+                    target = Path(config.get('paths.data_processed')) / SCALER_FILENAME
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(scaler_path, target)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"✅ 预处理缓存命中: {entry_dir}（{elapsed:.0f} ms）")
+            return processed
+
+    print(f"🔧 预处理缓存未命中（{key}），执行预处理...")
+    data = loader.load_data()
+    processed = preprocessor.process_data(data, save_scaler=save_scaler, settings=settings)
+
+    try:
+        _write_entry(entry_dir, processed, preprocessor, {
+            'key': key,
+            'version': PREPROCESS_VERSION,
+            'sources': sources,
+            'settings': settings,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        prune_cache(cache_dir)
+        print(f"💾 预处理结果已缓存: {entry_dir}")
+    except Exception as e:
+        print(f"[WARN] 写入预处理缓存失败: {e}")
+
+    return processed
@@ -5,7 +5,7 @@
 
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import sys
 
 # 添加项目根目录到路径
@@ -13,22 +13,32 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.utils.config import config
+from src.data.storage import ensure_converted, feature_views, load_manifest, open_memmap, storage_paths
+
+
+def _format_stat(value) -> str:
+    """清单中的统计值（全为NaN的特征 min/max 为 None）"""
+    return 'nan' if value is None else f"{value:.2f}"
 
 
 class TrafficDataLoader:
     """交通数据加载器"""
     
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, use_mmap: bool = True, dataset_file: str = 'pems04.npz'):
         """
         初始化数据加载器
         
         Args:
             data_path: 数据目录路径
+            use_mmap: NPZ数据首次加载时转换为float32内存映射文件，之后以零拷贝视图加载
+            dataset_file: NPZ数据文件名（如 pems07.npz）
         """
         if data_path is None:
             data_path = config.get('paths.data_raw')
         
         self.data_path = Path(data_path)
+        self.use_mmap = use_mmap
+        self.dataset_file = dataset_file
         
         if not self.data_path.exists():
             raise FileNotFoundError(f"数据目录不存在: {self.data_path}")
@@ -40,7 +50,10 @@ class TrafficDataLoader:
         Returns:
             包含flow, speed, occupancy的字典
         """
-        npz_file = self.data_path / 'pems04.npz'
+        npz_file = self.data_path / self.dataset_file
+        
+        if self._mmap_available():
+            return self._load_mmap(npz_file)
         
         if not npz_file.exists():
             raise FileNotFoundError(
@@ -82,6 +95,54 @@ class TrafficDataLoader:
         
         return result
     
+    def _mmap_available(self) -> bool:
+        """是否可以使用内存映射文件（NPZ存在可转换，或已有转换结果）"""
+        npz_file = self.data_path / self.dataset_file
+        return self.use_mmap and (npz_file.exists() or storage_paths(npz_file)['manifest'].exists())
+    
+    def _get_manifest(self) -> Dict:
+        """内存映射文件的清单（必要时先转换NPZ）"""
+        npz_file = self.data_path / self.dataset_file
+        if npz_file.exists():
+            return ensure_converted(npz_file)
+        manifest_path = storage_paths(npz_file)['manifest']
+        manifest = load_manifest(manifest_path)
+        if manifest is None:
+            raise FileNotFoundError(f"清单不存在或格式不兼容: {manifest_path}")
+        return manifest
+    
+    def _open_mmap(self) -> Tuple[np.memmap, Dict]:
+        """只读打开内存映射文件，返回 ((特征, 时间步, 传感器) 数组, 清单)"""
+        manifest = self._get_manifest()
+        manifest_path = storage_paths(self.data_path / self.dataset_file)['manifest']
+        return open_memmap(manifest_path, manifest), manifest
+    
+    def _load_mmap(self, npz_file: Path) -> Dict[str, np.ndarray]:
+        """
+        以内存映射方式加载（必要时先转换NPZ）
+        
+        Returns:
+            各特征 (timesteps, sensors) 的只读float32视图
+        """
+        array, manifest = self._open_mmap()
+        manifest_path = storage_paths(npz_file)['manifest']
+        result = feature_views(array, manifest)
+        
+        print(f"[加载] 内存映射: {manifest_path.with_name(manifest['data_file'])}")
+        print(f"   形状: (特征, 时间步, 传感器) = {tuple(manifest['shape'])}")
+        
+        # 统计信息在转换时已计算，直接读取清单
+        print(f"\n[统计] 数据统计:")
+        for key in result:
+            stats = manifest['stats'][key]
+            print(f"   {key:12s}: shape={result[key].shape}, "
+                  f"mean={stats['mean']:.2f}, "
+                  f"std={stats['std']:.2f}, "
+                  f"min={_format_stat(stats['min'])}, "
+                  f"max={_format_stat(stats['max'])}")
+        
+        return result
+    
     def load_pems04_npy(self) -> Dict[str, np.ndarray]:
         """
         加载PeMS04数据集（NPY格式）
@@ -135,8 +196,8 @@ class TrafficDataLoader:
         """
         if format == 'auto':
             # 优先尝试NPZ格式
-            npz_file = self.data_path / 'pems04.npz'
-            if npz_file.exists():
+            npz_file = self.data_path / self.dataset_file
+            if npz_file.exists() or self._mmap_available():
                 return self.load_pems04_npz()
             else:
                 return self.load_pems04_npy()
@@ -147,6 +208,23 @@ class TrafficDataLoader:
         else:
             raise ValueError(f"不支持的格式: {format}")
     
+    def source_files(self) -> List[Path]:
+        """
+        当前数据来源的文件（用于预处理缓存的指纹）
+        
+        优先NPZ；只有转换结果时为内存映射数据文件；否则为NPY文件
+        """
+        npz_file = self.data_path / self.dataset_file
+        if npz_file.exists():
+            return [npz_file]
+        if self._mmap_available():
+            return [storage_paths(npz_file)['data']]
+        return [
+            self.data_path / 'pems04_flow_sample.npy',
+            self.data_path / 'pems04_speed_sample.npy',
+            self.data_path / 'pems04_occupancy_sample.npy',
+        ]
+    
     def load_subset(
         self,
         sensors: Optional[list] = None,
@@ -155,6 +233,9 @@ class TrafficDataLoader:
         """
         加载数据子集
         
+        使用内存映射文件时只读取所需的时间范围和传感器（特征优先布局下
+        时间范围是连续的字节区间），不加载完整数据集。
+        
         Args:
             sensors: 传感器ID列表（可选）
             time_range: 时间范围 (start, end)（可选）
@@ -162,19 +243,31 @@ class TrafficDataLoader:
         Returns:
             数据子集
         """
-        # 加载完整数据
-        data = self.load_data()
-        
-        # 选择传感器
-        if sensors is not None:
-            for key in data:
-                data[key] = data[key][:, sensors]
-        
-        # 选择时间范围
-        if time_range is not None:
-            start, end = time_range
-            for key in data:
-                data[key] = data[key][start:end, :]
+        if self._mmap_available():
+            array, manifest = self._open_mmap()
+            
+            # 先按时间切片（视图），再按传感器取列（只复制子集）
+            if time_range is not None:
+                start, end = time_range
+                array = array[:, start:end]
+            if sensors is not None:
+                array = np.take(array, sensors, axis=2)
+            
+            data = feature_views(array, manifest)
+        else:
+            # 加载完整数据
+            data = self.load_data()
+            
+            # 选择传感器
+            if sensors is not None:
+                for key in data:
+                    data[key] = data[key][:, sensors]
+            
+            # 选择时间范围
+            if time_range is not None:
+                start, end = time_range
+                for key in data:
+                    data[key] = data[key][start:end, :]
         
         print(f"[OK] 加载数据子集")
         if sensors is not None:
@@ -188,9 +281,23 @@ class TrafficDataLoader:
         """
         获取数据集信息
         
+        使用内存映射文件时直接读取清单，不加载数据。
+        
         Returns:
             数据集信息字典
         """
+        if self._mmap_available():
+            manifest = self._get_manifest()
+            return {
+                'num_timesteps': manifest['num_timesteps'],
+                'num_sensors': manifest['num_sensors'],
+                'features': list(manifest['features']),
+                'time_interval': f"{manifest['time_interval']} minutes",
+                'dataset': manifest['dataset'],
+                'shape': tuple(manifest['shape']),
+                'dtype': manifest['dtype'],
+            }
+        
         data = self.load_data()
         
         info = {
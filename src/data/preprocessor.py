@@ -5,9 +5,7 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler
 from typing import Dict, Tuple, Optional
-import pickle
 from pathlib import Path
 import sys
 
@@ -15,6 +13,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.utils.config import config
+from src.data.scaler import SensorScaler, save_scalers, load_scalers
 
 
 class TrafficDataPreprocessor:
@@ -22,8 +21,10 @@ class TrafficDataPreprocessor:
     
     def __init__(self):
         """初始化预处理器"""
-        self.scaler = None
+        self.scaler: Optional[SensorScaler] = None
         self.scaler_type = None
+        # 各特征的逐传感器scaler
+        self.scalers: Dict[str, SensorScaler] = {}
     
     def handle_missing_values(
         self,
@@ -170,15 +171,17 @@ class TrafficDataPreprocessor:
         self,
         data: np.ndarray,
         method: str = 'minmax',
-        feature_range: Tuple[float, float] = (0, 1)
+        feature_range: Tuple[float, float] = (0, 1),
+        feature: Optional[str] = None
     ) -> np.ndarray:
         """
-        数据归一化
+        数据归一化（每个传感器独立归一化）
         
         Args:
             data: 输入数据 (timesteps, sensors)
             method: 归一化方法 ('minmax', 'standard', 'robust')
             feature_range: MinMaxScaler的范围
+            feature: 特征名（指定时scaler按特征保存，供反归一化使用）
         
         Returns:
             归一化后的数据
@@ -186,55 +189,47 @@ class TrafficDataPreprocessor:
         print(f"📊 数据归一化 (方法: {method})...")
         
         self.scaler_type = method
+        self.scaler = SensorScaler(method, feature_range).fit(data)
+        if feature is not None:
+            self.scalers[feature] = self.scaler
         
-        # 重塑数据以适应scaler
-        original_shape = data.shape
-        data_reshaped = data.reshape(-1, 1) if data.ndim == 2 else data
-        
-        if method == 'minmax':
-            self.scaler = MinMaxScaler(feature_range=feature_range)
-        elif method == 'standard':
-            self.scaler = StandardScaler()
-        elif method == 'robust':
-            self.scaler = RobustScaler()
-        else:
-            raise ValueError(f"不支持的归一化方法: {method}")
-        
-        # 对每个传感器独立归一化
-        normalized = np.zeros_like(data)
-        for i in range(data.shape[1]):
-            sensor_data = data[:, i].reshape(-1, 1)
-            normalized[:, i] = self.scaler.fit_transform(sensor_data).flatten()
+        dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float32
+        normalized = self.scaler.transform(data).astype(dtype, copy=False)
         
         print(f"   ✓ 归一化完成")
-        print(f"   原始范围: [{data.min():.2f}, {data.max():.2f}]")
-        print(f"   归一化范围: [{normalized.min():.2f}, {normalized.max():.2f}]")
+        print(f"   原始范围: [{np.nanmin(data):.2f}, {np.nanmax(data):.2f}]")
+        print(f"   归一化范围: [{np.nanmin(normalized):.2f}, {np.nanmax(normalized):.2f}]")
         
         return normalized
     
-    def inverse_transform(self, data: np.ndarray) -> np.ndarray:
+    def get_scaler(self, feature: Optional[str] = None) -> SensorScaler:
+        """按特征取scaler（未指定特征时为最近一次归一化的scaler）"""
+        if feature is not None:
+            if feature not in self.scalers:
+                raise ValueError(f"没有特征 {feature} 的scaler")
+            return self.scalers[feature]
+        if self.scaler is None:
+            raise ValueError("尚未训练scaler，请先调用normalize()")
+        return self.scaler
+    
+    def inverse_transform(
+        self,
+        data: np.ndarray,
+        feature: Optional[str] = None,
+        sensors: Optional[list] = None
+    ) -> np.ndarray:
         """
         反归一化
         
         Args:
-            data: 归一化后的数据
+            data: 归一化后的数据 (..., sensors)
+            feature: 特征名（默认使用最近一次归一化的scaler）
+            sensors: data只包含部分传感器时对应的传感器下标
         
         Returns:
             原始尺度的数据
         """
-        if self.scaler is None:
-            raise ValueError("尚未训练scaler，请先调用normalize()")
-        
-        # 对每个传感器独立反归一化
-        denormalized = np.zeros_like(data)
-        for i in range(data.shape[1] if data.ndim > 1 else 1):
-            if data.ndim > 1:
-                sensor_data = data[:, i].reshape(-1, 1)
-                denormalized[:, i] = self.scaler.inverse_transform(sensor_data).flatten()
-            else:
-                denormalized = self.scaler.inverse_transform(data.reshape(-1, 1)).flatten()
-        
-        return denormalized
+        return self.get_scaler(feature).inverse_transform(data, sensors=sensors)
     
     def create_congestion_labels(
         self,
@@ -288,14 +283,8 @@ class TrafficDataPreprocessor:
         if self.scaler is None:
             raise ValueError("尚未训练scaler")
         
-        filepath = Path(filepath)
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'scaler': self.scaler,
-                'scaler_type': self.scaler_type
-            }, f)
+        # 各特征的参数数组写入同一个 .npz；未按特征归一化时保存为 default
+        save_scalers(filepath, self.scalers or {'default': self.scaler})
         
         print(f"✅ Scaler已保存: {filepath}")
     
@@ -306,17 +295,18 @@ class TrafficDataPreprocessor:
         Args:
             filepath: 文件路径
         """
-        with open(filepath, 'rb') as f:
-            data = pickle.load(f)
-            self.scaler = data['scaler']
-            self.scaler_type = data['scaler_type']
+        scalers = load_scalers(filepath)
+        self.scalers = {name: scaler for name, scaler in scalers.items() if name != 'default'}
+        self.scaler = scalers.get('default') or list(scalers.values())[-1]
+        self.scaler_type = self.scaler.method
         
         print(f"✅ Scaler已加载: {filepath}")
     
     def process_data(
         self,
         data: Dict[str, np.ndarray],
-        save_scaler: bool = True
+        save_scaler: bool = True,
+        settings: Optional[Dict] = None
     ) -> Dict[str, np.ndarray]:
         """
         完整的数据预处理流程
@@ -324,6 +314,7 @@ class TrafficDataPreprocessor:
         Args:
             data: 包含flow, speed, occupancy的字典
             save_scaler: 是否保存scaler
+            settings: data_config.yaml 的 preprocessing 段（缺省项使用默认值）
         
         Returns:
             处理后的数据
@@ -332,6 +323,12 @@ class TrafficDataPreprocessor:
         print("开始数据预处理")
         print("=" * 60)
         
+        settings = settings or {}
+        missing = settings.get('missing_values') or {}
+        outlier = settings.get('outlier_detection') or {}
+        normalization = settings.get('normalization') or {}
+        congestion = (settings.get('feature_engineering') or {}).get('congestion_labels') or {}
+        
         processed = {}
         
         # 处理每个特征
@@ -343,23 +340,36 @@ class TrafficDataPreprocessor:
             print("-" * 60)
             
             # 1. 处理缺失值
-            clean_data = self.handle_missing_values(data[key])
+            clean_data = self.handle_missing_values(data[key], method=missing.get('method', 'interpolate'))
             
             # 2. 处理异常值
-            clean_data = self.handle_outliers(clean_data)
+            if outlier.get('enabled', True):
+                clean_data = self.handle_outliers(
+                    clean_data,
+                    action=outlier.get('action', 'clip'),
+                    method=outlier.get('method', 'iqr'),
+                    threshold=float(outlier.get('threshold', 1.5))
+                )
             
             # 3. 归一化
-            normalized = self.normalize(clean_data)
+            normalized = self.normalize(
+                clean_data,
+                method=normalization.get('method', 'minmax'),
+                feature_range=tuple(normalization.get('feature_range', (0, 1))),
+                feature=key
+            )
             
             processed[key] = normalized
         
         # 4. 创建拥堵标签
-        if 'speed' in data:
-            processed['congestion'] = self.create_congestion_labels(data['speed'])
+        if 'speed' in data and congestion.get('enabled', True):
+            processed['congestion'] = self.create_congestion_labels(
+                data['speed'], congestion.get('thresholds')
+            )
         
         # 5. 保存scaler
         if save_scaler:
-            scaler_path = config.get('paths.data_processed') + 'scaler.pkl'
+            scaler_path = config.get('paths.data_processed') + 'scaler.npz'
             self.save_scaler(scaler_path)
         
         print("\n" + "=" * 60)
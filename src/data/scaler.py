@@ -0,0 +1,137 @@
+"""
+逐传感器归一化器
+每个传感器的归一化参数（最小/最大值、均值/标准差或中位数/四分位距）保存为NumPy数组，
+拟合、变换和反变换都是一次广播运算；参数以 .npz 保存，不依赖pickle。
+
+数据约定：时间在第0维、传感器在最后一维，如 (timesteps, sensors)。
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+METHODS = ('minmax', 'standard', 'robust')
+
+
+class SensorScaler:
+    """
+    逐传感器归一化器
+
+    - minmax:   (x - min) / (max - min) 映射到 feature_range
+    - standard: (x - mean) / std
+    - robust:   (x - median) / (q75 - q25)
+
+    与sklearn一致，尺度为0的传感器按1处理（只做平移）。
+    """
+
+    def __init__(self, method: str = 'minmax', feature_range: Tuple[float, float] = (0, 1)):
+        if method not in METHODS:
+            raise ValueError(f"不支持的归一化方法: {method}")
+        self.method = method
+        self.feature_range = (float(feature_range[0]), float(feature_range[1]))
+        self.center: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.center is not None
+
+    @property
+    def num_sensors(self) -> int:
+        return 0 if self.center is None else int(self.center.shape[-1])
+
+    def fit(self, data: np.ndarray) -> 'SensorScaler':
+        """按传感器（沿时间维）计算归一化参数，忽略NaN"""
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        flat = data.reshape(data.shape[0], -1) if data.ndim > 2 else data
+
+        if self.method == 'minmax':
+            center = np.nanmin(flat, axis=0)
+            scale = np.nanmax(flat, axis=0) - center
+        elif self.method == 'standard':
+            center = np.nanmean(flat, axis=0)
+            scale = np.nanstd(flat, axis=0)
+        else:
+            q25, center, q75 = np.nanpercentile(flat, [25, 50, 75], axis=0)
+            scale = q75 - q25
+
+        scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        self.center = center.reshape(data.shape[1:])
+        self.scale = scale.reshape(data.shape[1:])
+        return self
+
+    def _params(self, sensors: Optional[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.fitted:
+            raise ValueError("尚未训练scaler，请先调用fit()")
+        if sensors is None:
+            return self.center, self.scale
+        return self.center[..., sensors], self.scale[..., sensors]
+
+    def transform(self, data: np.ndarray, sensors: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        归一化
+
+        Args:
+            data: (..., sensors) 数据，最后一维与拟合时的传感器对应
+            sensors: 只包含部分传感器时对应的传感器下标
+        """
+        center, scale = self._params(sensors)
+        result = (np.asarray(data) - center) / scale
+        if self.method == 'minmax':
+            low, high = self.feature_range
+            result = result * (high - low) + low
+        return result
+
+    def fit_transform(self, data: np.ndarray) -> np.ndarray:
+        return self.fit(data).transform(data)
+
+    def inverse_transform(self, data: np.ndarray, sensors: Optional[Sequence[int]] = None) -> np.ndarray:
+        """反归一化（参数含义同transform）"""
+        center, scale = self._params(sensors)
+        data = np.asarray(data)
+        if self.method == 'minmax':
+            low, high = self.feature_range
+            data = (data - low) / (high - low)
+        return data * scale + center
+
+    def to_arrays(self, prefix: str = '') -> Dict[str, np.ndarray]:
+        """参数数组（用于写入 .npz）"""
+        if not self.fitted:
+            raise ValueError("尚未训练scaler")
+        return {
+            f'{prefix}method': np.array(self.method),
+            f'{prefix}feature_range': np.array(self.feature_range),
+            f'{prefix}center': self.center,
+            f'{prefix}scale': self.scale,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = '') -> 'SensorScaler':
+        scaler = cls(str(arrays[f'{prefix}method']), tuple(arrays[f'{prefix}feature_range']))
+        scaler.center = np.asarray(arrays[f'{prefix}center'])
+        scaler.scale = np.asarray(arrays[f'{prefix}scale'])
+        return scaler
+
+
+def save_scalers(filepath, scalers: Dict[str, SensorScaler]):
+    """把多个特征的scaler保存到一个 .npz 文件"""
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {'features': np.array(list(scalers.keys()))}
+    for name, scaler in scalers.items():
+        arrays.update(scaler.to_arrays(prefix=f'{name}/'))
+    # 传入文件对象，避免 np.savez 自动追加 .npz 后缀
+    with open(filepath, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_scalers(filepath) -> Dict[str, SensorScaler]:
+    """读取 save_scalers 保存的 .npz 文件"""
+    with np.load(filepath, allow_pickle=False) as arrays:
+        return {
+            str(name): SensorScaler.from_arrays(arrays, prefix=f'{name}/')
+            for name in arrays['features']
+        }
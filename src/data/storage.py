@@ -0,0 +1,206 @@
+"""
+内存映射数据存储
+把压缩的NPZ数据集一次性转换为未压缩、float32、特征优先（features, timesteps, sensors）
+的二进制文件，并写出JSON清单（形状、dtype、特征名、时间间隔、源文件指纹、各特征统计）。
+
+加载时用 np.memmap 只读打开：
+- 每个特征是一块连续内存，flow/speed/occupancy 是零拷贝视图
+- 启动几乎不花时间，数据按需从页缓存读取，多个进程共享同一份页缓存
+
+文件布局（与源NPZ同目录）:
+    pems04.npz  ->  pems04.f32（原始数据） + pems04.f32.json（清单）
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+STORAGE_DTYPE = np.float32
+DATA_SUFFIX = '.f32'
+MANIFEST_SUFFIX = '.f32.json'
+
+# PeMS NPZ 数据的特征顺序: [flow, occupancy, speed]
+DEFAULT_FEATURES = ('flow', 'occupancy', 'speed')
+
+# 转换时每次处理的时间步数（控制转换峰值内存）
+CONVERT_CHUNK_STEPS = 4096
+
+
+def storage_paths(source_path) -> Dict[str, Path]:
+    """源文件对应的数据文件与清单路径"""
+    source_path = Path(source_path)
+    base = source_path.with_suffix('')
+    return {
+        'data': base.with_name(base.name + DATA_SUFFIX),
+        'manifest': base.with_name(base.name + MANIFEST_SUFFIX),
+    }
+
+
+def _source_fingerprint(source_path: Path) -> Dict:
+    stat = source_path.stat()
+    return {'name': source_path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_manifest(manifest_path) -> Optional[Dict]:
+    """读取清单，不存在或损坏时返回None"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format_version') != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def is_current(source_path, manifest: Optional[Dict] = None) -> bool:
+    """转换结果是否存在且与源文件一致"""
+    source_path = Path(source_path)
+    paths = storage_paths(source_path)
+    if manifest is None:
+        manifest = load_manifest(paths['manifest'])
+    if manifest is None or not paths['data'].exists():
+        return False
+    expected_bytes = int(np.prod(manifest['shape'])) * np.dtype(manifest['dtype']).itemsize
+    if paths['data'].stat().st_size != expected_bytes:
+        return False
+    if not source_path.exists():
+        # 只保留了转换结果（例如部署时未拷贝NPZ）
+        return True
+    return manifest.get('source') == _source_fingerprint(source_path)
+
+
+def _feature_names(num_features: int, features: Optional[Sequence[str]]) -> List[str]:
+    if features is not None:
+        if len(features) != num_features:
+            raise ValueError(f"特征名数量({len(features)})与数据特征数({num_features})不一致")
+        return list(features)
+    if num_features <= len(DEFAULT_FEATURES):
+        return list(DEFAULT_FEATURES[:num_features])
+    return [f'feature_{i}' for i in range(num_features)]
+
+
+def convert_npz(
+    source_path,
+    features: Optional[Sequence[str]] = None,
+    time_interval: int = 5,
+    dataset: Optional[str] = None,
+    key: str = 'data'
+) -> Dict:
+    """
+    把NPZ数据集转换为特征优先的float32内存映射文件
+
+    Args:
+        source_path: NPZ文件路径，数据形状 (timesteps, sensors, features) 或 (timesteps, sensors)
+        features: 特征名（默认按PeMS顺序 flow/occupancy/speed）
+        time_interval: 时间间隔（分钟）
+        dataset: 数据集名称（默认取文件名）
+        key: NPZ中的数组名
+
+    Returns:
+        清单字典
+    """
+    source_path = Path(source_path)
+    paths = storage_paths(source_path)
+
+    print(f"[转换] {source_path.name} -> {paths['data'].name}（float32，特征优先）")
+    with np.load(source_path) as npz:
+        raw = npz[key]
+    if raw.ndim == 2:
+        raw = raw[:, :, np.newaxis]
+    if raw.ndim != 3:
+        raise ValueError(f"不支持的数据形状: {raw.shape}")
+
+    num_timesteps, num_sensors, num_features = raw.shape
+    names = _feature_names(num_features, features)
+    shape = (num_features, num_timesteps, num_sensors)
+
+    tmp_data = paths['data'].with_name(paths['data'].name + '.tmp')
+    out = np.memmap(tmp_data, dtype=STORAGE_DTYPE, mode='w+', shape=shape)
+    stats = {}
+    try:
+        for index, name in enumerate(names):
+            total = 0.0
+            total_sq = 0.0
+            minimum = np.inf
+            maximum = -np.inf
+            nan_count = 0
+            for start in range(0, num_timesteps, CONVERT_CHUNK_STEPS):
+                chunk = raw[start:start + CONVERT_CHUNK_STEPS, :, index].astype(STORAGE_DTYPE)
+                out[index, start:start + len(chunk)] = chunk
+                values = chunk.astype(np.float64)
+                nan_count += int(np.isnan(values).sum())
+                total += float(np.nansum(values))
+                total_sq += float(np.nansum(values * values))
+                if np.isfinite(values).any():
+                    minimum = min(minimum, float(np.nanmin(values)))
+                    maximum = max(maximum, float(np.nanmax(values)))
+            valid = num_timesteps * num_sensors - nan_count
+            mean = total / valid if valid else 0.0
+            std = float(np.sqrt(max(total_sq / valid - mean * mean, 0.0))) if valid else 0.0
+            stats[name] = {
+                'mean': round(mean, 6),
+                'std': round(std, 6),
+                'min': minimum if np.isfinite(minimum) else None,
+                'max': maximum if np.isfinite(maximum) else None,
+                'nan_count': nan_count,
+            }
+        out.flush()
+    finally:
+        del out
+    os.replace(tmp_data, paths['data'])
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'dataset': dataset or source_path.stem.upper().replace('PEMS', 'PeMS'),
+        'layout': 'feature_major',
+        'dtype': np.dtype(STORAGE_DTYPE).name,
+        'shape': list(shape),
+        'features': names,
+        'num_features': num_features,
+        'num_timesteps': num_timesteps,
+        'num_sensors': num_sensors,
+        'time_interval': time_interval,
+        'data_file': paths['data'].name,
+        'source': _source_fingerprint(source_path),
+        'stats': stats,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp_manifest = paths['manifest'].with_name(paths['manifest'].name + '.tmp')
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_manifest, paths['manifest'])
+
+    size_mb = paths['data'].stat().st_size / (1024 * 1024)
+    print(f"[OK] 转换完成: 形状 {shape}，{size_mb:.1f} MB")
+    return manifest
+
+
+def ensure_converted(source_path, **kwargs) -> Dict:
+    """转换结果不存在或源文件已变化时重新转换，返回清单"""
+    paths = storage_paths(source_path)
+    manifest = load_manifest(paths['manifest'])
+    if is_current(source_path, manifest):
+        return manifest
+    return convert_npz(source_path, **kwargs)
+
+
+def open_memmap(manifest_path, manifest: Optional[Dict] = None) -> np.memmap:
+    """只读打开数据文件，返回 (features, timesteps, sensors) 的memmap"""
+    manifest_path = Path(manifest_path)
+    if manifest is None:
+        manifest = load_manifest(manifest_path)
+        if manifest is None:
+            raise FileNotFoundError(f"清单不存在或格式不兼容: {manifest_path}")
+    data_path = manifest_path.with_name(manifest['data_file'])
+    return np.memmap(data_path, dtype=manifest['dtype'], mode='r', shape=tuple(manifest['shape']))
+
+
+def feature_views(array: np.ndarray, manifest: Dict) -> Dict[str, np.ndarray]:
+    """按特征名拆分为 (timesteps, sensors) 视图（不复制数据）"""
+    return {name: array[index] for index, name in enumerate(manifest['features'])}
@@ -6,7 +6,7 @@
 import torch
 import torch.nn as nn
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from pathlib import Path
 
 
@@ -72,6 +72,46 @@ class BasePredictor(nn.Module, ABC):
         """
         pass
     
+    @torch.no_grad()
+    def mc_dropout_forward(
+        self,
+        x: torch.Tensor,
+        num_samples: int = 20
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Monte Carlo Dropout 前向传播（单次批量调用）
+
+        将输入沿batch维复制num_samples份，只打开Dropout层做一次前向，
+        再按样本维向量化求均值和标准差，代价接近一次批量推理。
+
+        Args:
+            x: 输入张量 (batch, seq_len, input_size)
+            num_samples: 采样次数K
+
+        Returns:
+            (mean, std): 均值和标准差，形状均为 (batch, output_size)
+        """
+        batch_size = x.shape[0]
+        was_training = self.training
+
+        # 只对Dropout层启用随机性，其余层（如RNN）保持推理模式
+        self.eval()
+        for module in self.modules():
+            if isinstance(module, nn.Dropout):
+                module.train()
+
+        try:
+            # (batch * K, seq_len, input_size)，同一输入的K份副本相邻
+            repeated = x.repeat_interleave(num_samples, dim=0)
+            outputs = self(repeated).view(batch_size, num_samples, -1)
+        finally:
+            self.train(was_training)
+
+        mean = outputs.mean(dim=1)
+        std = outputs.std(dim=1, unbiased=False)
+
+        return mean, std
+
     def count_parameters(self) -> int:
         """
         统计模型参数数量
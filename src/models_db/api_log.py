@@ -2,9 +2,9 @@
 API日志表ORM模型
 """
 
-from sqlalchemy import Column, BigInteger, Integer, Float, String, Text, DateTime, Boolean, TIMESTAMP
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Boolean, TIMESTAMP
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, BigIntegerPK
 
 
 class APILog(Base):
@@ -13,7 +13,7 @@ class APILog(Base):
     __tablename__ = 'api_logs'
     
     # 主键
-    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='主键ID')
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True, comment='主键ID')
     
     # 请求信息
     endpoint = Column(String(255), nullable=False, index=True, comment='API端点')
@@ -2,14 +2,188 @@
 SQLAlchemy ORM 基础模型
 """
 
-from sqlalchemy import create_engine
+import os
+from pathlib import Path
+
+from sqlalchemy import BigInteger, Enum, Integer, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from .pool import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
+from .query_stats import attach_query_monitor, query_monitor
 
 # 创建基础模型类
 Base = declarative_base()
 
+# 项目根目录（SQLite相对路径以此为基准）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# BIGINT自增主键：SQLite只有 INTEGER PRIMARY KEY 才是自增的rowid
+BigIntegerPK = BigInteger().with_variant(Integer, 'sqlite')
+
+
+def portable_enum(*values: str, name: str) -> Enum:
+    """
+    跨数据库的枚举列类型
+    
+    MySQL 使用原生 ENUM；SQLite 等不支持原生枚举的后端使用 VARCHAR + CHECK 约束。
+    每列需单独调用（CHECK 约束随列创建），name 即约束名，在库内必须唯一。
+    """
+    return Enum(*values, name=name, create_constraint=True)
+
+# configs/database.yaml 缺失时使用的连接池默认值（与 mysql.pool 一致）
+DEFAULT_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_recycle': 3600,
+    'pool_pre_ping': True,
+    'pool_use_lifo': True,
+}
+
+# aiomysql 不支持 read_timeout / write_timeout
+ASYNC_CONNECT_ARGS = ('connect_timeout',)
+
+# SQLite 默认参数（configs/database.yaml 的 sqlite 段可覆盖）
+DEFAULT_SQLITE_PATH = 'database/traffic_prediction.db'
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',       # 读写并发：读不阻塞写
+    'synchronous': 'NORMAL',     # WAL 下安全且比 FULL 快得多
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,        # 写锁等待（毫秒）
+    'cache_size': -65536,        # 页缓存（负数为KB，即64MB）
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,      # 256MB 内存映射读
+}
+
+
+def _database_config(key: str) -> Dict[str, Any]:
+    """读取 configs/database.yaml 中的配置段（读取失败时返回空字典）"""
+    try:
+        from src.utils.config import get_config
+        return get_config(key, config_type='database') or {}
+    except Exception as e:
+        print(f"[WARN] 读取数据库配置 {key} 失败，使用默认值: {e}")
+        return {}
+
+
+def get_database_backend() -> str:
+    """
+    数据库后端：mysql / sqlite
+    
+    环境变量 DB_BACKEND 优先，其次 configs/database.yaml 的 sqlite.enabled，默认 mysql
+    """
+    backend = os.getenv('DB_BACKEND')
+    if backend:
+        return backend.lower()
+    return 'sqlite' if _database_config('sqlite').get('enabled') else 'mysql'
+
+
+def get_sqlite_database_url() -> str:
+    """本地 SQLite 数据库URL（路径：环境变量 SQLITE_PATH > sqlite.path 配置）"""
+    path = os.getenv('SQLITE_PATH') or _database_config('sqlite').get('path') or DEFAULT_SQLITE_PATH
+    if path == ':memory:':
+        return 'sqlite://'
+    path = Path(path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{path.as_posix()}"
+
+
+def resolve_database_url(database_url: Optional[str]) -> Optional[str]:
+    """DB_BACKEND=sqlite 时用本地 SQLite 文件替代配置的 MySQL 连接"""
+    if get_database_backend() == 'sqlite':
+        return get_sqlite_database_url()
+    return database_url
+
+
+def install_sqlite_pragmas(engine):
+    """
+    每个新连接上执行 SQLite PRAGMA（WAL、同步级别、缓存等）
+    
+    Args:
+        engine: 同步引擎（异步引擎传入 engine.sync_engine）
+    """
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **(_database_config('sqlite').get('pragmas') or {})}
+    
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for key, value in pragmas.items():
+                cursor.execute(f"PRAGMA {key}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    根据 configs/database.yaml 的 mysql.pool / mysql.sqlalchemy 生成引擎参数
+    
+    SQLite 不使用连接池参数；MySQL 额外应用连接超时与事务隔离级别。
+    
+    Args:
+        database_url: 数据库连接URL
+        is_async: 是否为异步引擎
+    """
+    pool_config = {**DEFAULT_POOL_OPTIONS, **_database_config('mysql.pool')}
+    sqlalchemy_config = _database_config('mysql.sqlalchemy')
+    
+    options = {
+        'pool_pre_ping': bool(pool_config['pool_pre_ping']),
+        'echo': bool(sqlalchemy_config.get('echo', False)),
+        'echo_pool': bool(sqlalchemy_config.get('echo_pool', False)),
+    }
+    
+    backend = make_url(database_url).get_backend_name()
+    if backend == 'sqlite':
+        # 由 busy_timeout PRAGMA 控制锁等待；同一连接可跨线程使用（连接池负责串行化）
+        options['connect_args'] = {'check_same_thread': False}
+        return options
+    
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=int(pool_config['pool_size']),
+        max_overflow=int(pool_config['max_overflow']),
+        pool_timeout=float(pool_config['pool_timeout']),
+        pool_recycle=int(pool_config['pool_recycle']),
+        pool_use_lifo=bool(pool_config['pool_use_lifo']),
+    )
+    
+    if backend == 'mysql':
+        connect_args = dict(sqlalchemy_config.get('connect_args') or {})
+        if is_async:
+            connect_args = {k: v for k, v in connect_args.items() if k in ASYNC_CONNECT_ARGS}
+        if connect_args:
+            options['connect_args'] = connect_args
+        
+        isolation_level = (sqlalchemy_config.get('execution_options') or {}).get('isolation_level')
+        if isolation_level:
+            options['isolation_level'] = isolation_level.replace('_', ' ')
+    
+    return options
+
+
+def install_query_monitor(engine):
+    """
+    按 monitoring.performance 配置为引擎注册语句计时与慢查询日志
+    
+    Args:
+        engine: 同步引擎（异步引擎传入 engine.sync_engine）
+    """
+    monitoring = _database_config('monitoring')
+    if not monitoring.get('enabled', True):
+        return
+    performance = monitoring.get('performance') or {}
+    query_monitor.configure(
+        slow_query_threshold=performance.get('slow_query_threshold', 1.0),
+        log_slow_queries=performance.get('log_slow_queries', True)
+    )
+    attach_query_monitor(engine)
+
 
 class DatabaseConnection:
     """数据库连接管理类（单例模式）"""
@@ -35,16 +209,17 @@ class DatabaseConnection:
     
     def _initialize(self, database_url: str):
         """初始化数据库引擎和会话"""
-        # 创建引擎
+        database_url = resolve_database_url(database_url)
+        
+        # 创建引擎（连接池参数来自 configs/database.yaml）
         self._engine = create_engine(
             database_url,
-            pool_size=10,
-            max_overflow=20,
-            pool_recycle=3600,
-            pool_pre_ping=True,
-            echo=False,
-            future=True
+            future=True,
+            **build_engine_options(database_url)
         )
+        if self._engine.dialect.name == 'sqlite':
+            install_sqlite_pragmas(self._engine)
+        install_query_monitor(self._engine)
         
         # 创建会话工厂
         self._SessionLocal = sessionmaker(
@@ -76,9 +251,10 @@ class DatabaseConnection:
         return self._SessionLocal()
     
     def create_all_tables(self):
-        """创建所有表"""
+        """按 Base 元数据创建所有表（MySQL / SQLite 通用）"""
         if self._engine is None:
             raise RuntimeError("数据库引擎未初始化")
+        import_all_models()
         Base.metadata.create_all(bind=self._engine)
     
     def drop_all_tables(self):
@@ -93,6 +269,11 @@ class DatabaseConnection:
             self._engine.dispose()
 
 
+def import_all_models():
+    """导入全部ORM模型，使其注册到 Base.metadata"""
+    from . import prediction, training, api_log, city_prediction, user, message  # noqa: F401
+
+
 # 全局数据库连接实例
 db_connection = DatabaseConnection()
 
@@ -109,6 +290,114 @@ def init_database(database_url: str):
     return db_connection
 
 
+# 同步驱动 -> 异步驱动
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    """
+    把同步数据库URL转换为异步驱动URL
+    
+    mysql+pymysql -> mysql+aiomysql，sqlite -> sqlite+aiosqlite
+    """
+    url = make_url(database_url)
+    async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None:
+        return database_url
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+class AsyncDatabaseConnection:
+    """异步数据库连接管理类（单例模式）"""
+    
+    _instance: Optional['AsyncDatabaseConnection'] = None
+    _engine = None
+    _SessionLocal = None
+    
+    def __new__(cls, database_url: str = None):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    def __init__(self, database_url: str = None):
+        """
+        初始化异步数据库连接
+        
+        Args:
+            database_url: 数据库连接URL（同步URL会自动转换为异步驱动）
+        """
+        if self._engine is None and database_url:
+            self._initialize(database_url)
+    
+    def _initialize(self, database_url: str):
+        """初始化异步引擎和会话"""
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        
+        async_url = to_async_database_url(resolve_database_url(database_url))
+        self._engine = create_async_engine(
+            async_url,
+            **build_engine_options(async_url, is_async=True)
+        )
+        if self._engine.dialect.name == 'sqlite':
+            install_sqlite_pragmas(self._engine.sync_engine)
+        install_query_monitor(self._engine.sync_engine)
+        
+        # expire_on_commit=False：提交后仍可读取对象属性，避免异步场景下的隐式IO
+        self._SessionLocal = async_sessionmaker(
+            bind=self._engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    
+    @property
+    def engine(self):
+        """获取异步数据库引擎"""
+        return self._engine
+    
+    @property
+    def initialized(self) -> bool:
+        """是否已初始化"""
+        return self._engine is not None
+    
+    def get_session(self):
+        """
+        获取异步数据库会话
+        
+        Returns:
+            AsyncSession对象（配合 async with 使用）
+        """
+        if self._SessionLocal is None:
+            raise RuntimeError("异步数据库未初始化，请先调用初始化方法")
+        return self._SessionLocal()
+    
+    async def close(self):
+        """关闭数据库连接（之后的 get_async_session() 会重新初始化引擎）"""
+        if self._engine:
+            await self._engine.dispose()
+        self._engine = None
+        self._SessionLocal = None
+
+
+# 全局异步数据库连接实例
+async_db_connection = AsyncDatabaseConnection()
+
+
+def init_async_database(database_url: str):
+    """
+    初始化异步数据库
+    
+    Args:
+        database_url: 数据库连接URL
+    """
+    global async_db_connection
+    async_db_connection = AsyncDatabaseConnection(database_url)
+    return async_db_connection
+
+
 def get_db():
     """
     获取数据库会话（用于依赖注入）
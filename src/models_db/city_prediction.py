@@ -9,16 +9,18 @@ from sqlalchemy import (
     Date,
     DateTime,
     Text,
+    LargeBinary,
+    Index,
 )
 from sqlalchemy.sql import func
 
-from .base import Base
+from .base import Base, BigIntegerPK
 
 
 class CityPrediction(Base):
     __tablename__ = "city_predictions"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     user_id = Column(Integer, nullable=True, index=True, comment='用户ID')
     model_type = Column(String(20), nullable=True, index=True, comment='使用的模型类型：lstm/gru/ml-hgstn/transformer/tcn')
     city = Column(String(64), nullable=False, index=True)
@@ -36,6 +38,7 @@ class CityPrediction(Base):
     index_score = Column(Float, nullable=False)
 
     extra_payload = Column(Text, nullable=True)
+    artifacts = Column(LargeBinary, nullable=True, comment='生成的省份热力与监控点数据（zlib压缩JSON）')
 
     created_at = Column(
         DateTime,
@@ -44,6 +47,11 @@ class CityPrediction(Base):
         index=True,
     )
 
+    # 历史记录游标分页索引：按用户 + (created_at, id) 倒序翻页
+    __table_args__ = (
+        Index('idx_city_predictions_user_created', 'user_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -64,3 +72,34 @@ class CityPrediction(Base):
         }
 
 
+
+
+class UserCityPredictionCount(Base):
+    """用户按城市的预测次数（写入预测记录时增量维护）"""
+    __tablename__ = "user_city_prediction_counts"
+
+    user_id = Column(Integer, primary_key=True, comment='用户ID')
+    city = Column(String(64), primary_key=True, comment='城市')
+    prediction_count = Column(Integer, nullable=False, default=0, comment='预测次数')
+    last_prediction_time = Column(DateTime, nullable=True, comment='最后预测时间')
+
+    def to_dict(self):
+        return {
+            "city": self.city,
+            "count": self.prediction_count,
+            "last_prediction_time": self.last_prediction_time.isoformat() if self.last_prediction_time else None,
+        }
+
+
+class CityPredictionDailyRollup(Base):
+    """城市预测按天汇总（写入预测记录时增量维护，供历史汇总统计读取）"""
+    __tablename__ = "city_prediction_daily_rollups"
+
+    user_id = Column(Integer, primary_key=True, comment='用户ID')
+    city = Column(String(64), primary_key=True, comment='城市')
+    day = Column(Date, primary_key=True, comment='预测记录创建日期')
+    severity = Column(String(20), primary_key=True, comment='拥堵等级')
+    prediction_count = Column(Integer, nullable=False, default=0, comment='预测次数')
+    sum_flow = Column(BigInteger, nullable=False, default=0, comment='小时流量之和')
+    sum_speed = Column(Float, nullable=False, default=0, comment='平均车速之和')
+    sum_congestion_index = Column(Float, nullable=False, default=0, comment='拥堵指数之和')
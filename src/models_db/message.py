@@ -3,7 +3,7 @@
 包含系统公告和用户通知的数据模型
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.models_db.base import Base
@@ -47,6 +47,11 @@ class UserNotification(Base):
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
+    # 消息中心：按用户取最近的通知
+    __table_args__ = (
+        Index('idx_user_notifications_user_send', 'user_id', 'send_time', 'id'),
+    )
+    
     def to_dict(self):
         """转换为字典"""
         return {
@@ -0,0 +1,175 @@
+"""
+带统计的数据库连接池
+在QueuePool的基础上记录取连接次数、等待时间、溢出连接使用和连接存活时长，
+供定时日志与管理接口查看，用于按进程调整连接池大小。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 计算分位数时保留的最近样本数
+RECENT_SAMPLES = 1000
+
+
+def _percentile(values, q: float) -> float:
+    """最近样本的分位数（样本为空时返回0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PoolMetrics:
+    """连接池统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.max_age = 0.0
+            self._waits = deque(maxlen=RECENT_SAMPLES)
+            self._ages = deque(maxlen=RECENT_SAMPLES)
+            self.since = time.time()
+
+    def record_checkout(self, wait: float, age: float, checked_out: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.max_age = max(self.max_age, age)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self._waits.append(wait)
+            self._ages.append(age)
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._waits.append(wait)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> Dict:
+        """统计快照（时间单位：等待为毫秒，存活时长为秒）"""
+        with self._lock:
+            waits = list(self._waits)
+            ages = list(self._ages)
+            attempts = self.checkouts + self.timeouts
+            return {
+                'since': self.since,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'timeouts': self.timeouts,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': self.peak_overflow,
+                'wait_ms': {
+                    'avg': round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                    'p95': round(_percentile(waits, 0.95) * 1000, 3),
+                    'max': round(self.max_wait * 1000, 3),
+                },
+                'connection_age_s': {
+                    'avg': round(sum(ages) / len(ages), 1) if ages else 0.0,
+                    'max': round(self.max_age, 1),
+                },
+            }
+
+
+class InstrumentedPoolMixin:
+    """
+    记录连接池统计的混入类
+
+    取连接等待时间在公开的 connect() 中计时；归还与新建连接通过 checkin/connect 池事件计数。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # 构造参数（来自 build_engine_options），用于状态展示
+        self.settings = {
+            'max_overflow': kwargs.get('max_overflow'),
+            'recycle': kwargs.get('recycle'),
+        }
+        metrics = self.metrics
+        event.listen(self, 'checkin', lambda dbapi_connection, connection_record: metrics.record_checkin())
+        event.listen(self, 'connect', lambda dbapi_connection, connection_record: metrics.record_connect())
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            fairy = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+
+        record = getattr(fairy, '_connection_record', None)
+        starttime = getattr(record, 'starttime', 0) or 0
+        age = time.time() - starttime if starttime else 0.0
+        self.metrics.record_checkout(
+            time.perf_counter() - start,
+            age,
+            self.checkedout(),
+            max(self.overflow(), 0)
+        )
+        return fairy
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """带统计的QueuePool（同步引擎）"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """带统计的AsyncAdaptedQueuePool（异步引擎）"""
+
+
+def pool_status(pool) -> Optional[Dict]:
+    """
+    连接池当前状态与累计统计
+
+    Returns:
+        非QueuePool（如SQLite的单线程池）只返回类型名
+    """
+    if pool is None:
+        return None
+
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        settings = getattr(pool, 'settings', {})
+        status.update({
+            'pool_size': pool.size(),
+            'max_overflow': settings.get('max_overflow'),
+            'timeout': pool.timeout(),
+            'recycle': settings.get('recycle'),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        status['metrics'] = metrics.snapshot()
+    return status
@@ -2,9 +2,9 @@
 预测结果表ORM模型
 """
 
-from sqlalchemy import Column, BigInteger, Integer, Float, String, DateTime, Enum, TIMESTAMP
+from sqlalchemy import Column, Integer, Float, String, DateTime, TIMESTAMP, Index
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, BigIntegerPK, portable_enum
 import enum
 
 
@@ -21,7 +21,7 @@ class Prediction(Base):
     __tablename__ = 'predictions'
     
     # 主键
-    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='主键ID')
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True, comment='主键ID')
     
     # 基本信息
     sensor_id = Column(Integer, nullable=False, index=True, comment='传感器ID')
@@ -38,11 +38,11 @@ class Prediction(Base):
     
     # 拥堵状态预测
     congestion_prediction = Column(
-        Enum('畅通', '正常', '拥堵', '严重拥堵', name='congestion_enum'),
+        portable_enum('畅通', '正常', '拥堵', '严重拥堵', name='predicted_congestion_enum'),
         comment='拥堵状态预测'
     )
     congestion_actual = Column(
-        Enum('畅通', '正常', '拥堵', '严重拥堵', name='congestion_enum'),
+        portable_enum('畅通', '正常', '拥堵', '严重拥堵', name='actual_congestion_enum'),
         default=None,
         comment='实际拥堵状态'
     )
@@ -58,6 +58,13 @@ class Prediction(Base):
         comment='创建时间'
     )
     
+    # 游标分页索引：按 (created_at, id) 倒序翻页；拥堵分布统计按 congestion_prediction 分组
+    __table_args__ = (
+        Index('idx_predictions_sensor_created', 'sensor_id', 'created_at', 'id'),
+        Index('idx_predictions_created', 'created_at', 'id'),
+        Index('idx_predictions_congestion', 'congestion_prediction'),
+    )
+    
     def __repr__(self):
         return (f"<Prediction(id={self.id}, sensor_id={self.sensor_id}, "
                 f"target_time={self.target_time}, "
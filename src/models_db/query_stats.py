@@ -0,0 +1,244 @@
+"""
+SQL语句耗时统计与慢查询日志
+通过引擎的 before/after_cursor_execute 事件为每条语句计时，
+按归一化语句（字面量替换为?）累计延迟直方图；超过阈值的语句
+打印日志并保留最近记录（参数只保留类型和长度，不记录取值）。
+"""
+
+import re
+import threading
+import time
+from functools import lru_cache
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+# 直方图桶上界（毫秒），最后一个桶收纳更慢的语句
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# 最多单独统计的语句种类数，超出后归入 OTHER_STATEMENT
+MAX_STATEMENTS = 500
+OTHER_STATEMENT = '<other>'
+
+# 保留的慢查询条数
+SLOW_LOG_SIZE = 100
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\bVALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=MAX_STATEMENTS)
+def normalize_statement(statement: str) -> str:
+    """
+    归一化SQL语句：合并空白，字面量替换为?，折叠IN列表与多行VALUES
+
+    同一查询不同参数的执行归为一类统计。SQLAlchemy 对同一查询反复生成相同的
+    编译语句，因此结果按原语句缓存，正则只在首次出现时执行。
+    """
+    text = _WHITESPACE.sub(' ', statement).strip()
+    text = _STRING_LITERAL.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _IN_LIST.sub('IN (...)', text)
+    text = _VALUES_ROWS.sub(r'\1, ...', text)
+    return text
+
+
+def _redact_value(value: Any) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__}:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """参数脱敏：只保留类型和长度；批量执行时只展示第一行和行数"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = redact_parameters(parameters[0]) if parameters else None
+        return {'rows': len(parameters), 'first': first}
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+class StatementStats:
+    """单类语句的累计统计"""
+
+    __slots__ = ('count', 'errors', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float):
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q: float) -> float:
+        """按直方图估算分位数（返回所在桶的上界，最后一个桶返回最大值）"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(min(LATENCY_BUCKETS_MS[index], self.max))
+                break
+        return self.max
+
+    def to_dict(self) -> Dict:
+        histogram = {f'le_{bound}ms': count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        histogram['inf'] = self.buckets[-1]
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p95_ms': round(self.percentile(0.95), 3),
+            'max_ms': round(self.max, 3),
+            'histogram': histogram,
+        }
+
+
+class QueryMonitor:
+    """按归一化语句统计耗时，并记录慢查询（线程安全）"""
+
+    ORDER_KEYS = ('total_ms', 'avg_ms', 'p95_ms', 'max_ms', 'count')
+
+    def __init__(self, slow_query_threshold: float = 1.0, log_slow_queries: bool = True):
+        self._lock = threading.Lock()
+        self.slow_query_threshold = slow_query_threshold
+        self.log_slow_queries = log_slow_queries
+        self.reset()
+
+    def configure(self, slow_query_threshold: Optional[float] = None, log_slow_queries: Optional[bool] = None):
+        """更新慢查询阈值（秒）和日志开关"""
+        if slow_query_threshold is not None:
+            self.slow_query_threshold = float(slow_query_threshold)
+        if log_slow_queries is not None:
+            self.log_slow_queries = bool(log_slow_queries)
+
+    def reset(self):
+        """清空统计与慢查询记录"""
+        with self._lock:
+            self._statements: Dict[str, StatementStats] = {}
+            self._slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+            self.since = time.time()
+
+    def _stats_for(self, key: str) -> StatementStats:
+        """按归一化语句取统计（调用方持有锁）"""
+        stats = self._statements.get(key)
+        if stats is None:
+            if len(self._statements) >= MAX_STATEMENTS:
+                key = OTHER_STATEMENT
+                stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats()
+        return stats
+
+    def record(self, statement: str, parameters: Any, duration: float, executemany: bool = False):
+        """记录一次语句执行（duration单位：秒）"""
+        duration_ms = duration * 1000
+        # 归一化在锁外完成，锁只保护字典查找与直方图更新
+        key = normalize_statement(statement)
+        with self._lock:
+            self._stats_for(key).add(duration_ms)
+
+        if duration < self.slow_query_threshold:
+            return
+
+        entry = {
+            'statement': key,
+            'duration_ms': round(duration_ms, 3),
+            'parameters': redact_parameters(parameters, executemany),
+            'time': time.time(),
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        if self.log_slow_queries:
+            print(f"🐢 [SLOW QUERY] {entry['duration_ms']:.1f}ms: {entry['statement']} params={entry['parameters']}")
+
+    def record_error(self, statement: str):
+        """记录一次执行失败"""
+        key = normalize_statement(statement)
+        with self._lock:
+            self._stats_for(key).errors += 1
+
+    def top_statements(self, limit: int = 20, order_by: str = 'total_ms') -> List[Dict]:
+        """按指定指标倒序返回前N类语句"""
+        if order_by not in self.ORDER_KEYS:
+            raise ValueError(f"order_by 只能是 {', '.join(self.ORDER_KEYS)}")
+        with self._lock:
+            rows = [{'statement': key, **stats.to_dict()} for key, stats in self._statements.items()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def slow_queries(self, limit: int = 20) -> List[Dict]:
+        """最近的慢查询（最新在前）"""
+        with self._lock:
+            entries = list(self._slow_queries)
+        return entries[::-1][:limit]
+
+    def report(self, limit: int = 20, order_by: str = 'total_ms') -> Dict:
+        """统计报告"""
+        return {
+            'since': self.since,
+            'slow_query_threshold_ms': self.slow_query_threshold * 1000,
+            'statements': self.top_statements(limit, order_by),
+            'slow_queries': self.slow_queries(limit),
+        }
+
+
+# 全局语句统计实例（同步与异步引擎共用）
+query_monitor = QueryMonitor()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    query_monitor.record(statement, parameters, time.perf_counter() - starts.pop(), executemany)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    starts = connection.info.get('query_start_time') if connection is not None else None
+    if starts:
+        starts.pop()
+    if exception_context.statement:
+        query_monitor.record_error(exception_context.statement)
+
+
+def attach_query_monitor(engine):
+    """
+    为引擎注册语句计时事件
+
+    Args:
+        engine: 同步引擎（异步引擎传入 engine.sync_engine）
+    """
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
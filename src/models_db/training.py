@@ -2,9 +2,9 @@
 训练记录表ORM模型
 """
 
-from sqlalchemy import Column, Integer, Float, String, DateTime, Enum, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, Float, String, DateTime, Text, TIMESTAMP
 from sqlalchemy.sql import func
-from .base import Base
+from .base import Base, portable_enum
 import enum
 
 
@@ -56,7 +56,7 @@ class TrainingRecord(Base):
     
     # 状态
     status = Column(
-        Enum('running', 'completed', 'failed', 'stopped', name='training_status_enum'),
+        portable_enum('running', 'completed', 'failed', 'stopped', name='training_status_enum'),
         default='running',
         index=True,
         comment='训练状态'
@@ -21,6 +21,8 @@ class User(Base):
     last_login_ip = Column(String(50), comment='最后登录IP')
     login_count = Column(Integer, default=0, comment='登录次数')
     prediction_count = Column(Integer, default=0, comment='预测次数')
+    last_prediction_time = Column(DateTime, comment='最后预测时间')
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default='0', comment='未读通知数（创建通知/标记已读时增减）')
     
     # 模型配置相关
     model_type = Column(String(20), default='lstm', comment='选择的模型类型：lstm/gru/ml-hgstn/transformer/tcn')
@@ -51,6 +53,7 @@ class User(Base):
             'last_login_ip': self.last_login_ip,
             'login_count': self.login_count,
             'prediction_count': self.prediction_count,
+            'last_prediction_time': self.last_prediction_time.isoformat() if self.last_prediction_time else None,
             'model_type': self.model_type,
             'weather_sensitivity': self.weather_sensitivity,
             'time_sensitivity': self.time_sensitivity,
@@ -0,0 +1,221 @@
+"""
+共形预测（Conformal Prediction）区间
+基于验证集残差分位数的校准预测区间
+"""
+
+import numpy as np
+import torch
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class ConformalCalibrator:
+    """
+    共形预测校准器
+
+    离线在验证集上计算绝对残差的分位数，按（覆盖水平, 传感器, 时段桶, 特征）
+    存成一张紧凑的查找表，随模型检查点一起保存。
+    在线推理时，区间半宽只需一次数组索引即可得到。
+    """
+
+    def __init__(
+        self,
+        levels: Sequence[float] = (0.8, 0.9, 0.95),
+        num_buckets: int = 24,
+        steps_per_day: int = 288
+    ):
+        """
+        初始化校准器
+
+        Args:
+            levels: 覆盖水平列表（如0.9表示90%预测区间）
+            num_buckets: 一天划分的时段桶数（24即按小时）
+            steps_per_day: 每天的时间步数（5分钟间隔为288）
+        """
+        self.levels = tuple(float(level) for level in levels)
+        self.num_buckets = num_buckets
+        self.steps_per_day = steps_per_day
+
+        # 分位数表 (levels, sensors, buckets, features)
+        self.quantiles: Optional[np.ndarray] = None
+        # 汇总所有传感器的分位数表 (levels, buckets, features)，用于未知传感器
+        self.pooled: Optional[np.ndarray] = None
+
+    def time_bucket(self, time_index: int) -> int:
+        """时间步索引 -> 时段桶编号"""
+        step_of_day = int(time_index) % self.steps_per_day
+        return step_of_day * self.num_buckets // self.steps_per_day
+
+    def _time_buckets(self, time_indices: np.ndarray) -> np.ndarray:
+        """向量化计算时段桶编号"""
+        return (time_indices % self.steps_per_day) * self.num_buckets // self.steps_per_day
+
+    @staticmethod
+    def _conformal_quantiles(residuals: np.ndarray, levels: Sequence[float]) -> np.ndarray:
+        """
+        计算带有限样本修正的共形分位数
+
+        Args:
+            residuals: 绝对残差 (n, ...)
+            levels: 覆盖水平
+
+        Returns:
+            分位数 (len(levels), ...)
+        """
+        n = residuals.shape[0]
+        if n == 0:
+            return np.full((len(levels),) + residuals.shape[1:], np.nan, dtype=np.float32)
+
+        # ceil((n+1) * level) / n，保证有限样本下的覆盖率
+        q = np.minimum(np.ceil((n + 1) * np.asarray(levels)) / n, 1.0)
+        return np.quantile(residuals, q, axis=0, method='higher').astype(np.float32)
+
+    def fit_residuals(self, residuals: np.ndarray, time_indices: np.ndarray):
+        """
+        由残差构建分位数查找表
+
+        Args:
+            residuals: 绝对残差 (num_windows, num_sensors, num_features)
+            time_indices: 每个窗口预测目标的时间步索引 (num_windows,)
+        """
+        num_sensors, num_features = residuals.shape[1], residuals.shape[2]
+        buckets = self._time_buckets(np.asarray(time_indices))
+
+        self.quantiles = np.full(
+            (len(self.levels), num_sensors, self.num_buckets, num_features),
+            np.nan,
+            dtype=np.float32
+        )
+        self.pooled = np.full(
+            (len(self.levels), self.num_buckets, num_features),
+            np.nan,
+            dtype=np.float32
+        )
+
+        for b in range(self.num_buckets):
+            bucket_res = residuals[buckets == b]
+            # (levels, sensors, features)
+            self.quantiles[:, :, b, :] = self._conformal_quantiles(bucket_res, self.levels)
+            # 所有传感器混合: (levels, features)
+            self.pooled[:, b, :] = self._conformal_quantiles(
+                bucket_res.reshape(-1, num_features), self.levels
+            )
+
+        # 样本不足的桶用全天分位数填充
+        overall = self._conformal_quantiles(residuals.reshape(-1, num_features), self.levels)
+        self.pooled = np.where(np.isnan(self.pooled), overall[:, None, :], self.pooled)
+        self.quantiles = np.where(
+            np.isnan(self.quantiles), self.pooled[:, None, :, :], self.quantiles
+        )
+
+        return self
+
+    @torch.no_grad()
+    def fit(
+        self,
+        model: torch.nn.Module,
+        data: np.ndarray,
+        lookback: int = 12,
+        time_offset: int = 0,
+        device: torch.device = None,
+        batch_size: int = 8192
+    ):
+        """
+        在验证集上计算残差并构建查找表
+
+        Args:
+            model: 已训练的模型
+            data: 验证集数据 (timesteps, num_sensors, num_features)
+            lookback: 历史窗口大小
+            time_offset: data第0步在完整数据集中的时间步索引
+            device: 计算设备
+            batch_size: 推理批大小
+
+        Returns:
+            self
+        """
+        device = device or torch.device('cpu')
+        num_steps, num_sensors, num_features = data.shape
+
+        # (num_steps - lookback + 1, sensors, features, lookback)，零拷贝滑动窗口
+        windows = np.lib.stride_tricks.sliding_window_view(data, lookback, axis=0)
+        windows = windows[:-1]  # 最后一个窗口没有预测目标
+        num_windows = windows.shape[0]
+
+        # (num_windows * sensors, lookback, features)
+        inputs = windows.transpose(0, 1, 3, 2).reshape(-1, lookback, num_features)
+        targets = data[lookback:].reshape(-1, num_features)
+
+        model.eval()
+        predictions = np.empty_like(targets, dtype=np.float32)
+        for start in range(0, len(inputs), batch_size):
+            batch = torch.as_tensor(
+                np.ascontiguousarray(inputs[start:start + batch_size]),
+                dtype=torch.float32,
+                device=device
+            )
+            predictions[start:start + batch_size] = model(batch)[:, :num_features].cpu().numpy()
+
+        residuals = np.abs(predictions - targets).reshape(num_windows, num_sensors, num_features)
+        time_indices = time_offset + lookback + np.arange(num_windows)
+
+        return self.fit_residuals(residuals, time_indices)
+
+    def lookup(
+        self,
+        sensor_index: Optional[int],
+        time_index: int,
+        level: float = 0.9
+    ) -> Tuple[float, np.ndarray]:
+        """
+        查询区间半宽
+
+        Args:
+            sensor_index: 传感器索引（None或超出范围时使用汇总表）
+            time_index: 预测目标的时间步索引
+            level: 覆盖水平（取不低于该值的最近水平）
+
+        Returns:
+            (实际覆盖水平, 各特征区间半宽 (features,))
+        """
+        if self.quantiles is None:
+            raise ValueError("尚未校准，请先调用fit()")
+
+        candidates = [i for i, value in enumerate(self.levels) if value >= level]
+        level_idx = candidates[0] if candidates else len(self.levels) - 1
+        bucket = self.time_bucket(time_index)
+
+        if sensor_index is not None and 0 <= sensor_index < self.quantiles.shape[1]:
+            half_width = self.quantiles[level_idx, sensor_index, bucket]
+        else:
+            half_width = self.pooled[level_idx, bucket]
+
+        return self.levels[level_idx], half_width
+
+    def to_dict(self) -> Dict:
+        """
+        序列化为可写入检查点的字典
+
+        数组以tensor形式保存，兼容torch.load(weights_only=True)
+        """
+        if self.quantiles is None:
+            raise ValueError("尚未校准，请先调用fit()")
+
+        return {
+            'levels': list(self.levels),
+            'num_buckets': self.num_buckets,
+            'steps_per_day': self.steps_per_day,
+            'quantiles': torch.from_numpy(self.quantiles),
+            'pooled': torch.from_numpy(self.pooled),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'ConformalCalibrator':
+        """从检查点字典恢复校准器"""
+        calibrator = cls(
+            levels=state['levels'],
+            num_buckets=state['num_buckets'],
+            steps_per_day=state['steps_per_day']
+        )
+        calibrator.quantiles = np.asarray(state['quantiles'], dtype=np.float32)
+        calibrator.pooled = np.asarray(state['pooled'], dtype=np.float32)
+        return calibrator
@@ -10,12 +10,21 @@ sys.path.insert(0, str(project_root))
 
 from src.models.lstm import LSTMPredictor
 from src.models.gru import GRUPredictor
+from src.prediction.conformal import ConformalCalibrator
 
 
 class TrafficPredictor:
     """交通流预测器"""
     
-    def __init__(self, model_path: str, model_type: str = 'lstm', device: str = None):
+    def __init__(
+        self,
+        model_path: str,
+        model_type: str = 'lstm',
+        device: str = None,
+        mc_samples: int = 20,
+        uncertainty: str = 'auto',
+        interval_level: float = 0.9
+    ):
         """
         初始化预测器
         
@@ -23,8 +32,17 @@ class TrafficPredictor:
             model_path: 模型文件路径
             model_type: 模型类型（lstm/gru）
             device: 计算设备
+            mc_samples: MC Dropout采样次数（<=1时关闭，置信度不可用）
+            uncertainty: 不确定性估计方式
+                - 'auto': 检查点带有共形校准表时使用conformal，否则使用mc_dropout
+                - 'conformal': 查表得到校准的预测区间（单次前向）
+                - 'mc_dropout': MC Dropout批量采样
+            interval_level: 共形预测区间的覆盖水平
         """
         self.model_type = model_type
+        self.mc_samples = mc_samples
+        self.interval_level = interval_level
+        self.conformal = None
         self.device = torch.device(device if device else 
                                    ('cuda' if torch.cuda.is_available() else 'cpu'))
         
@@ -32,9 +50,16 @@ class TrafficPredictor:
         self.model = self._load_model(model_path)
         self.model.eval()
         
+        if uncertainty == 'auto':
+            uncertainty = 'conformal' if self.conformal is not None else 'mc_dropout'
+        elif uncertainty == 'conformal' and self.conformal is None:
+            raise ValueError("检查点中没有共形校准表，请先运行: python src/scripts/calibrate_conformal.py")
+        self.uncertainty = uncertainty
+        
         print(f"✅ 预测器初始化完成")
         print(f"   模型类型: {model_type.upper()}")
         print(f"   设备: {self.device}")
+        print(f"   不确定性: {self.uncertainty}")
     
     def _load_model(self, model_path: str):
         """加载模型"""
@@ -55,6 +80,10 @@ class TrafficPredictor:
         model.load_state_dict(checkpoint['model_state_dict'])
         model.to(self.device)
         
+        # 共形预测残差分位数表（由calibrate_conformal.py写入检查点）
+        if 'conformal' in checkpoint:
+            self.conformal = ConformalCalibrator.from_dict(checkpoint['conformal'])
+        
         return model
     
     def predict(
@@ -62,7 +91,9 @@ class TrafficPredictor:
         input_data: np.ndarray, 
         sensor_id: str = None,
         save_to_db: bool = False,
-        target_time: datetime = None
+        target_time: datetime = None,
+        sensor_index: int = None,
+        time_index: int = None
     ) -> dict:
         """
         预测交通流
@@ -72,6 +103,8 @@ class TrafficPredictor:
             sensor_id: 传感器ID（用于数据库保存）
             save_to_db: 是否保存到数据库
             target_time: 目标预测时间
+            sensor_index: 传感器索引（共形区间查表用，默认从sensor_id解析）
+            time_index: 预测目标在数据集中的时间步索引（共形区间查表用，默认取target_time的时刻）
         
         Returns:
             预测结果字典
@@ -82,13 +115,27 @@ class TrafficPredictor:
         
         input_tensor = torch.FloatTensor(input_data).to(self.device)
         
-        # 预测
+        # 预测（MC Dropout：K次采样合并为一次批量前向；共形模式只需一次普通前向）
         prediction_start_time = datetime.now()
-        with torch.no_grad():
-            output = self.model(input_tensor)
+        use_conformal = self.uncertainty == 'conformal'
+        mean, std = self._forward_with_uncertainty(input_tensor, mc=not use_conformal)
+        
+        # 移除batch维度
+        prediction = mean[0]
+        prediction_std = std[0] if std is not None else None
         
-        # 转换为numpy
-        prediction = output.cpu().numpy()[0]  # 移除batch维度
+        # 共形区间：一次数组索引得到区间半宽
+        interval = None
+        spread = prediction_std
+        if use_conformal:
+            if sensor_index is None:
+                sensor_index = self._parse_sensor_index(sensor_id)
+            if time_index is None:
+                moment = target_time or prediction_start_time
+                time_index = (moment.hour * 60 + moment.minute) * self.conformal.steps_per_day // 1440
+            level, half_width = self.conformal.lookup(sensor_index, time_index, self.interval_level)
+            spread = half_width[:len(prediction)]
+            interval = self._format_interval(prediction, spread, level)
         
         # 解析预测结果
         flow_pred = float(prediction[0])
@@ -104,7 +151,9 @@ class TrafficPredictor:
             'speed': speed_pred,
             'congestion_status': congestion_status,
             'congestion_level': self._get_congestion_level(congestion_status),
-            'confidence': 0.85,  # 简化版本，实际应该基于模型不确定性
+            'confidence': self._calculate_confidence(prediction, spread),
+            'uncertainty': self._format_uncertainty(prediction_std),
+            'interval': interval,
             'prediction_time': prediction_start_time.isoformat(),
             'model_type': self.model_type.upper(),
             'sensor_id': sensor_id
@@ -146,26 +195,90 @@ class TrafficPredictor:
         
         input_tensor = torch.FloatTensor(input_data).to(self.device)
         
-        with torch.no_grad():
-            outputs = self.model(input_tensor)
+        predictions, stds = self._forward_with_uncertainty(
+            input_tensor, mc=self.uncertainty == 'mc_dropout'
+        )
         
-        predictions = outputs.cpu().numpy()
+        # 共形模式下批量输入没有传感器信息，使用当前时段的汇总分位数
+        pooled_width = None
+        if self.uncertainty == 'conformal':
+            now = datetime.now()
+            time_index = (now.hour * 60 + now.minute) * self.conformal.steps_per_day // 1440
+            pooled_width = self.conformal.lookup(None, time_index, self.interval_level)[1]
         
         results = []
-        for pred in predictions:
+        for i, pred in enumerate(predictions):
             flow_pred = float(pred[0])
             density_pred = float(pred[1]) if len(pred) > 1 else 0.0
             congestion = self._calculate_congestion(flow_pred, density_pred)
             
+            if pooled_width is not None:
+                spread = pooled_width[:len(pred)]
+            else:
+                spread = stds[i] if stds is not None else None
+            
             results.append({
                 'flow': flow_pred,
                 'density': density_pred,
                 'congestion_status': congestion,
-                'congestion_level': self._get_congestion_level(congestion)
+                'congestion_level': self._get_congestion_level(congestion),
+                'confidence': self._calculate_confidence(pred, spread)
             })
         
         return results
     
+    def _forward_with_uncertainty(self, input_tensor: torch.Tensor, mc: bool = True):
+        """
+        前向推理，返回均值和标准差（numpy数组）
+        
+        mc为True且mc_samples > 1 时使用MC Dropout一次批量前向；否则退化为普通推理，std为None
+        """
+        if mc and self.mc_samples and self.mc_samples > 1:
+            mean, std = self.model.mc_dropout_forward(input_tensor, self.mc_samples)
+            return mean.cpu().numpy(), std.cpu().numpy()
+        
+        with torch.no_grad():
+            output = self.model(input_tensor)
+        return output.cpu().numpy(), None
+    
+    def _calculate_confidence(self, mean: np.ndarray, spread: np.ndarray = None) -> float:
+        """
+        根据预测的离散程度计算置信度
+        
+        spread为MC Dropout标准差或共形区间半宽。使用各输出的相对离散度均值 cv，
+        置信度 = 1 / (1 + cv)，取值范围(0, 1]，离散度越小置信度越高
+        """
+        if spread is None:
+            return 0.85  # 未启用不确定性估计时沿用默认值
+        
+        cv = float(np.mean(np.abs(spread) / (np.abs(mean) + 1e-6)))
+        return round(1.0 / (1.0 + cv), 4)
+    
+    def _format_interval(self, mean: np.ndarray, half_width: np.ndarray, level: float) -> dict:
+        """格式化共形预测区间"""
+        interval = {'level': level}
+        for key, center, width in zip(['flow', 'density', 'speed'], mean, half_width):
+            interval[key] = [float(center - width), float(center + width)]
+        return interval
+    
+    @staticmethod
+    def _parse_sensor_index(sensor_id: str = None):
+        """从 "sensor_012" 形式的ID解析传感器索引"""
+        if sensor_id and sensor_id.startswith("sensor_"):
+            try:
+                return int(sensor_id.split("_")[1])
+            except ValueError:
+                return None
+        return None
+    
+    def _format_uncertainty(self, std: np.ndarray = None) -> dict:
+        """格式化各输出的标准差"""
+        if std is None:
+            return None
+        
+        keys = ['flow_std', 'density_std', 'speed_std']
+        return {key: float(value) for key, value in zip(keys, std)}
+    
     def _calculate_congestion(self, flow: float, density: float) -> int:
         """
         计算拥堵状态
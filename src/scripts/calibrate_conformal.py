@@ -0,0 +1,70 @@
+"""共形预测区间校准脚本
+
+在验证集上计算每个传感器、每个时段桶的残差分位数，
+并把查找表写回模型检查点，供TrafficPredictor在线查表使用。
+
+用法: python src/scripts/calibrate_conformal.py [lstm|gru]
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import torch
+
+from src.data.loader import TrafficDataLoader
+from src.data.preprocessor import TrafficDataPreprocessor
+from src.data.cache import load_processed_data
+from src.data.dataset import prepare_traffic_data
+from src.prediction.predictor import TrafficPredictor
+from src.prediction.conformal import ConformalCalibrator
+from src.utils.config import config
+
+
+def main(model_name: str = 'lstm'):
+    print(f"=== 共形预测区间校准 - {model_name.upper()} ===\n")
+
+    model_path = Path(config.get('paths.models_best')) / f'{model_name}_best.pth'
+    if not model_path.exists():
+        raise FileNotFoundError(f"模型文件不存在: {model_path}")
+
+    # 1. 加载数据
+    print("1. 加载数据...")
+    loader = TrafficDataLoader()
+
+    # 2. 预处理（与训练保持一致，共用预处理缓存）
+    print("\n2. 数据预处理...")
+    preprocessor = TrafficDataPreprocessor()
+    processed = load_processed_data(loader, preprocessor, save_scaler=False)
+
+    # 3. 划分数据集（保留传感器维度，按传感器校准）
+    print("\n3. 准备验证集...")
+    train_data, val_data, _ = prepare_traffic_data(processed, simplified=False)
+
+    # 4. 计算残差分位数
+    print("\n4. 计算验证集残差分位数...")
+    predictor = TrafficPredictor(str(model_path), model_name, uncertainty='mc_dropout')
+    calibrator = ConformalCalibrator()
+    calibrator.fit(
+        predictor.model,
+        val_data,
+        lookback=12,
+        time_offset=len(train_data),
+        device=predictor.device
+    )
+
+    # 5. 写回检查点
+    print("\n5. 写入检查点...")
+    checkpoint = torch.load(model_path, map_location='cpu')
+    checkpoint['conformal'] = calibrator.to_dict()
+    torch.save(checkpoint, model_path)
+
+    table_kb = calibrator.quantiles.nbytes / 1024
+    print(f"\n✅ 校准完成！")
+    print(f"   覆盖水平: {list(calibrator.levels)}")
+    print(f"   查找表形状: {calibrator.quantiles.shape} ({table_kb:.1f} KB)")
+    print(f"   已写入: {model_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'lstm')
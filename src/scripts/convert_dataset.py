@@ -0,0 +1,37 @@
+"""数据集转换脚本：NPZ -> float32 特征优先内存映射文件
+
+用法: python src/scripts/convert_dataset.py [npz文件...]（默认转换数据目录下所有 .npz）
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data.storage import convert_npz, is_current
+from src.utils.config import config
+
+
+def main():
+    if len(sys.argv) > 1:
+        sources = [Path(arg) for arg in sys.argv[1:]]
+    else:
+        sources = sorted(Path(config.get('paths.data_raw')).glob('*.npz'))
+
+    if not sources:
+        print("[WARN] 没有找到需要转换的NPZ文件")
+        return
+
+    for source in sources:
+        if not source.exists():
+            print(f"[ERROR] 文件不存在: {source}")
+            continue
+        if is_current(source):
+            print(f"✓ {source.name} 已是最新，跳过")
+            continue
+        convert_npz(source)
+
+    print("\n✅ 转换完成")
+
+
+if __name__ == "__main__":
+    main()
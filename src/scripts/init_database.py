@@ -12,7 +12,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.utils.config import get_database_url, config
-from src.models_db.base import init_database, Base
+from src.models_db.base import init_database, Base, get_database_backend
 from src.models_db.prediction import Prediction
 from src.models_db.training import TrainingRecord
 from src.models_db.api_log import APILog, ModelPerformance, SystemConfig
@@ -63,12 +63,9 @@ def create_database():
 def create_tables():
     """使用SQLAlchemy创建所有表"""
     try:
-        # 获取数据库URL
-        database_url = get_database_url()
-        print(f"📍 连接数据库: {database_url.split('@')[1]}")  # 隐藏密码
-        
-        # 初始化数据库连接
-        db_conn = init_database(database_url)
+        # 初始化数据库连接（DB_BACKEND=sqlite 时使用本地SQLite文件）
+        db_conn = init_database(get_database_url())
+        print(f"📍 连接数据库: {db_conn.engine.url.render_as_string(hide_password=True)}")
         
         # 创建所有表
         print("🔨 开始创建数据库表...")
@@ -211,7 +208,10 @@ def main():
     from dotenv import load_dotenv
     load_dotenv()
     
-    if not os.getenv('MYSQL_USER'):
+    sqlite_mode = get_database_backend() == 'sqlite'
+    if sqlite_mode:
+        print("💾 SQLite本地模式（DB_BACKEND=sqlite），跳过MySQL建库")
+    elif not os.getenv('MYSQL_USER'):
         print("⚠️  警告: 未找到.env文件或环境变量未设置")
         print("请创建.env文件并配置数据库信息")
         print("\n示例:")
@@ -220,10 +220,10 @@ def main():
         print("MYSQL_DATABASE=traffic_db")
         return
     
-    # 步骤1: 创建数据库
+    # 步骤1: 创建数据库（SQLite文件在连接时自动创建）
     print("步骤 1/4: 创建数据库")
     print("-" * 60)
-    if not create_database():
+    if not sqlite_mode and not create_database():
         print("\n❌ 数据库初始化失败")
         return
     
@@ -0,0 +1,38 @@
+"""分区维护与过期数据清理脚本
+
+按 configs/database.yaml 的保留策略维护 predictions / api_logs：
+MySQL分区表预建未来分区并删除过期分区，其余情况分批限速删除过期行。
+建议每天由定时任务执行一次。
+
+用法: python src/scripts/maintain_partitions.py [表名 ...]
+"""
+import sys
+import time
+from pathlib import Path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.db_utils import get_db_manager
+from src.utils.partition_manager import PartitionManager
+
+
+def main(tables=None):
+    print("=== 分区维护与过期数据清理 ===\n")
+
+    get_db_manager()
+    manager = PartitionManager()
+
+    start = time.time()
+    for report in manager.run(tables):
+        print(f"📦 {report['table']}（保留 {report['retention_days']} 天，截止 {report['cutoff']}）")
+        if report['mode'] == 'partition':
+            print(f"   新建分区: {', '.join(report['created_partitions']) or '无'}")
+            print(f"   删除分区: {', '.join(report['dropped_partitions']) or '无'}")
+        else:
+            print(f"   分批删除: {report['deleted_rows']} 行")
+
+    print(f"\n✅ 维护完成！耗时: {time.time() - start:.2f}秒")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or None)
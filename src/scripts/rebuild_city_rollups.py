@@ -0,0 +1,30 @@
+"""城市预测按天汇总表重建脚本
+
+由city_predictions全量重建city_prediction_daily_rollups，
+用于首次回填或修复汇总数据。
+
+用法: python src/scripts/rebuild_city_rollups.py [user_id]
+"""
+import sys
+import time
+from pathlib import Path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.city_store import rebuild_city_rollups
+
+
+def main(user_id: int = None):
+    scope = f"用户 {user_id}" if user_id is not None else "全部用户"
+    print(f"=== 重建城市预测按天汇总 - {scope} ===\n")
+
+    start = time.time()
+    row_count = rebuild_city_rollups(user_id)
+
+    print(f"✅ 重建完成！")
+    print(f"   汇总行数: {row_count}")
+    print(f"   耗时: {time.time() - start:.2f}秒")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
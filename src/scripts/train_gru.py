@@ -6,6 +6,7 @@ sys.path.insert(0, str(project_root))
 
 from src.data.loader import TrafficDataLoader
 from src.data.preprocessor import TrafficDataPreprocessor
+from src.data.cache import load_processed_data
 from src.data.dataset import prepare_traffic_data, create_dataloaders
 from src.models.gru import GRUPredictor
 from src.training.trainer import ModelTrainer
@@ -16,12 +17,11 @@ def main():
     # 1. 加载数据
     print("1. 加载数据...")
     loader = TrafficDataLoader()
-    data = loader.load_data()
     
-    # 2. 预处理
+    # 2. 预处理（原始数据与预处理配置未变化时直接读取缓存）
     print("\n2. 数据预处理...")
     preprocessor = TrafficDataPreprocessor()
-    processed = preprocessor.process_data(data)
+    processed = load_processed_data(loader, preprocessor)
     
     # 3. 准备数据集
     print("\n3. 准备数据集...")
@@ -0,0 +1,228 @@
+"""
+异步数据库访问层
+供 async def 路由使用，查询不再阻塞事件循环。
+
+MySQL使用aiomysql驱动，本地SQLite使用aiosqlite驱动；
+连接URL与同步层相同（get_database_url），驱动自动替换。
+复杂查询通过 AsyncSession.run_sync 复用同步层的核心函数。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+import src.models_db.base as db_base
+from src.models_db.message import UserNotification
+from src.models_db.training import TrainingRecord
+from src.utils.config import get_database_url
+from src.utils.city_store import (
+    insert_city_prediction,
+    insert_city_predictions,
+    load_city_prediction_detail,
+    query_city_history_summary,
+    query_city_prediction_page,
+)
+from src.utils.message_store import (
+    ANNOUNCEMENT_CACHE_LIMIT,
+    cache_announcements,
+    deactivate_announcement,
+    get_cached_announcements,
+    insert_announcement,
+    insert_notifications,
+    invalidate_announcements,
+    mark_notification_read,
+    query_active_announcements,
+    query_notification_state,
+    query_unread_count,
+    query_user_notifications,
+)
+from src.utils.prediction_store import query_recent_prediction_page, query_sensor_prediction_page
+from src.utils.stats_store import query_system_stats
+
+
+def get_async_session():
+    """
+    获取异步数据库会话（首次调用时按配置初始化异步引擎）
+
+    用法:
+        async with get_async_session() as session:
+            ...
+    """
+    if not db_base.async_db_connection.initialized:
+        db_base.init_async_database(get_database_url())
+    return db_base.async_db_connection.get_session()
+
+
+class AsyncDatabaseManager:
+    """异步数据库管理器（与DatabaseManager的查询方法对应）"""
+
+    # ==================== 城市预测 ====================
+
+    async def create_city_prediction(self, record: Dict) -> int:
+        """保存一条城市预测记录（同一事务内更新用户预测统计），返回新记录ID"""
+        async with get_async_session() as session:
+            async with session.begin():
+                return await session.run_sync(insert_city_prediction, record)
+
+    async def create_city_predictions(self, records: List[Dict]) -> int:
+        """批量保存城市预测记录，返回写入的记录数"""
+        async with get_async_session() as session:
+            async with session.begin():
+                return await session.run_sync(insert_city_predictions, records)
+
+    async def get_city_prediction_stats(
+        self,
+        user_id: int,
+        range_days: int = 0,
+        city: Optional[str] = None
+    ) -> Dict:
+        """历史预测汇总统计（读取按天汇总表）"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_city_history_summary, user_id, range_days, city)
+
+    async def get_city_predictions(
+        self,
+        user_id: int,
+        limit: int = 100,
+        range_days: int = 0,
+        city: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """游标分页查询用户的城市预测记录，返回 (记录列表, 下一页游标)"""
+        async with get_async_session() as session:
+            return await session.run_sync(
+                query_city_prediction_page, user_id, limit, range_days, city, cursor
+            )
+
+    async def get_city_prediction_by_id(self, record_id: int) -> Optional[Dict]:
+        """读取单条城市预测记录详情"""
+        async with get_async_session() as session:
+            return await session.run_sync(load_city_prediction_detail, record_id)
+
+    # ==================== 传感器预测 ====================
+
+    async def get_predictions_by_sensor(
+        self,
+        sensor_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """游标分页查询指定传感器的预测记录"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_sensor_prediction_page, sensor_id, limit, cursor)
+
+    async def get_recent_predictions(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """游标分页查询最近的预测记录"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_recent_prediction_page, limit, cursor)
+
+    async def get_system_stats(self) -> Dict:
+        """在数据库端汇总系统统计"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_system_stats)
+
+    # ==================== 训练记录 ====================
+
+    async def get_training_history(self, limit: int = 10) -> List[Dict]:
+        """获取最近的训练记录"""
+        async with get_async_session() as session:
+            result = await session.execute(
+                select(TrainingRecord)
+                .order_by(TrainingRecord.start_time.desc(), TrainingRecord.id.desc())
+                .limit(limit)
+            )
+            return [record.to_dict() for record in result.scalars()]
+
+    # ==================== 消息中心 ====================
+
+    async def get_announcement_entry(self) -> Dict:
+        """系统公告缓存条目 {'announcements', 'version'}（未命中时查询并写入缓存）"""
+        entry = get_cached_announcements()
+        if entry is None:
+            async with get_async_session() as session:
+                announcements = await session.run_sync(query_active_announcements)
+            entry = cache_announcements(announcements)
+        return entry
+
+    async def get_system_announcements(self, limit: int = 50) -> List[Dict]:
+        """获取激活的系统公告（按发布时间倒序，优先读缓存）"""
+        if limit > ANNOUNCEMENT_CACHE_LIMIT:
+            async with get_async_session() as session:
+                return await session.run_sync(query_active_announcements, limit)
+        entry = await self.get_announcement_entry()
+        return entry['announcements'][:limit]
+
+    async def publish_announcement(self, title: str, content: str, publish_time=None) -> Dict:
+        """发布系统公告（提交后清除公告缓存）"""
+        async with get_async_session() as session:
+            async with session.begin():
+                announcement = await session.run_sync(insert_announcement, title, content, publish_time)
+        invalidate_announcements()
+        return announcement
+
+    async def deactivate_announcement(self, announcement_id: int) -> bool:
+        """停用系统公告（提交后清除公告缓存），公告不存在时返回False"""
+        async with get_async_session() as session:
+            async with session.begin():
+                success = await session.run_sync(deactivate_announcement, announcement_id)
+        invalidate_announcements()
+        return success
+
+    async def get_user_notifications(self, user_id: int, limit: int = 50) -> List[Dict]:
+        """获取用户通知（按发送时间倒序）"""
+        async with get_async_session() as session:
+            result = await session.execute(
+                select(UserNotification)
+                .where(UserNotification.user_id == user_id)
+                .order_by(UserNotification.send_time.desc(), UserNotification.id.desc())
+                .limit(limit)
+            )
+            return [notification.to_dict() for notification in result.scalars()]
+
+    async def get_user_notifications_with_unread(self, user_id: int, limit: int = 50) -> Tuple[List[Dict], int]:
+        """一条查询取出用户最近的通知和未读数，返回 (通知列表, 未读数)"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_user_notifications, user_id, limit)
+
+    async def get_notification_state(self, user_id: int) -> Tuple[int, int]:
+        """通知状态 (未读数, 最新通知ID)，用于生成ETag"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_notification_state, user_id)
+
+    async def get_unread_notification_count(self, user_id: int) -> int:
+        """获取用户未读通知数量（读取users表计数器）"""
+        async with get_async_session() as session:
+            return await session.run_sync(query_unread_count, user_id)
+
+    async def create_notifications(self, notifications: List[Dict]) -> int:
+        """批量创建用户通知（同一事务内增加未读计数），返回创建数"""
+        async with get_async_session() as session:
+            async with session.begin():
+                return await session.run_sync(insert_notifications, notifications)
+
+    async def mark_notification_as_read(self, notification_id: int, user_id: int) -> bool:
+        """标记用户自己的通知为已读，通知不存在或不属于该用户时返回False"""
+        async with get_async_session() as session:
+            async with session.begin():
+                return await session.run_sync(mark_notification_read, user_id, notification_id)
+
+
+_async_db_manager: Optional[AsyncDatabaseManager] = None
+
+
+def get_async_db_manager() -> AsyncDatabaseManager:
+    """获取全局异步数据库管理器"""
+    global _async_db_manager
+    if _async_db_manager is None:
+        _async_db_manager = AsyncDatabaseManager()
+    return _async_db_manager
+
+
+async def close_async_database():
+    """关闭异步数据库连接（应用关闭时调用）"""
+    if db_base.async_db_connection.initialized:
+        await db_base.async_db_connection.close()
@@ -0,0 +1,158 @@
+"""
+头像存储
+- 上传文件在工作线程中分块复制到临时文件并同时计算SHA-256，超过大小限制立即中止
+- 按内容哈希命名（static/avatars/<sha256>.<ext>），相同图片只保存一份
+- 缩放与缩略图生成在有界线程池中执行，并发上传不会占满内存或阻塞事件循环
+- 先写缩略图再写头像，头像文件存在即表示该图片已完整保存
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+
+project_root = Path(__file__).parent.parent.parent
+
+AVATAR_DIR = project_root / "static" / "avatars"
+AVATAR_URL_PREFIX = "/static/avatars"
+
+MAX_AVATAR_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# 头像最长边与缩略图尺寸（像素）
+AVATAR_SIZE = 256
+THUMBNAIL_SIZE = 64
+
+_image_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('AVATAR_WORKERS', '2')),
+    thread_name_prefix='avatar'
+)
+
+
+class AvatarTooLargeError(ValueError):
+    """头像文件超过大小限制"""
+
+
+def _copy_and_hash(source, target_path: Path, max_bytes: int) -> Dict:
+    """分块复制上传文件并计算SHA-256（在工作线程中执行）"""
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    with open(target_path, 'wb') as target:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise AvatarTooLargeError(f"图片文件大小不能超过{max_bytes // (1024 * 1024)}MB")
+            digest.update(chunk)
+            target.write(chunk)
+    if size == 0:
+        raise ValueError("上传文件为空")
+    return {'sha256': digest.hexdigest(), 'size': size}
+
+
+def _find_existing(digest: str) -> Optional[Dict]:
+    """已完整保存（头像和缩略图都存在）同内容的头像时返回其文件名"""
+    for path in AVATAR_DIR.glob(f"{digest}.*"):
+        thumbnail = AVATAR_DIR / f"{digest}_thumb{path.suffix}"
+        if thumbnail.is_file():
+            return {'filename': path.name, 'thumbnail': thumbnail.name}
+    return None
+
+
+def _process_image(temp_path: Path, digest: str) -> Dict:
+    """缩放为头像与缩略图并按内容哈希保存（在图片线程池中执行）"""
+    with Image.open(temp_path) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        ext, save_format, options = (
+            ('.png', 'PNG', {'optimize': True}) if has_alpha
+            else ('.jpg', 'JPEG', {'quality': 88, 'optimize': True})
+        )
+
+        avatar = image.copy()
+        avatar.thumbnail((AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+        thumbnail = ImageOps.fit(image, (THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+
+    filename = f"{digest}{ext}"
+    thumbnail_name = f"{digest}_thumb{ext}"
+    # 缩略图先落盘：并发上传同一图片时，看到头像文件就一定能看到缩略图
+    _atomic_save(lambda path: thumbnail.save(path, save_format, **options), AVATAR_DIR / thumbnail_name)
+    _atomic_save(lambda path: avatar.save(path, save_format, **options), AVATAR_DIR / filename)
+    return {'filename': filename, 'thumbnail': thumbnail_name}
+
+
+def _atomic_save(write, target: Path):
+    """先写临时文件再改名，并发上传同一图片时不会读到半个文件"""
+    fd, tmp = tempfile.mkstemp(dir=AVATAR_DIR, suffix=target.suffix)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _validate_image(temp_path: Path):
+    try:
+        with Image.open(temp_path) as image:
+            image.verify()
+    except Exception:
+        raise ValueError("无效的图片文件")
+
+
+def avatar_urls(stored: Dict, base_url: str = "") -> Dict:
+    """头像与缩略图URL"""
+    prefix = f"{base_url}{AVATAR_URL_PREFIX}"
+    return {
+        'avatar_url': f"{prefix}/{stored['filename']}",
+        'thumbnail_url': f"{prefix}/{stored['thumbnail']}" if stored.get('thumbnail') else None,
+    }
+
+
+async def store_avatar(upload, max_bytes: int = MAX_AVATAR_BYTES) -> Dict:
+    """
+    保存上传的头像
+
+    Args:
+        upload: FastAPI UploadFile
+        max_bytes: 大小上限
+
+    Returns:
+        {'filename', 'thumbnail', 'sha256', 'size', 'deduplicated'}
+
+    Raises:
+        AvatarTooLargeError: 超过大小限制
+        ValueError: 空文件或无效图片
+    """
+    AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=AVATAR_DIR, prefix='.upload_')
+    os.close(fd)
+    temp_path = Path(temp_name)
+
+    try:
+        info = await run_in_threadpool(_copy_and_hash, upload.file, temp_path, max_bytes)
+        digest = info['sha256']
+
+        existing = _find_existing(digest)
+        if existing:
+            return {**existing, **info, 'deduplicated': True}
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_image_executor, _validate_image, temp_path)
+        stored = await loop.run_in_executor(_image_executor, _process_image, temp_path, digest)
+        return {**stored, **info, 'deduplicated': False}
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
@@ -0,0 +1,83 @@
+"""
+进程内缓存工具
+线程安全的有界LRU缓存，条目带过期时间
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    带过期时间的LRU缓存
+
+    超过maxsize时淘汰最久未使用的条目；条目超过ttl秒后视为失效。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大条目数
+            ttl: 默认过期时间（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，不存在或已过期时返回default"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """写入缓存（ttl为None时使用默认过期时间）"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """删除缓存条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def info(self) -> dict:
+        """缓存统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'maxsize': self.maxsize,
+            'currsize': len(self._data),
+            'ttl': self.ttl,
+        }
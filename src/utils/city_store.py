@@ -0,0 +1,448 @@
+"""
+城市预测记录的读写
+
+每个操作都拆成接收会话的核心函数（不提交、不关闭会话）和同步包装函数，
+异步数据访问层通过 AsyncSession.run_sync 复用同一套核心函数。
+"""
+
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, delete, func, insert, select, update
+
+from src.models_db.city_prediction import (
+    CityPrediction,
+    CityPredictionDailyRollup,
+    UserCityPredictionCount,
+)
+from src.models_db.user import User
+from src.prediction.city_engine import decode_artifacts, get_city_engine
+from src.utils.db_utils import get_session
+from src.utils.pagination import keyset_paginate
+
+# 按天汇总表中累加的字段
+ROLLUP_SUM_COLUMNS = ('prediction_count', 'sum_flow', 'sum_speed', 'sum_congestion_index')
+
+
+def save_city_prediction(record: Dict) -> int:
+    """
+    保存一条城市预测记录
+
+    插入记录和更新用户预测统计在同一个事务内完成（一次连接、一次提交）。
+
+    Args:
+        record: CityPrediction字段字典（可包含已编码的artifacts）
+
+    Returns:
+        新记录ID
+    """
+    session = get_session()
+    try:
+        record_id = insert_city_prediction(session, record)
+        session.commit()
+        return record_id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def insert_city_prediction(session, record: Dict) -> int:
+    """在当前事务内插入一条记录并更新用户预测统计，返回新记录ID"""
+    prediction = CityPrediction(**record)
+    session.add(prediction)
+    session.flush()
+    record_id = prediction.id
+    _record_user_stats(session, [record])
+    return record_id
+
+
+def save_city_predictions(records: List[Dict]) -> int:
+    """
+    批量保存城市预测记录
+
+    所有记录通过一条批量INSERT写入（executemany），
+    用户预测统计在同一事务内一次性更新。
+
+    Args:
+        records: CityPrediction字段字典列表
+
+    Returns:
+        写入的记录数
+    """
+    if not records:
+        return 0
+
+    session = get_session()
+    try:
+        count = insert_city_predictions(session, records)
+        session.commit()
+        return count
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def insert_city_predictions(session, records: List[Dict]) -> int:
+    """在当前事务内批量插入记录并更新用户预测统计，返回写入的记录数"""
+    if not records:
+        return 0
+    session.execute(insert(CityPrediction), records)
+    _record_user_stats(session, records)
+    return len(records)
+
+
+def _record_user_stats(session, records: List[Dict]):
+    """
+    在当前事务内增量更新用户预测统计
+
+    - users.prediction_count / last_prediction_time：每个用户一条UPDATE
+    - user_city_prediction_counts：按(用户, 城市)批量upsert
+    - city_prediction_daily_rollups：按(用户, 城市, 日期, 拥堵等级)批量upsert
+    """
+    user_totals: Dict[int, int] = defaultdict(int)
+    user_last: Dict[int, datetime] = {}
+    city_counts: Dict[tuple, int] = defaultdict(int)
+    city_last: Dict[tuple, datetime] = {}
+    rollups: Dict[tuple, Dict] = {}
+
+    for record in records:
+        user_id = record.get('user_id')
+        if not user_id:
+            continue
+        created_at = record.get('created_at') or datetime.now()
+        key = (user_id, record['city'])
+        user_totals[user_id] += 1
+        city_counts[key] += 1
+        user_last[user_id] = max(user_last.get(user_id, created_at), created_at)
+        city_last[key] = max(city_last.get(key, created_at), created_at)
+
+        rollup_key = (user_id, record['city'], created_at.date(), record['severity'])
+        rollup = rollups.setdefault(rollup_key, {
+            'user_id': user_id,
+            'city': record['city'],
+            'day': created_at.date(),
+            'severity': record['severity'],
+            'prediction_count': 0,
+            'sum_flow': 0,
+            'sum_speed': 0.0,
+            'sum_congestion_index': 0.0,
+        })
+        rollup['prediction_count'] += 1
+        rollup['sum_flow'] += record['flow_per_hour']
+        rollup['sum_speed'] += record['avg_speed']
+        rollup['sum_congestion_index'] += record['congestion_index']
+
+    for user_id, amount in user_totals.items():
+        session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                prediction_count=func.coalesce(User.prediction_count, 0) + amount,
+                last_prediction_time=user_last[user_id],
+            )
+        )
+
+    if city_counts:
+        _upsert_increments(
+            session,
+            UserCityPredictionCount.__table__,
+            [
+                {
+                    'user_id': user_id,
+                    'city': city,
+                    'prediction_count': amount,
+                    'last_prediction_time': city_last[(user_id, city)],
+                }
+                for (user_id, city), amount in city_counts.items()
+            ],
+            add_columns=('prediction_count',),
+            replace_columns=('last_prediction_time',),
+        )
+
+    if rollups:
+        _upsert_increments(
+            session,
+            CityPredictionDailyRollup.__table__,
+            list(rollups.values()),
+            add_columns=ROLLUP_SUM_COLUMNS,
+        )
+
+
+def _upsert_increments(
+    session,
+    table: Table,
+    rows: List[Dict],
+    add_columns: Sequence[str],
+    replace_columns: Sequence[str] = ()
+):
+    """
+    按主键批量upsert：不存在时插入，存在时累加add_columns、覆盖replace_columns
+
+    MySQL使用ON DUPLICATE KEY UPDATE，SQLite/PostgreSQL使用ON CONFLICT，
+    其他数据库逐行UPDATE后按需INSERT。
+    """
+    dialect = session.get_bind().dialect.name
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        values = {name: table.c[name] + stmt.inserted[name] for name in add_columns}
+        values.update({name: stmt.inserted[name] for name in replace_columns})
+        session.execute(stmt.on_duplicate_key_update(**values), rows)
+    elif dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        values = {name: table.c[name] + stmt.excluded[name] for name in add_columns}
+        values.update({name: stmt.excluded[name] for name in replace_columns})
+        session.execute(
+            stmt.on_conflict_do_update(index_elements=list(table.primary_key.columns), set_=values),
+            rows
+        )
+    else:
+        for row in rows:
+            values = {name: table.c[name] + row[name] for name in add_columns}
+            values.update({name: row[name] for name in replace_columns})
+            result = session.execute(
+                update(table)
+                .where(*[column == row[column.name] for column in table.primary_key.columns])
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                session.execute(insert(table), row)
+
+
+def get_city_history_summary(user_id: int, range_days: int = 0, city: Optional[str] = None) -> Dict:
+    """
+    历史预测汇总统计（读取按天汇总表，不扫描city_predictions）
+
+    Args:
+        user_id: 用户ID
+        range_days: 最近N天（按记录创建日期，0表示全部）
+        city: 城市筛选
+
+    Returns:
+        {'total_count', 'avg_flow', 'avg_speed', 'avg_congestion', 'cities', 'severity_counts'}
+    """
+    session = get_session()
+    try:
+        return query_city_history_summary(session, user_id, range_days, city)
+    finally:
+        session.close()
+
+
+def query_city_history_summary(session, user_id: int, range_days: int = 0, city: Optional[str] = None) -> Dict:
+    """get_city_history_summary 的核心查询"""
+    rollup = CityPredictionDailyRollup
+    query = session.query(
+        rollup.city,
+        rollup.severity,
+        func.sum(rollup.prediction_count),
+        func.sum(rollup.sum_flow),
+        func.sum(rollup.sum_speed),
+        func.sum(rollup.sum_congestion_index),
+    ).filter(rollup.user_id == user_id)
+
+    if range_days and range_days > 0:
+        since = (datetime.now() - timedelta(days=range_days)).date()
+        query = query.filter(rollup.day >= since)
+    if city:
+        query = query.filter(rollup.city == city)
+
+    rows = query.group_by(rollup.city, rollup.severity).all()
+
+    total_count = 0
+    sum_flow = sum_speed = sum_congestion = 0.0
+    city_counts: Dict[str, int] = defaultdict(int)
+    severity_counts: Dict[str, int] = defaultdict(int)
+    for row_city, severity, count, flow, speed, congestion in rows:
+        count = int(count or 0)
+        total_count += count
+        sum_flow += float(flow or 0)
+        sum_speed += float(speed or 0)
+        sum_congestion += float(congestion or 0)
+        city_counts[row_city] += count
+        severity_counts[severity] += count
+
+    divisor = total_count or 1
+    return {
+        'total_count': total_count,
+        'avg_flow': round(sum_flow / divisor, 2),
+        'avg_speed': round(sum_speed / divisor, 2),
+        'avg_congestion': round(sum_congestion / divisor, 4),
+        'cities': sorted(city_counts, key=lambda name: -city_counts[name]),
+        'severity_counts': dict(severity_counts),
+    }
+
+
+def rebuild_city_rollups(user_id: Optional[int] = None) -> int:
+    """
+    由city_predictions全量重建按天汇总表（回填或修复用）
+
+    Args:
+        user_id: 只重建该用户的汇总（None表示全部用户）
+
+    Returns:
+        重建后的汇总行数
+    """
+    rollup = CityPredictionDailyRollup.__table__
+    source = CityPrediction.__table__
+    day = func.date(source.c.created_at)
+
+    select_stmt = select(
+        source.c.user_id,
+        source.c.city,
+        day,
+        source.c.severity,
+        func.count(),
+        func.sum(source.c.flow_per_hour),
+        func.sum(source.c.avg_speed),
+        func.sum(source.c.congestion_index),
+    ).where(source.c.user_id.isnot(None))
+
+    delete_stmt = delete(rollup)
+    if user_id is not None:
+        select_stmt = select_stmt.where(source.c.user_id == user_id)
+        delete_stmt = delete_stmt.where(rollup.c.user_id == user_id)
+
+    select_stmt = select_stmt.group_by(source.c.user_id, source.c.city, day, source.c.severity)
+
+    session = get_session()
+    try:
+        session.execute(delete_stmt)
+        session.execute(
+            insert(rollup).from_select(
+                ['user_id', 'city', 'day', 'severity', 'prediction_count',
+                 'sum_flow', 'sum_speed', 'sum_congestion_index'],
+                select_stmt
+            )
+        )
+        session.commit()
+
+        count_stmt = select(func.count()).select_from(rollup)
+        if user_id is not None:
+            count_stmt = count_stmt.where(rollup.c.user_id == user_id)
+        return session.execute(count_stmt).scalar() or 0
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_city_prediction_page(
+    user_id: int,
+    limit: int = 100,
+    range_days: int = 0,
+    city: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    按 (created_at, id) 倒序分页查询用户的城市预测记录
+
+    走 (user_id, created_at, id) 复合索引，每页一次索引范围扫描。
+
+    Args:
+        user_id: 用户ID
+        limit: 页大小
+        range_days: 最近N天（0表示全部）
+        city: 城市筛选
+        cursor: 上一页返回的next_cursor
+
+    Returns:
+        (记录字典列表, 下一页游标)
+    """
+    session = get_session()
+    try:
+        return query_city_prediction_page(session, user_id, limit, range_days, city, cursor)
+    finally:
+        session.close()
+
+
+def query_city_prediction_page(
+    session,
+    user_id: int,
+    limit: int = 100,
+    range_days: int = 0,
+    city: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """get_city_prediction_page 的核心查询"""
+    query = session.query(CityPrediction).filter(CityPrediction.user_id == user_id)
+    if range_days and range_days > 0:
+        query = query.filter(CityPrediction.created_at >= datetime.now() - timedelta(days=range_days))
+    if city:
+        query = query.filter(CityPrediction.city == city)
+
+    rows, next_cursor = keyset_paginate(
+        query, CityPrediction.created_at, CityPrediction.id, limit, cursor
+    )
+    return [row.to_dict() for row in rows], next_cursor
+
+
+def get_city_prediction_detail(record_id: int) -> Optional[Dict]:
+    """
+    读取单条城市预测记录及其生成的省份热力和监控点数据
+
+    新记录直接解码预测时保存的artifacts；没有artifacts的旧记录
+    按原始输入通过同一个预测引擎重建（结果一致且命中缓存）。
+
+    Args:
+        record_id: 记录ID
+
+    Returns:
+        记录字典（含user_id与province_flows/monitors/all_monitors），不存在时返回None
+    """
+    session = get_session()
+    try:
+        return load_city_prediction_detail(session, record_id)
+    finally:
+        session.close()
+
+
+def load_city_prediction_detail(session, record_id: int) -> Optional[Dict]:
+    """get_city_prediction_detail 的核心查询"""
+    record = session.get(CityPrediction, record_id)
+    if record is None:
+        return None
+
+    detail = record.to_dict()
+    detail['user_id'] = record.user_id
+
+    if record.artifacts:
+        detail.update(decode_artifacts(record.artifacts))
+    else:
+        detail.update(_rebuild_artifacts(record))
+
+    return detail
+
+
+def _rebuild_artifacts(record: CityPrediction) -> Dict:
+    """按原始请求参数重建旧记录的生成数据"""
+    try:
+        request = json.loads(record.extra_payload or '{}')
+    except ValueError:
+        request = {}
+
+    result = get_city_engine().predict(
+        request.get('city', record.city),
+        request.get('date', record.prediction_date.isoformat()),
+        request.get('time_range', record.time_range),
+        request.get('weather', record.weather),
+        request.get('district', record.district),
+        request.get('other', record.other),
+    )
+
+    return {
+        'province_flows': result['province_flows'],
+        'monitors': result['monitors'],
+        'all_monitors': result['all_monitors'],
+    }
@@ -0,0 +1,286 @@
+"""
+消息中心数据访问
+- 系统公告：进程内缓存，发布/停用公告时失效
+- 未读数：users.unread_notification_count 计数器，创建通知和标记已读时在同一事务内增减
+- 消息中心：用户通知与未读数一条查询取出；
+  轻量的状态查询（未读数 + 最新通知ID）用于生成ETag，客户端轮询时可直接返回304
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, true, update
+from sqlalchemy.orm import aliased
+
+from src.models_db.message import SystemAnnouncement, UserNotification
+from src.models_db.user import User
+from src.utils.cache import TTLCache
+from src.utils.db_utils import get_session
+
+# 缓存的公告条数上限（limit不超过该值时从缓存切片）
+ANNOUNCEMENT_CACHE_LIMIT = 50
+ANNOUNCEMENT_CACHE_TTL = float(os.getenv('ANNOUNCEMENT_CACHE_TTL', '300'))
+
+_ANNOUNCEMENTS_KEY = 'announcements'
+_announcement_cache = TTLCache(maxsize=1, ttl=ANNOUNCEMENT_CACHE_TTL)
+
+
+# ==================== 系统公告 ====================
+
+def query_active_announcements(session, limit: int = ANNOUNCEMENT_CACHE_LIMIT) -> List[Dict]:
+    """激活的系统公告（按发布时间倒序）"""
+    rows = session.execute(
+        select(SystemAnnouncement)
+        .where(SystemAnnouncement.is_active.is_(True))
+        .order_by(SystemAnnouncement.publish_time.desc(), SystemAnnouncement.id.desc())
+        .limit(limit)
+    ).scalars()
+    return [announcement.to_dict() for announcement in rows]
+
+
+def _announcement_entry(announcements: List[Dict]) -> Dict:
+    """缓存条目：公告列表及其内容指纹（各进程内容相同则指纹相同）"""
+    digest = hashlib.sha1(
+        json.dumps(announcements, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+    return {'announcements': announcements, 'version': digest}
+
+
+def get_cached_announcements() -> Optional[Dict]:
+    """缓存中的公告条目（未命中返回None）"""
+    return _announcement_cache.get(_ANNOUNCEMENTS_KEY)
+
+
+def cache_announcements(announcements: List[Dict]) -> Dict:
+    """写入公告缓存，返回缓存条目"""
+    entry = _announcement_entry(announcements)
+    _announcement_cache.set(_ANNOUNCEMENTS_KEY, entry)
+    return entry
+
+
+def get_announcements(limit: int = ANNOUNCEMENT_CACHE_LIMIT) -> Tuple[List[Dict], str]:
+    """
+    获取系统公告（优先读缓存）
+
+    Returns:
+        (公告列表, 内容指纹)；limit超过缓存上限时直接查询数据库
+    """
+    if limit > ANNOUNCEMENT_CACHE_LIMIT:
+        session = get_session()
+        try:
+            announcements = query_active_announcements(session, limit)
+        finally:
+            session.close()
+        return announcements, _announcement_entry(announcements)['version']
+
+    entry = get_cached_announcements()
+    if entry is None:
+        session = get_session()
+        try:
+            entry = cache_announcements(query_active_announcements(session))
+        finally:
+            session.close()
+    return entry['announcements'][:limit], entry['version']
+
+
+def invalidate_announcements():
+    """公告变更后清除缓存"""
+    _announcement_cache.pop(_ANNOUNCEMENTS_KEY)
+
+
+def insert_announcement(session, title: str, content: str, publish_time: Optional[datetime] = None) -> Dict:
+    """在当前事务内新增一条激活的公告"""
+    announcement = SystemAnnouncement(
+        title=title,
+        content=content,
+        publish_time=publish_time or datetime.now(),
+        is_active=True
+    )
+    session.add(announcement)
+    session.flush()
+    return announcement.to_dict()
+
+
+def deactivate_announcement(session, announcement_id: int) -> bool:
+    """在当前事务内停用公告，公告不存在时返回False"""
+    result = session.execute(
+        update(SystemAnnouncement)
+        .where(SystemAnnouncement.id == announcement_id)
+        .values(is_active=False)
+    )
+    return result.rowcount > 0
+
+
+# ==================== 用户通知 ====================
+
+def insert_notifications(session, notifications: List[Dict]) -> int:
+    """
+    在当前事务内批量创建通知，并增加对应用户的未读计数
+
+    Args:
+        notifications: {'user_id', 'title', 'content', 'send_time'(可选)} 列表
+
+    Returns:
+        创建的通知数
+    """
+    if not notifications:
+        return 0
+
+    now = datetime.now()
+    rows = [
+        {
+            'user_id': item['user_id'],
+            'title': item['title'],
+            'content': item['content'],
+            'send_time': item.get('send_time') or now,
+            'is_read': False,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for item in notifications
+    ]
+    session.execute(insert(UserNotification), rows)
+
+    per_user: Dict[int, int] = {}
+    for row in rows:
+        per_user[row['user_id']] = per_user.get(row['user_id'], 0) + 1
+    for user_id, amount in per_user.items():
+        _add_unread(session, user_id, amount)
+    return len(rows)
+
+
+def create_notification(user_id: int, title: str, content: str, send_time: Optional[datetime] = None) -> int:
+    """创建一条用户通知（同一事务内更新未读计数）"""
+    session = get_session()
+    try:
+        count = insert_notifications(session, [{
+            'user_id': user_id,
+            'title': title,
+            'content': content,
+            'send_time': send_time,
+        }])
+        session.commit()
+        return count
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _add_unread(session, user_id: int, amount: int):
+    session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(unread_notification_count=func.coalesce(User.unread_notification_count, 0) + amount)
+    )
+
+
+def mark_notification_read(session, user_id: int, notification_id: int) -> bool:
+    """
+    在当前事务内把用户自己的通知标记为已读（未读 -> 已读时未读计数减一）
+
+    Returns:
+        通知不存在或不属于该用户时返回False
+    """
+    result = session.execute(
+        update(UserNotification)
+        .where(
+            UserNotification.id == notification_id,
+            UserNotification.user_id == user_id,
+            UserNotification.is_read.is_(False)
+        )
+        .values(is_read=True, updated_at=datetime.now())
+    )
+    if result.rowcount > 0:
+        session.execute(
+            update(User)
+            .where(User.id == user_id, User.unread_notification_count > 0)
+            .values(unread_notification_count=User.unread_notification_count - 1)
+        )
+        return True
+
+    # 已读的通知再次标记也视为成功
+    exists = session.execute(
+        select(UserNotification.id)
+        .where(UserNotification.id == notification_id, UserNotification.user_id == user_id)
+    ).first()
+    return exists is not None
+
+
+def query_unread_count(session, user_id: int) -> int:
+    """读取用户未读计数（主键查询）"""
+    count = session.execute(
+        select(User.unread_notification_count).where(User.id == user_id)
+    ).scalar()
+    return count or 0
+
+
+def query_notification_state(session, user_id: int) -> Tuple[int, int]:
+    """
+    通知状态：(未读数, 最新通知ID)
+
+    创建通知会改变最新ID和未读数，标记已读会改变未读数，
+    因此二者不变时通知列表也不变，可用于生成ETag。
+    """
+    latest = (
+        select(func.max(UserNotification.id))
+        .where(UserNotification.user_id == user_id)
+        .scalar_subquery()
+    )
+    row = session.execute(
+        select(User.unread_notification_count, latest).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return 0, 0
+    return row[0] or 0, row[1] or 0
+
+
+def query_user_notifications(session, user_id: int, limit: int = 50) -> Tuple[List[Dict], int]:
+    """
+    一条查询取出用户最近的通知和未读计数
+
+    users 主键行 LEFT JOIN 最近limit条通知的子查询，没有通知时仍返回未读数。
+
+    Returns:
+        (通知列表, 未读数)
+    """
+    recent = (
+        select(UserNotification)
+        .where(UserNotification.user_id == user_id)
+        .order_by(UserNotification.send_time.desc(), UserNotification.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    notification = aliased(UserNotification, recent)
+    rows = session.execute(
+        select(User.unread_notification_count, notification)
+        .select_from(User)
+        .outerjoin(notification, true())
+        .where(User.id == user_id)
+        .order_by(notification.send_time.desc(), notification.id.desc())
+    ).all()
+
+    unread_count = (rows[0][0] or 0) if rows else 0
+    notifications = [row[1].to_dict() for row in rows if row[1] is not None]
+    return notifications, unread_count
+
+
+def make_etag(*parts) -> str:
+    """由状态值生成弱ETag"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    bare = etag[2:] if etag.startswith('W/') else etag
+    return any((tag[2:] if tag.startswith('W/') else tag) == bare for tag in candidates)
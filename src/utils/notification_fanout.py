@@ -0,0 +1,209 @@
+"""
+系统通知批量下发（fan-out）
+按用户ID区间分块：每块一条 INSERT ... SELECT 写入通知、一条 UPDATE 增加未读计数，
+每块单独提交。任务在后台线程中串行执行，API请求只负责提交任务并返回任务ID，
+进度通过任务快照查询。10万用户按1000一块约100块、300次左右数据库往返。
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, literal, select, update
+
+from src.models_db.message import UserNotification
+from src.models_db.user import User
+from src.utils.db_utils import get_session
+
+# 保留的历史任务数
+MAX_JOBS = 100
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-fanout')
+_jobs: 'OrderedDict[str, FanoutJob]' = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _default_chunk_size() -> int:
+    try:
+        from src.utils.config import get_config
+        return int(get_config('operations.bulk.batch_size', config_type='database') or 1000)
+    except Exception:
+        return 1000
+
+
+class FanoutJob:
+    """一次通知下发任务的状态"""
+
+    def __init__(self, title: str, content: str, chunk_size: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.title = title
+        self.content = content
+        self.chunk_size = chunk_size
+        self.status = 'pending'
+        self.total = 0
+        self.sent = 0
+        self.chunks = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            elapsed = None
+            if self.started_at:
+                elapsed = round(((self.finished_at or datetime.now()) - self.started_at).total_seconds(), 3)
+            return {
+                'job_id': self.id,
+                'title': self.title,
+                'status': self.status,
+                'total': self.total,
+                'sent': self.sent,
+                'chunks': self.chunks,
+                'progress': round(self.sent / self.total, 4) if self.total else (1.0 if self.status == 'completed' else 0.0),
+                'error': self.error,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'elapsed_seconds': elapsed,
+            }
+
+
+def fanout_chunk(session, title: str, content: str, after_id: int, chunk_size: int, send_time: datetime) -> Optional[tuple]:
+    """
+    在当前事务内为一块用户（ID > after_id 的前chunk_size个正常用户）写入通知
+
+    Returns:
+        (本块用户数, 本块最大用户ID)；没有更多用户时返回None
+    """
+    ids = session.execute(
+        select(User.id)
+        .where(User.status == 1, User.id > after_id)
+        .order_by(User.id)
+        .limit(chunk_size)
+    ).scalars().all()
+    if not ids:
+        return None
+
+    upper = ids[-1]
+    in_range = (User.status == 1, User.id > after_id, User.id <= upper)
+
+    session.execute(
+        insert(UserNotification).from_select(
+            ['user_id', 'title', 'content', 'send_time', 'is_read', 'created_at', 'updated_at'],
+            select(
+                User.id,
+                literal(title),
+                literal(content),
+                literal(send_time),
+                literal(False),
+                literal(send_time),
+                literal(send_time),
+            ).where(*in_range)
+        )
+    )
+    session.execute(
+        update(User)
+        .where(*in_range)
+        .values(unread_notification_count=func.coalesce(User.unread_notification_count, 0) + 1)
+    )
+    return len(ids), upper
+
+
+def _count_active_users() -> int:
+    session = get_session()
+    try:
+        return session.execute(select(func.count(User.id)).where(User.status == 1)).scalar() or 0
+    finally:
+        session.close()
+
+
+def _run_job(job: FanoutJob):
+    with job._lock:
+        job.status = 'running'
+        job.started_at = datetime.now()
+
+    try:
+        total = _count_active_users()
+        with job._lock:
+            job.total = total
+
+        send_time = datetime.now()
+        after_id = 0
+        while True:
+            session = get_session()
+            try:
+                result = fanout_chunk(session, job.title, job.content, after_id, job.chunk_size, send_time)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+            if result is None:
+                break
+            count, after_id = result
+            with job._lock:
+                job.sent += count
+                job.chunks += 1
+                # 任务期间新注册的用户也会收到，总数随之增长
+                job.total = max(job.total, job.sent)
+
+        with job._lock:
+            job.status = 'completed'
+        print(f"✅ [通知下发] 任务 {job.id} 完成：{job.sent} 个用户，{job.chunks} 块")
+    except Exception as e:
+        with job._lock:
+            job.status = 'failed'
+            job.error = str(e)
+        print(f"[ERROR] 通知下发任务 {job.id} 失败（已发送 {job.sent} 个用户）: {e}")
+    finally:
+        with job._lock:
+            job.finished_at = datetime.now()
+
+
+def start_fanout(title: str, content: str, chunk_size: Optional[int] = None) -> Dict:
+    """
+    提交一个向全部正常用户下发通知的后台任务
+
+    Returns:
+        任务快照（含job_id）
+    """
+    job = FanoutJob(title, content, chunk_size or _default_chunk_size())
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    _executor.submit(_run_job, job)
+    return job.to_dict()
+
+
+def get_fanout_job(job_id: str) -> Optional[Dict]:
+    """任务进度快照，任务不存在时返回None"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return job.to_dict() if job else None
+
+
+def list_fanout_jobs() -> List[Dict]:
+    """最近的任务（最新在前）"""
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return [job.to_dict() for job in reversed(jobs)]
+
+
+def wait_for_fanout(job_id: str, timeout: float = 60) -> Optional[Dict]:
+    """等待任务结束（脚本/测试用），返回最终快照"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        snapshot = get_fanout_job(job_id)
+        if snapshot is None or snapshot['status'] in ('completed', 'failed'):
+            return snapshot
+        time.sleep(0.05)
+    return get_fanout_job(job_id)
@@ -0,0 +1,76 @@
+"""
+游标分页（Keyset Pagination）
+按 (created_at, id) 倒序翻页，每页都是一次索引范围扫描，不随页码变慢
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+# 单页最大记录数
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """把最后一条记录的 (created_at, id) 编码为不透明的游标字符串"""
+    raw = json.dumps([created_at.isoformat(), int(record_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解码游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def clamp_page_size(limit: int) -> int:
+    """把页大小限制在 [1, MAX_PAGE_SIZE]"""
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def keyset_paginate(query, created_column, id_column, limit: int, cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """
+    对查询做倒序游标分页
+
+    Args:
+        query: 已加好过滤条件的ORM查询
+        created_column: 创建时间列
+        id_column: 主键列
+        limit: 页大小
+        cursor: 上一页返回的next_cursor（None表示第一页）
+
+    Returns:
+        (本页记录, 下一页游标)；没有更多记录时游标为None
+    """
+    limit = clamp_page_size(limit)
+
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_column < created_at,
+            and_(created_column == created_at, id_column < record_id),
+        ))
+
+    rows = query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, created_column.key), getattr(last, id_column.key)
+        )
+
+    return rows, next_cursor
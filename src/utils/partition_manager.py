@@ -0,0 +1,266 @@
+"""
+按时间分区与数据保留
+predictions / api_logs 在MySQL上按 created_at 做 RANGE 分区：
+提前创建未来分区，整分区删除过期数据（DROP PARTITION只改元数据，不长时间锁表）。
+不支持分区的后端（或尚未分区的表）退化为按主键分批、限速删除过期行。
+
+配置见 configs/database.yaml：
+    mysql.tables.<表名>.partition   分区开关、粒度、保留天数、预建分区数
+    mysql.tables.api_logs.auto_cleanup  api_logs保留天数
+    operations.cleanup              分批删除的批大小、批间隔、单次最多批数
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select, text
+
+from src.models_db.base import DatabaseConnection
+from src.models_db.prediction import Prediction
+from src.models_db.api_log import APILog
+
+# 兜底分区（存放尚未预建分区的未来数据）
+FUTURE_PARTITION = 'p_future'
+
+DEFAULT_CLEANUP = {
+    'batch_size': 5000,
+    'sleep_seconds': 0.1,
+    'max_batches': 1000,
+}
+
+
+def _get_config(key: str, default=None):
+    try:
+        from src.utils.config import get_config
+        value = get_config(key, config_type='database')
+    except Exception:
+        value = None
+    return default if value is None else value
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """moment所在分区周期的起点（MONTH：当月1日；DAY：当天0点）"""
+    if interval == 'MONTH':
+        return datetime(moment.year, moment.month, 1)
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """下一个分区周期的起点"""
+    if interval == 'MONTH':
+        return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    """分区名：p202610（按月）/ p20261019（按天）"""
+    return start.strftime('p%Y%m' if interval == 'MONTH' else 'p%Y%m%d')
+
+
+class RetentionPolicy:
+    """单张表的分区与保留策略"""
+
+    def __init__(self, table, column, retention_days: int, partition_enabled: bool = False,
+                 interval: str = 'MONTH', premake: int = 3):
+        self.table = table
+        self.column = column
+        self.retention_days = int(retention_days)
+        self.partition_enabled = bool(partition_enabled)
+        self.interval = str(interval).upper()
+        self.premake = int(premake)
+        if self.interval not in ('MONTH', 'DAY'):
+            raise ValueError(f"不支持的分区粒度: {interval}（可选 MONTH / DAY）")
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+
+def load_retention_policies() -> List[RetentionPolicy]:
+    """从配置读取 predictions / api_logs 的保留策略"""
+    predictions = _get_config('mysql.tables.predictions.partition', {})
+    api_logs = _get_config('mysql.tables.api_logs.partition', {})
+    api_logs_cleanup = _get_config('mysql.tables.api_logs.auto_cleanup', {})
+
+    policies = [
+        RetentionPolicy(
+            Prediction.__table__,
+            Prediction.__table__.c.created_at,
+            retention_days=predictions.get('retention_days', 365),
+            partition_enabled=predictions.get('enabled', False),
+            interval=predictions.get('interval', 'MONTH'),
+            premake=predictions.get('premake', 3),
+        ),
+    ]
+    if api_logs_cleanup.get('enabled', True):
+        policies.append(RetentionPolicy(
+            APILog.__table__,
+            APILog.__table__.c.created_at,
+            retention_days=api_logs_cleanup.get('retention_days', 30),
+            partition_enabled=api_logs.get('enabled', False),
+            interval=api_logs.get('interval', 'DAY'),
+            premake=api_logs.get('premake', 7),
+        ))
+    return policies
+
+
+class PartitionManager:
+    """分区维护与过期数据清理"""
+
+    def __init__(self, engine=None, cleanup: Optional[Dict] = None):
+        self.engine = engine if engine is not None else DatabaseConnection().engine
+        if self.engine is None:
+            raise RuntimeError("数据库引擎未初始化")
+        self.cleanup = {**DEFAULT_CLEANUP, **_get_config('operations.cleanup', {}), **(cleanup or {})}
+
+    @property
+    def supports_partitions(self) -> bool:
+        return self.engine.dialect.name == 'mysql'
+
+    def list_partitions(self, table_name: str) -> List[Dict]:
+        """表的现有分区（name, bound：上界的UNIX时间戳，MAXVALUE为None）"""
+        if not self.supports_partitions:
+            return []
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+                "FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"
+            ), {'table': table_name}).all()
+        return [
+            {'name': name, 'bound': None if description == 'MAXVALUE' else int(description)}
+            for name, description in rows
+        ]
+
+    def ensure_partitions(self, policy: RetentionPolicy, now: datetime) -> List[str]:
+        """
+        预建从当前周期起 premake 个周期的分区（从 p_future 中拆分）
+
+        Returns:
+            新建的分区名
+        """
+        existing = {p['name'] for p in self.list_partitions(policy.name)}
+        if FUTURE_PARTITION not in existing:
+            raise RuntimeError(f"{policy.name} 缺少 {FUTURE_PARTITION} 分区，请先执行分区迁移脚本")
+
+        definitions = []
+        created = []
+        start = period_start(now, policy.interval)
+        for _ in range(policy.premake + 1):
+            end = next_period(start, policy.interval)
+            name = partition_name(start, policy.interval)
+            if name not in existing:
+                definitions.append(
+                    f"PARTITION {name} VALUES LESS THAN "
+                    f"(UNIX_TIMESTAMP('{end:%Y-%m-%d %H:%M:%S}'))"
+                )
+                created.append(name)
+            start = end
+
+        if definitions:
+            definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {policy.name} REORGANIZE PARTITION {FUTURE_PARTITION} "
+                    f"INTO ({', '.join(definitions)})"
+                ))
+        return created
+
+    def drop_expired_partitions(self, policy: RetentionPolicy, cutoff: datetime) -> List[str]:
+        """
+        删除上界不晚于cutoff的分区（分区内全部数据均已过期）
+
+        Returns:
+            删除的分区名
+        """
+        with self.engine.connect() as conn:
+            cutoff_ts = conn.execute(
+                text("SELECT UNIX_TIMESTAMP(:cutoff)"), {'cutoff': cutoff}
+            ).scalar()
+
+        expired = [
+            p['name'] for p in self.list_partitions(policy.name)
+            if p['bound'] is not None and p['bound'] <= cutoff_ts
+        ]
+        if expired:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {policy.name} DROP PARTITION {', '.join(expired)}"))
+        return expired
+
+    def purge_expired_rows(self, policy: RetentionPolicy, cutoff: datetime) -> int:
+        """
+        分批删除早于cutoff的行
+
+        每批先沿 created_at 索引取出主键，再按主键删除并立即提交，
+        批与批之间休眠，避免长事务和大范围行锁。
+
+        Returns:
+            删除的行数
+        """
+        id_column = policy.table.c.id
+        batch_size = int(self.cleanup['batch_size'])
+        sleep_seconds = float(self.cleanup['sleep_seconds'])
+        max_batches = int(self.cleanup['max_batches'])
+
+        deleted = 0
+        for batch in range(max_batches):
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(id_column)
+                    .where(policy.column < cutoff)
+                    .order_by(policy.column)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                conn.execute(delete(policy.table).where(id_column.in_(ids)))
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                break
+            if sleep_seconds > 0:
+                time.sleep(sleep_seconds)
+        else:
+            print(f"[WARN] {policy.name} 本次清理达到批数上限 {max_batches}，剩余数据下次继续")
+        return deleted
+
+    def maintain(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> Dict:
+        """维护单张表：分区表预建并删除过期分区，否则分批删除过期行"""
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=policy.retention_days)
+        report = {
+            'table': policy.name,
+            'retention_days': policy.retention_days,
+            'cutoff': cutoff.isoformat(),
+        }
+
+        partitioned = bool(self.list_partitions(policy.name))
+        if partitioned:
+            report['mode'] = 'partition'
+            report['created_partitions'] = self.ensure_partitions(policy, now)
+            report['dropped_partitions'] = self.drop_expired_partitions(policy, cutoff)
+            return report
+
+        if policy.partition_enabled and self.supports_partitions:
+            print(f"[WARN] {policy.name} 已启用分区但表尚未分区，"
+                  f"请执行 database/migrations/add_time_partitions.sql；本次改为分批删除")
+        report['mode'] = 'delete'
+        report['deleted_rows'] = self.purge_expired_rows(policy, cutoff)
+        return report
+
+    def run(self, tables: Optional[List[str]] = None, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        按配置维护所有表
+
+        Args:
+            tables: 只维护指定表名（默认全部）
+            now: 当前时间（默认datetime.now()）
+        """
+        reports = []
+        for policy in load_retention_policies():
+            if tables and policy.name not in tables:
+                continue
+            reports.append(self.maintain(policy, now))
+        return reports
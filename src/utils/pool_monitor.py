@@ -0,0 +1,119 @@
+"""
+数据库连接池监控
+汇总同步/异步引擎的连接池状态，并按 configs/database.yaml 的
+monitoring.pool_monitoring 定时打印统计，便于压测时按进程调整连接池大小。
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+from src.models_db.base import DatabaseConnection, AsyncDatabaseConnection
+from src.models_db.pool import pool_status
+
+_monitor_task: Optional[asyncio.Task] = None
+
+
+def _monitoring_config() -> Dict:
+    try:
+        from src.utils.config import get_config
+        return get_config('monitoring', config_type='database') or {}
+    except Exception:
+        return {}
+
+
+def get_stats_interval() -> float:
+    """
+    统计打印间隔（秒），0 表示关闭
+
+    环境变量 POOL_STATS_INTERVAL 优先，其次为 monitoring.pool_monitoring 配置
+    """
+    env_value = os.getenv('POOL_STATS_INTERVAL')
+    if env_value is not None:
+        return float(env_value)
+
+    monitoring = _monitoring_config()
+    pool_monitoring = monitoring.get('pool_monitoring') or {}
+    if not monitoring.get('enabled', True) or not pool_monitoring.get('log_pool_stats', False):
+        return 0.0
+    return float(pool_monitoring.get('stats_interval', 60))
+
+
+def get_pool_stats() -> Dict:
+    """同步与异步引擎的连接池状态（未初始化的引擎为None）"""
+    engine = DatabaseConnection().engine
+    async_engine = AsyncDatabaseConnection().engine
+    return {
+        'sync': pool_status(engine.pool) if engine is not None else None,
+        'async': pool_status(async_engine.sync_engine.pool) if async_engine is not None else None,
+    }
+
+
+def reset_pool_stats():
+    """清空累计统计（调整连接池参数后重新观察）"""
+    for engine in (DatabaseConnection().engine, AsyncDatabaseConnection().engine):
+        if engine is None:
+            continue
+        pool = engine.sync_engine.pool if hasattr(engine, 'sync_engine') else engine.pool
+        metrics = getattr(pool, 'metrics', None)
+        if metrics is not None:
+            metrics.reset()
+
+
+def format_pool_stats(name: str, status: Dict) -> str:
+    """单个连接池的一行日志"""
+    line = f"📊 [POOL] {name}: {status['pool_class']}"
+    if 'pool_size' in status:
+        line += (
+            f" size={status['pool_size']} checked_out={status['checked_out']}"
+            f" checked_in={status['checked_in']}"
+            f" overflow={status['overflow']}/{status['max_overflow']}"
+        )
+    metrics = status.get('metrics')
+    if metrics:
+        wait = metrics['wait_ms']
+        line += (
+            f" checkouts={metrics['checkouts']} timeouts={metrics['timeouts']}"
+            f" peak_overflow={metrics['peak_overflow']}"
+            f" wait_ms(avg/p95/max)={wait['avg']}/{wait['p95']}/{wait['max']}"
+            f" max_age={metrics['connection_age_s']['max']}s"
+        )
+    return line
+
+
+def log_pool_stats():
+    """打印当前连接池统计"""
+    for name, status in get_pool_stats().items():
+        if status:
+            print(format_pool_stats(name, status))
+
+
+async def _monitor_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            log_pool_stats()
+        except Exception as e:
+            print(f"[WARN] 连接池统计输出失败: {e}")
+
+
+def start_pool_monitor():
+    """启动定时打印连接池统计的后台任务（需在事件循环中调用）"""
+    global _monitor_task
+    interval = get_stats_interval()
+    if interval <= 0 or (_monitor_task is not None and not _monitor_task.done()):
+        return
+    _monitor_task = asyncio.get_running_loop().create_task(_monitor_loop(interval))
+
+
+async def stop_pool_monitor():
+    """停止后台统计任务"""
+    global _monitor_task
+    if _monitor_task is None:
+        return
+    _monitor_task.cancel()
+    try:
+        await _monitor_task
+    except asyncio.CancelledError:
+        pass
+    _monitor_task = None
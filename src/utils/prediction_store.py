@@ -0,0 +1,81 @@
+"""
+传感器预测记录（predictions表）的分页查询
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from src.models_db.prediction import Prediction
+from src.utils.db_utils import get_session
+from src.utils.pagination import keyset_paginate
+
+
+def parse_sensor_id(sensor_id: str) -> int:
+    """
+    解析传感器ID（支持 "12" 和 "sensor_012" 两种形式）
+
+    Raises:
+        ValueError: 无法解析
+    """
+    value = str(sensor_id).strip()
+    if value.startswith('sensor_'):
+        value = value[len('sensor_'):]
+    return int(value)
+
+
+def get_sensor_prediction_page(
+    sensor_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    按 (created_at, id) 倒序分页查询指定传感器的预测记录
+
+    Returns:
+        (记录字典列表, 下一页游标)
+    """
+    session = get_session()
+    try:
+        return query_sensor_prediction_page(session, sensor_id, limit, cursor)
+    finally:
+        session.close()
+
+
+def query_sensor_prediction_page(
+    session,
+    sensor_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """get_sensor_prediction_page 的核心查询（接收会话，供异步层复用）"""
+    sensor_key = parse_sensor_id(sensor_id)
+    query = session.query(Prediction).filter(Prediction.sensor_id == sensor_key)
+    rows, next_cursor = keyset_paginate(query, Prediction.created_at, Prediction.id, limit, cursor)
+    return [row.to_dict() for row in rows], next_cursor
+
+
+def get_recent_prediction_page(
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    按 (created_at, id) 倒序分页查询最近的预测记录
+
+    Returns:
+        (记录字典列表, 下一页游标)
+    """
+    session = get_session()
+    try:
+        return query_recent_prediction_page(session, limit, cursor)
+    finally:
+        session.close()
+
+
+def query_recent_prediction_page(
+    session,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """get_recent_prediction_page 的核心查询（接收会话，供异步层复用）"""
+    query = session.query(Prediction)
+    rows, next_cursor = keyset_paginate(query, Prediction.created_at, Prediction.id, limit, cursor)
+    return [row.to_dict() for row in rows], next_cursor
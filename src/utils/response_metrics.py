@@ -0,0 +1,108 @@
+"""
+接口响应体统计
+按路由（路径模板，如 /history/{sensor_id}）累计：请求数、原始/实际发送字节数、
+压缩率、JSON序列化耗时与压缩耗时，用于观察大响应的序列化与压缩收益。
+"""
+
+import threading
+from typing import Dict, Optional
+
+# 最多单独统计的路由数，超出后归入 OTHER_ENDPOINT
+MAX_ENDPOINTS = 200
+OTHER_ENDPOINT = '<other>'
+
+
+class EndpointStats:
+    """单个路由的累计统计"""
+
+    __slots__ = ('count', 'raw_bytes', 'sent_bytes', 'max_raw_bytes', 'serialize_ms',
+                 'max_serialize_ms', 'compress_ms', 'encodings')
+
+    def __init__(self):
+        self.count = 0
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.max_raw_bytes = 0
+        self.serialize_ms = 0.0
+        self.max_serialize_ms = 0.0
+        self.compress_ms = 0.0
+        self.encodings: Dict[str, int] = {}
+
+    def record(self, raw_bytes: int, sent_bytes: int, encoding: Optional[str],
+               serialize_ms: Optional[float], compress_ms: float):
+        self.count += 1
+        self.raw_bytes += raw_bytes
+        self.sent_bytes += sent_bytes
+        self.max_raw_bytes = max(self.max_raw_bytes, raw_bytes)
+        if serialize_ms is not None:
+            self.serialize_ms += serialize_ms
+            self.max_serialize_ms = max(self.max_serialize_ms, serialize_ms)
+        self.compress_ms += compress_ms
+        key = encoding or 'identity'
+        self.encodings[key] = self.encodings.get(key, 0) + 1
+
+    def to_dict(self, endpoint: str) -> Dict:
+        count = self.count or 1
+        return {
+            'endpoint': endpoint,
+            'count': self.count,
+            'raw_bytes': self.raw_bytes,
+            'sent_bytes': self.sent_bytes,
+            'saved_bytes': self.raw_bytes - self.sent_bytes,
+            'compression_ratio': round(self.sent_bytes / self.raw_bytes, 4) if self.raw_bytes else 1.0,
+            'avg_raw_bytes': round(self.raw_bytes / count),
+            'avg_sent_bytes': round(self.sent_bytes / count),
+            'max_raw_bytes': self.max_raw_bytes,
+            'avg_serialize_ms': round(self.serialize_ms / count, 3),
+            'max_serialize_ms': round(self.max_serialize_ms, 3),
+            'avg_compress_ms': round(self.compress_ms / count, 3),
+            'encodings': dict(self.encodings),
+        }
+
+
+class ResponseMetrics:
+    """各路由响应体统计（线程安全）"""
+
+    ORDER_FIELDS = ('raw_bytes', 'sent_bytes', 'saved_bytes', 'count', 'avg_serialize_ms', 'avg_raw_bytes')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, raw_bytes: int, sent_bytes: int, encoding: Optional[str] = None,
+               serialize_ms: Optional[float] = None, compress_ms: float = 0.0):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                if len(self._endpoints) >= MAX_ENDPOINTS:
+                    endpoint = OTHER_ENDPOINT
+                stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.record(raw_bytes, sent_bytes, encoding, serialize_ms, compress_ms)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def report(self, limit: int = 20, order_by: str = 'raw_bytes') -> Dict:
+        """按指标排序的路由统计与总计"""
+        if order_by not in self.ORDER_FIELDS:
+            raise ValueError(f"order_by 只能是: {', '.join(self.ORDER_FIELDS)}")
+        with self._lock:
+            rows = [stats.to_dict(endpoint) for endpoint, stats in self._endpoints.items()]
+
+        raw_total = sum(row['raw_bytes'] for row in rows)
+        sent_total = sum(row['sent_bytes'] for row in rows)
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return {
+            'total': {
+                'requests': sum(row['count'] for row in rows),
+                'raw_bytes': raw_total,
+                'sent_bytes': sent_total,
+                'saved_bytes': raw_total - sent_total,
+                'compression_ratio': round(sent_total / raw_total, 4) if raw_total else 1.0,
+            },
+            'endpoints': rows[:limit],
+        }
+
+
+response_metrics = ResponseMetrics()
@@ -0,0 +1,138 @@
+"""
+静态资源发布
+构建阶段（scripts/build_static.py）：
+    static/ 下的资源复制为带内容哈希的文件名（static/dist/css/admin.3f2a1b9c.css），
+    可压缩类型预先生成 .gz / .br，并写出 static/dist/manifest.json
+运行阶段（Flask 与 FastAPI 共用）：
+    - asset_url() 把模板中的资源路径映射为带哈希的URL
+    - 带哈希的资源与按内容哈希命名的头像永不变化，返回 immutable 长缓存
+    - 其他静态文件短缓存 + ETag/Last-Modified 条件请求
+    - 按 Accept-Encoding 选择预压缩文件（br 优先于 gzip）
+"""
+
+import json
+import mimetypes
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+project_root = Path(__file__).parent.parent.parent
+
+STATIC_DIR = project_root / "static"
+DIST_DIRNAME = "dist"
+DIST_DIR = STATIC_DIR / DIST_DIRNAME
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+STATIC_URL_PREFIX = "/static"
+
+# 预压缩的文件类型
+COMPRESSIBLE_SUFFIXES = {'.css', '.js', '.json', '.svg', '.html', '.txt', '.map', '.xml', '.csv', '.geojson'}
+
+# 预压缩文件后缀与Content-Encoding（按优先级）
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+HTML_CACHE_CONTROL = "no-cache"
+
+# 内容寻址的文件名：<sha256>.<ext> / <sha256>_thumb.<ext>
+_CONTENT_ADDRESSED = re.compile(r'(^|/)avatars/[0-9a-f]{64}(_thumb)?\.[a-z0-9]+$')
+
+_manifest: Optional[Dict] = None
+_manifest_mtime: Optional[float] = None
+_manifest_lock = threading.Lock()
+
+
+def load_manifest() -> Dict:
+    """读取构建清单（文件更新后自动重新加载；未构建时为空）"""
+    global _manifest, _manifest_mtime
+    try:
+        mtime = MANIFEST_PATH.stat().st_mtime
+    except OSError:
+        return {}
+
+    with _manifest_lock:
+        if _manifest is None or mtime != _manifest_mtime:
+            try:
+                with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                    _manifest = json.load(f).get('assets', {})
+                _manifest_mtime = mtime
+            except (OSError, ValueError) as e:
+                print(f"[WARN] 静态资源清单读取失败: {e}")
+                _manifest = {}
+        return _manifest
+
+
+def asset_url(path: str) -> str:
+    """
+    资源路径 -> URL（模板中使用）
+
+    已构建时返回带内容哈希的URL，否则返回原始路径
+    """
+    path = path.lstrip('/')
+    if path.startswith('static/'):
+        path = path[len('static/'):]
+    entry = load_manifest().get(path)
+    if entry:
+        return f"{STATIC_URL_PREFIX}/{DIST_DIRNAME}/{entry['file']}"
+    return f"{STATIC_URL_PREFIX}/{path}"
+
+
+def is_immutable(path: str) -> bool:
+    """带内容哈希（构建产物或内容寻址头像）的文件可永久缓存"""
+    path = path.lstrip('/')
+    return path.startswith(f"{DIST_DIRNAME}/") or bool(_CONTENT_ADDRESSED.search(path))
+
+
+def cache_control_for(path: str) -> str:
+    return IMMUTABLE_CACHE_CONTROL if is_immutable(path) else DEFAULT_CACHE_CONTROL
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """解析Accept-Encoding（忽略q=0）"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(token)
+    return accepted
+
+
+def select_precompressed(path: Path, accept_encoding: Optional[str]) -> Tuple[Path, Optional[str]]:
+    """
+    选择要发送的文件：客户端接受且存在预压缩版本时返回压缩文件
+
+    比源文件旧的预压缩文件（源文件修改后未重新构建）不使用，避免不同编码的客户端拿到不同内容
+
+    Returns:
+        (实际文件路径, Content-Encoding 或 None)
+    """
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+        return path, None
+    accepted = accepted_encodings(accept_encoding)
+    source_mtime = None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            candidate = path.with_name(path.name + suffix)
+            try:
+                candidate_mtime = candidate.stat().st_mtime
+                if source_mtime is None:
+                    source_mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if candidate.is_file() and candidate_mtime >= source_mtime:
+                return candidate, encoding
+    return path, None
+
+
+def guess_content_type(path: Path, charset: bool = True) -> str:
+    """按原文件名（而不是 .gz/.br）确定Content-Type"""
+    content_type, _ = mimetypes.guess_type(path.name)
+    content_type = content_type or 'application/octet-stream'
+    if charset and (content_type.startswith('text/') or content_type in ('application/javascript', 'application/json')):
+        content_type += '; charset=utf-8'
+    return content_type
@@ -0,0 +1,118 @@
+"""
+系统统计（/stats/summary）
+在数据库端用 COUNT / GROUP BY 汇总，结果放在短TTL的进程内缓存中，
+并由后台任务定时刷新，仪表盘频繁轮询时几乎不产生数据库开销。
+
+写入（新增预测、训练记录）时不主动清除缓存：统计最多滞后 STATS_REFRESH_INTERVAL 秒，
+关闭后台刷新（STATS_REFRESH_INTERVAL=0）时最多滞后 STATS_CACHE_TTL 秒。
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import func
+
+from src.models_db.prediction import Prediction
+from src.models_db.training import TrainingRecord
+from src.utils.cache import TTLCache
+from src.utils.db_utils import get_session
+
+# 拥堵状态（与predictions.congestion_prediction枚举一致）
+CONGESTION_LEVELS = ('畅通', '正常', '拥堵', '严重拥堵')
+
+# 缓存有效期与后台刷新间隔（秒）
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '30'))
+STATS_REFRESH_INTERVAL = float(os.getenv('STATS_REFRESH_INTERVAL', '20'))
+
+_STATS_KEY = 'system_stats'
+_stats_cache = TTLCache(maxsize=1, ttl=STATS_CACHE_TTL)
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def compute_system_stats() -> Dict:
+    """
+    在数据库端汇总系统统计
+
+    Returns:
+        {'total_predictions', 'total_training_runs', 'congestion_distribution'}
+    """
+    session = get_session()
+    try:
+        return query_system_stats(session)
+    finally:
+        session.close()
+
+
+def query_system_stats(session) -> Dict:
+    """compute_system_stats 的核心查询（接收会话，供异步层复用）"""
+    distribution = dict.fromkeys(CONGESTION_LEVELS, 0)
+    rows = (
+        session.query(Prediction.congestion_prediction, func.count())
+        .group_by(Prediction.congestion_prediction)
+        .all()
+    )
+    total_predictions = 0
+    for level, count in rows:
+        total_predictions += count
+        if level in distribution:
+            distribution[level] += count
+
+    total_training_runs = session.query(func.count(TrainingRecord.id)).scalar() or 0
+
+    return {
+        'total_predictions': total_predictions,
+        'total_training_runs': total_training_runs,
+        'congestion_distribution': distribution,
+    }
+
+
+def get_system_stats() -> Dict:
+    """获取系统统计（优先读缓存，过期时重新汇总）"""
+    stats = _stats_cache.get(_STATS_KEY)
+    if stats is None:
+        stats = compute_system_stats()
+        _stats_cache.set(_STATS_KEY, stats)
+    return stats
+
+
+async def get_system_stats_async() -> Dict:
+    """获取系统统计（异步版本，缓存未命中时通过异步引擎查询）"""
+    stats = _stats_cache.get(_STATS_KEY)
+    if stats is None:
+        from src.utils.async_db import get_async_db_manager
+        stats = await get_async_db_manager().get_system_stats()
+        _stats_cache.set(_STATS_KEY, stats)
+    return stats
+
+
+async def _refresh_loop(interval: float):
+    """后台定时刷新统计缓存（通过异步引擎查询，不占用事件循环）"""
+    from src.utils.async_db import get_async_db_manager
+    while True:
+        try:
+            stats = await get_async_db_manager().get_system_stats()
+            _stats_cache.set(_STATS_KEY, stats)
+        except Exception as e:
+            print(f"[WARN] 刷新系统统计失败: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_stats_refresher(interval: float = STATS_REFRESH_INTERVAL):
+    """在当前事件循环中启动后台刷新任务（interval<=0时不启动）"""
+    global _refresh_task
+    if interval <= 0 or (_refresh_task is not None and not _refresh_task.done()):
+        return
+    _refresh_task = asyncio.get_running_loop().create_task(_refresh_loop(interval))
+
+
+async def stop_stats_refresher():
+    """停止后台刷新任务"""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
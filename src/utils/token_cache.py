@@ -0,0 +1,75 @@
+"""
+已验证令牌缓存
+按令牌的SHA-256摘要缓存解码后的payload，缓存条目随令牌一起过期
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.utils.auth import decode_access_token
+from src.utils.cache import TTLCache
+
+# 缓存条目的最长有效期（秒），令牌剩余有效期更短时以令牌为准
+TOKEN_CACHE_MAX_TTL = float(os.getenv('AUTH_TOKEN_CACHE_TTL', '3600'))
+
+_token_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000')),
+    ttl=TOKEN_CACHE_MAX_TTL
+)
+
+
+def _token_key(token: str) -> str:
+    """缓存键使用令牌摘要，不在内存中保存令牌原文"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _remaining_seconds(payload: Dict) -> float:
+    """令牌剩余有效期（秒）；没有exp字段时使用最长有效期"""
+    exp = payload.get('exp')
+    if exp is None:
+        return TOKEN_CACHE_MAX_TTL
+    if isinstance(exp, datetime):
+        exp = exp.timestamp()
+    return float(exp) - time.time()
+
+
+def verify_token(token: str) -> Optional[Dict]:
+    """
+    验证令牌并返回payload（优先读缓存）
+
+    Args:
+        token: JWT令牌
+
+    Returns:
+        payload字典，令牌无效或已过期时返回None
+    """
+    if not token:
+        return None
+
+    key = _token_key(token)
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if not payload:
+        return None
+
+    ttl = min(_remaining_seconds(payload), TOKEN_CACHE_MAX_TTL)
+    if ttl > 0:
+        _token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def invalidate_token(token: str):
+    """使缓存中的令牌失效（如登出）"""
+    if token:
+        _token_cache.pop(_token_key(token))
+
+
+def token_cache_info() -> Dict:
+    """缓存命中统计"""
+    return _token_cache.info()
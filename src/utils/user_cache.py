@@ -0,0 +1,72 @@
+"""
+用户资料缓存
+缓存用户资料快照（User.to_dict()，不含敏感字段），
+认证和预测等高频接口读取快照，避免每次请求都查询users表。
+修改用户数据的接口在提交后调用invalidate_user。
+"""
+
+import os
+from typing import Dict, Optional
+
+from src.models_db.user import User
+from src.utils.cache import TTLCache
+from src.utils.db_utils import get_session
+
+_profile_cache = TTLCache(
+    maxsize=int(os.getenv('USER_PROFILE_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('USER_PROFILE_CACHE_TTL', '300'))
+)
+
+
+def get_user_profile(user_id: int) -> Optional[Dict]:
+    """
+    获取用户资料快照（优先读缓存）
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        User.to_dict()快照（调用方不要原地修改），用户不存在时返回None
+    """
+    profile = _profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    session = get_session()
+    try:
+        user = session.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        profile = user.to_dict()
+    finally:
+        session.close()
+
+    _profile_cache.set(user_id, profile)
+    return profile
+
+
+async def get_user_profile_async(user_id: int) -> Optional[Dict]:
+    """获取用户资料快照（异步版本，缓存未命中时通过异步引擎查询）"""
+    profile = _profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    from src.utils.async_db import get_async_session
+    async with get_async_session() as session:
+        user = await session.get(User, user_id)
+        if user is None:
+            return None
+        profile = user.to_dict()
+
+    _profile_cache.set(user_id, profile)
+    return profile
+
+
+def invalidate_user(user_id: int):
+    """用户资料变更后清除缓存"""
+    _profile_cache.pop(user_id)
+
+
+def user_cache_info() -> Dict:
+    """缓存命中统计"""
+    return _profile_cache.info()
@@ -0,0 +1,7 @@
+"""pytest 配置：把项目根目录加入导入路径"""
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
@@ -0,0 +1,90 @@
+"""城市预测引擎（src/prediction/city_engine.py）测试"""
+import asyncio
+
+from src.prediction.city_engine import (
+    CityPredictionEngine,
+    city_monitor_names,
+    decode_artifacts,
+    encode_artifacts,
+    make_seed,
+)
+
+KEY = ('北京', '2026-01-05', '早高峰(7:00-9:00)', '小雨', '商务区', None)
+
+
+def test_same_input_same_result():
+    """结果只由输入决定：不同引擎实例、清空缓存后结果都相同"""
+    first = CityPredictionEngine().predict(*KEY)
+    engine = CityPredictionEngine()
+    assert engine.predict(*KEY) == first
+    engine.cache_clear()
+    assert engine.predict(*KEY) == first
+
+
+def test_different_input_different_seed():
+    other = ('北京', '2026-01-06') + KEY[2:]
+    assert make_seed(*KEY) != make_seed(*other)
+    assert CityPredictionEngine().predict(*KEY) != CityPredictionEngine().predict(*other)
+
+
+def test_result_ranges():
+    result = CityPredictionEngine().predict(*KEY)
+    assert 500 <= result['flow_per_hour'] <= 15000
+    assert 18.0 <= result['avg_speed'] <= 70.0
+    assert 0.05 <= result['congestion_index'] <= 0.95
+    assert 0.82 <= result['confidence'] <= 0.92
+    assert all(800 <= item['value'] <= 15000 for item in result['province_flows'])
+    assert [item['name'] for item in result['all_monitors']] == list(city_monitor_names('北京'))
+
+
+def test_unknown_city_uses_default_monitors():
+    result = CityPredictionEngine().predict('拉萨', '2026-01-05', '平峰', '晴')
+    assert all(item['name'].startswith('拉萨·') for item in result['all_monitors'])
+
+
+def test_cache_hits_and_eviction():
+    engine = CityPredictionEngine(cache_size=2)
+    engine.predict(*KEY)
+    engine.predict(*KEY)
+    assert engine.cache_info() == {'hits': 1, 'misses': 1, 'maxsize': 2, 'currsize': 1}
+
+    for day in ('2026-02-01', '2026-02-02'):
+        engine.predict('上海', day, '平峰', '晴')
+    assert engine.cache_info()['currsize'] == 2
+
+
+def test_artifacts_round_trip():
+    result = CityPredictionEngine().predict(*KEY)
+    decoded = decode_artifacts(encode_artifacts(result))
+    assert decoded == {key: result[key] for key in ('province_flows', 'monitors', 'all_monitors')}
+
+
+def test_simulate_latency_disabled_by_default():
+    asyncio.run(asyncio.wait_for(CityPredictionEngine().simulate_latency(), timeout=0.5))
+
+
+BATCH = [
+    KEY,
+    ('上海', '2026-01-05', '晚高峰(17:00-19:00)', '晴', '主城区', None),
+    ('广州', '2026-01-05', '夜间', '大雨', None, '演唱会'),
+    ('拉萨', '2026-01-05', '平峰', '沙尘暴', '景区', None),
+    KEY,
+]
+
+
+def test_batch_matches_single():
+    """批量预测与逐条预测结果完全一致（不经过缓存）"""
+    batch = CityPredictionEngine(cache_size=0).predict_batch(BATCH)
+    singles = [CityPredictionEngine(cache_size=0).predict(*key) for key in BATCH]
+    assert batch == singles
+
+
+def test_batch_with_partial_cache_hits():
+    """部分条目已缓存时，批量结果与全量计算一致且顺序对应输入"""
+    expected = CityPredictionEngine(cache_size=0).predict_batch(BATCH)
+
+    engine = CityPredictionEngine()
+    engine.predict(*BATCH[2])
+    assert engine.predict_batch(BATCH) == expected
+    # 重复的输入只计算一次
+    assert engine.cache_info()['misses'] == len(set(BATCH))
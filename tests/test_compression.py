@@ -0,0 +1,133 @@
+"""响应压缩中间件（src/api/compression.py）测试"""
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import src.api.compression as compression
+from src.api.compression import CompressionMiddleware, negotiate_encoding
+from src.api.responses import FastJSONResponse
+from src.utils.response_metrics import response_metrics
+
+LARGE_PAYLOAD = {'records': [{'id': i, 'flow': 100.5 + i, 'status': '畅通'} for i in range(300)]}
+LARGE_BODY = json.dumps(LARGE_PAYLOAD, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+async def large_json(request):
+    return FastJSONResponse(LARGE_PAYLOAD)
+
+
+async def small_text(request):
+    return PlainTextResponse('ok')
+
+
+async def image(request):
+    return Response(b'\x89PNG' + b'\x00' * 4096, media_type='image/png')
+
+
+async def precompressed(request):
+    return Response(gzip.compress(LARGE_BODY), media_type='application/json',
+                    headers={'Content-Encoding': 'gzip'})
+
+
+async def streaming(request):
+    async def chunks():
+        for _ in range(4):
+            yield b'x' * 2048
+    return StreamingResponse(chunks(), media_type='text/plain')
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[
+        Route('/large', large_json),
+        Route('/small', small_text),
+        Route('/image', image),
+        Route('/precompressed', precompressed),
+        Route('/stream', streaming),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    response_metrics.reset()
+    with TestClient(app) as client:
+        yield client
+    response_metrics.reset()
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('GZIP', 'gzip'),
+    ('*', 'br'),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert negotiate_encoding('br, gzip') == 'gzip'
+    assert negotiate_encoding('br') is None
+
+
+def endpoint_stats(name):
+    rows = {row['endpoint']: row for row in response_metrics.report(limit=100)['endpoints']}
+    return rows[name]
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_large_response_compressed(client, encoding):
+    response = client.get('/large', headers={'Accept-Encoding': encoding})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['vary']
+    assert response.json() == LARGE_PAYLOAD
+
+    stats = endpoint_stats('GET /large')
+    assert stats['raw_bytes'] == len(LARGE_BODY)
+    assert stats['sent_bytes'] < stats['raw_bytes']
+    assert stats['encodings'] == {encoding: 1}
+
+
+def test_identity_when_not_accepted(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['vary']
+    assert response.content == LARGE_BODY
+    assert endpoint_stats('GET /large')['encodings'] == {'identity': 1}
+
+
+def test_small_response_not_compressed(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert 'vary' not in response.headers
+    assert response.text == 'ok'
+
+
+def test_excluded_content_type(client):
+    response = client.get('/image', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert len(response.content) == 4100
+
+
+def test_existing_encoding_passthrough(client):
+    response = client.get('/precompressed', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.json() == LARGE_PAYLOAD
+    stats = endpoint_stats('GET /precompressed')
+    assert stats['raw_bytes'] == stats['sent_bytes']
+
+
+def test_streaming_not_compressed(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert response.content == b'x' * 8192
+    assert endpoint_stats('GET /stream')['sent_bytes'] == 8192
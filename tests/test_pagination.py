@@ -0,0 +1,132 @@
+"""游标分页（src/utils/pagination.py）测试"""
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from src.utils.pagination import (
+    MAX_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    keyset_paginate,
+)
+
+Base = declarative_base()
+
+
+class Record(Base):
+    __tablename__ = 'records'
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+T0 = datetime(2026, 1, 1, 8, 0, 0)
+
+
+@pytest.fixture
+def session():
+    """内存SQLite：10条记录，其中多条共享同一创建时间"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    offsets = [0, 0, 0, 1, 2, 2, 3, 3, 3, 4]
+    with Session(engine) as session:
+        session.add_all(
+            Record(id=i + 1, created_at=T0 + timedelta(minutes=offset))
+            for i, offset in enumerate(offsets)
+        )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def expected_order(session):
+    return [
+        row.id for row in
+        session.query(Record).order_by(Record.created_at.desc(), Record.id.desc()).all()
+    ]
+
+
+def collect_pages(session, limit):
+    """按next_cursor翻完所有页，返回每页的ID列表"""
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, limit, cursor)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 5, 14, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor!',
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b'["2026-01-01T00:00:00"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", 1]').decode(),
+    base64.urlsafe_b64encode(b'["2026-01-01T00:00:00", "x"]').decode(),
+    '',
+])
+def test_decode_malformed_cursor(cursor):
+    """无效游标统一抛出ValueError（路由转换为400）"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(0) == 1
+    assert clamp_page_size(-5) == 1
+    assert clamp_page_size(20) == 20
+    assert clamp_page_size(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 9])
+def test_pages_cover_all_rows_once(session, limit):
+    """相同创建时间按ID倒序打破平局：逐页翻完不重复、不遗漏"""
+    pages = collect_pages(session, limit)
+    ids = [record_id for page in pages for record_id in page]
+    assert ids == expected_order(session)
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 1 <= len(pages[-1]) <= limit
+
+
+def test_cursor_inside_timestamp_tie(session):
+    """游标落在同一时间的多条记录中间时，下一页从剩余的同时间记录继续"""
+    rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, 2, None)
+    assert [row.id for row in rows] == [10, 9]
+    rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, 2, cursor)
+    assert [row.id for row in rows] == [8, 7]
+    assert decode_cursor(cursor) == (T0 + timedelta(minutes=3), 7)
+
+
+def test_has_more_uses_limit_plus_one(session):
+    """记录数恰好等于页大小时不返回游标，多一条时才返回"""
+    rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, 10, None)
+    assert len(rows) == 10 and cursor is None
+
+    rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, 9, None)
+    assert len(rows) == 9 and cursor is not None
+    rows, cursor = keyset_paginate(session.query(Record), Record.created_at, Record.id, 9, cursor)
+    assert [row.id for row in rows] == [1] and cursor is None
+
+
+def test_respects_existing_filters(session):
+    query = session.query(Record).filter(Record.id % 2 == 0)
+    rows, cursor = keyset_paginate(query, Record.created_at, Record.id, 3, None)
+    assert [row.id for row in rows] == [10, 8, 6]
+    rows, cursor = keyset_paginate(query, Record.created_at, Record.id, 3, cursor)
+    assert [row.id for row in rows] == [4, 2] and cursor is None
+
+
+def test_malformed_cursor_rejected_before_query(session):
+    with pytest.raises(ValueError):
+        keyset_paginate(session.query(Record), Record.created_at, Record.id, 5, 'garbage')
@@ -0,0 +1,112 @@
+"""逐传感器归一化器（src/data/scaler.py）测试"""
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+from src.data.scaler import SensorScaler, load_scalers, save_scalers
+
+SKLEARN_SCALERS = {
+    'minmax': lambda: MinMaxScaler(feature_range=(0, 1)),
+    'standard': StandardScaler,
+    'robust': RobustScaler,
+}
+
+
+@pytest.fixture
+def data():
+    """(timesteps, sensors) 的 float32 数据，各传感器量纲不同"""
+    rng = np.random.default_rng(0)
+    values = rng.normal(loc=[100.0, 60.0, 0.3, 5.0], scale=[30.0, 8.0, 0.1, 2.0], size=(500, 4))
+    return values.astype(np.float32)
+
+
+@pytest.mark.parametrize('method', sorted(SKLEARN_SCALERS))
+def test_matches_sklearn(data, method):
+    """fit/transform/inverse_transform 与sklearn逐列归一化一致（float32精度）"""
+    reference = SKLEARN_SCALERS[method]().fit(data)
+    scaler = SensorScaler(method).fit(data)
+
+    transformed = scaler.transform(data)
+    np.testing.assert_allclose(transformed, reference.transform(data), rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(
+        scaler.inverse_transform(transformed),
+        reference.inverse_transform(reference.transform(data)),
+        rtol=1e-5, atol=1e-4
+    )
+    np.testing.assert_allclose(scaler.inverse_transform(transformed), data, rtol=1e-5, atol=1e-4)
+
+
+def test_minmax_feature_range(data):
+    reference = MinMaxScaler(feature_range=(-1, 1)).fit(data)
+    scaler = SensorScaler('minmax', feature_range=(-1, 1)).fit(data)
+    np.testing.assert_allclose(scaler.transform(data), reference.transform(data), rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize('method', sorted(SKLEARN_SCALERS))
+def test_constant_sensor(data, method):
+    """尺度为0的传感器按1处理：结果有限、与sklearn一致且可还原"""
+    data = data.copy()
+    data[:, 2] = 7.0
+    scaler = SensorScaler(method).fit(data)
+    reference = SKLEARN_SCALERS[method]().fit(data)
+
+    assert scaler.scale[2] == 1.0
+    transformed = scaler.transform(data)
+    assert np.isfinite(transformed).all()
+    np.testing.assert_allclose(transformed, reference.transform(data), rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(scaler.inverse_transform(transformed)[:, 2], 7.0)
+
+
+def test_sensor_subset(data):
+    """sensors= 只变换部分传感器时，结果等于完整变换的对应列"""
+    scaler = SensorScaler('standard').fit(data)
+    sensors = [3, 1]
+    full = scaler.transform(data)
+
+    subset = scaler.transform(data[:, sensors], sensors=sensors)
+    np.testing.assert_allclose(subset, full[:, sensors], rtol=1e-6)
+    np.testing.assert_allclose(
+        scaler.inverse_transform(subset, sensors=sensors), data[:, sensors], rtol=1e-5, atol=1e-4
+    )
+
+    # 单个传感器的一维序列
+    single = scaler.transform(data[:, 1], sensors=1)
+    np.testing.assert_allclose(single, full[:, 1], rtol=1e-6)
+
+
+def test_ignores_nan(data):
+    data = data.copy()
+    data[::7, 0] = np.nan
+    scaler = SensorScaler('minmax').fit(data)
+    assert np.isfinite(scaler.center).all() and np.isfinite(scaler.scale).all()
+    assert scaler.center[0] == np.nanmin(data[:, 0])
+
+
+def test_save_load_round_trip(tmp_path, data):
+    """save_scalers/load_scalers 保留方法、区间和参数，路径不追加 .npz 后缀"""
+    scalers = {
+        'flow': SensorScaler('minmax', feature_range=(-1, 1)).fit(data),
+        'speed': SensorScaler('robust').fit(data * 2),
+    }
+    path = tmp_path / 'scaler.bin'
+    save_scalers(path, scalers)
+    assert path.exists()
+
+    loaded = load_scalers(path)
+    assert list(loaded) == ['flow', 'speed']
+    for name, scaler in scalers.items():
+        restored = loaded[name]
+        assert restored.method == scaler.method
+        assert restored.feature_range == scaler.feature_range
+        np.testing.assert_array_equal(restored.center, scaler.center)
+        np.testing.assert_array_equal(restored.scale, scaler.scale)
+        np.testing.assert_array_equal(restored.transform(data), scaler.transform(data))
+
+
+def test_errors(data):
+    with pytest.raises(ValueError):
+        SensorScaler('log')
+    with pytest.raises(ValueError):
+        SensorScaler().transform(data)
+    with pytest.raises(ValueError):
+        SensorScaler().to_arrays()
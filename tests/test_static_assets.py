@@ -0,0 +1,128 @@
+"""静态资源发布（src/utils/static_assets.py）测试"""
+import json
+import os
+
+import pytest
+
+import src.utils.static_assets as static_assets
+from src.utils.static_assets import (
+    DEFAULT_CACHE_CONTROL,
+    IMMUTABLE_CACHE_CONTROL,
+    accepted_encodings,
+    asset_url,
+    cache_control_for,
+    guess_content_type,
+    select_precompressed,
+)
+
+AVATAR_HASH = 'a' * 64
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    """指向临时目录的构建清单"""
+    path = tmp_path / 'manifest.json'
+    monkeypatch.setattr(static_assets, 'MANIFEST_PATH', path)
+    monkeypatch.setattr(static_assets, '_manifest', None)
+    monkeypatch.setattr(static_assets, '_manifest_mtime', None)
+    return path
+
+
+@pytest.fixture
+def asset(tmp_path):
+    """源文件与 .gz/.br 预压缩版本（预压缩文件比源文件新）"""
+    source = tmp_path / 'app.3f2a1b9c.js'
+    source.write_text('console.log(1);')
+    for suffix in ('.gz', '.br'):
+        variant = tmp_path / (source.name + suffix)
+        variant.write_bytes(b'compressed')
+        os.utime(variant, (source.stat().st_mtime + 10,) * 2)
+    return source
+
+
+def test_accepted_encodings():
+    assert accepted_encodings(None) == set()
+    assert accepted_encodings('gzip, BR;q=0.5, deflate;q=0') == {'gzip', 'br'}
+    assert accepted_encodings('br; q=0, *') == {'*'}
+
+
+def test_asset_url_without_build(manifest):
+    assert asset_url('css/admin.css') == '/static/css/admin.css'
+    assert asset_url('/static/js/app.js') == '/static/js/app.js'
+
+
+def test_asset_url_from_manifest(manifest):
+    manifest.write_text(json.dumps({'assets': {'css/admin.css': {'file': 'css/admin.3f2a1b9c.css'}}}))
+    assert asset_url('css/admin.css') == '/static/dist/css/admin.3f2a1b9c.css'
+    assert asset_url('static/css/admin.css') == '/static/dist/css/admin.3f2a1b9c.css'
+    assert asset_url('css/other.css') == '/static/css/other.css'
+
+
+def test_manifest_reloaded_when_changed(manifest):
+    manifest.write_text(json.dumps({'assets': {'app.js': {'file': 'app.1111.js'}}}))
+    assert asset_url('app.js').endswith('app.1111.js')
+    manifest.write_text(json.dumps({'assets': {'app.js': {'file': 'app.2222.js'}}}))
+    os.utime(manifest, (manifest.stat().st_mtime + 5,) * 2)
+    assert asset_url('app.js').endswith('app.2222.js')
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('dist/css/admin.3f2a1b9c.css', IMMUTABLE_CACHE_CONTROL),
+    (f'avatars/{AVATAR_HASH}.png', IMMUTABLE_CACHE_CONTROL),
+    (f'/avatars/{AVATAR_HASH}_thumb.webp', IMMUTABLE_CACHE_CONTROL),
+    ('avatars/user_1.png', DEFAULT_CACHE_CONTROL),
+    ('css/admin.css', DEFAULT_CACHE_CONTROL),
+])
+def test_cache_control_for(path, expected):
+    assert cache_control_for(path) == expected
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip, br', ('.br', 'br')),
+    ('gzip', ('.gz', 'gzip')),
+    ('br;q=0, gzip', ('.gz', 'gzip')),
+    ('*', ('.br', 'br')),
+    ('identity', ('', None)),
+    (None, ('', None)),
+])
+def test_select_precompressed(asset, accept, expected):
+    suffix, encoding = expected
+    path, chosen = select_precompressed(asset, accept)
+    assert path == asset.with_name(asset.name + suffix)
+    assert chosen == encoding
+
+
+def test_select_precompressed_missing_variant(asset):
+    asset.with_name(asset.name + '.br').unlink()
+    assert select_precompressed(asset, 'br, gzip') == (asset.with_name(asset.name + '.gz'), 'gzip')
+
+
+def test_select_precompressed_ignores_stale_variant(asset):
+    """源文件修改后未重新构建：旧的预压缩文件不使用"""
+    os.utime(asset, (asset.stat().st_mtime + 60,) * 2)
+    assert select_precompressed(asset, 'br, gzip') == (asset, None)
+
+
+def test_select_precompressed_skips_binary(tmp_path):
+    image = tmp_path / 'logo.png'
+    image.write_bytes(b'\x89PNG')
+    (tmp_path / 'logo.png.gz').write_bytes(b'compressed')
+    assert select_precompressed(image, 'gzip') == (image, None)
+
+
+@pytest.mark.parametrize('name, charset, expected', [
+    ('admin.css', True, 'text/css; charset=utf-8'),
+    ('admin.css', False, 'text/css'),
+    ('data.json', True, 'application/json; charset=utf-8'),
+    ('data.json', False, 'application/json'),
+    ('logo.png', True, 'image/png'),
+    ('unknown.zzz', True, 'application/octet-stream'),
+])
+def test_guess_content_type(tmp_path, name, charset, expected):
+    assert guess_content_type(tmp_path / name, charset=charset) == expected
+
+
+def test_guess_content_type_javascript_charset(tmp_path):
+    # mimetypes 对 .js 的结果随平台不同（application/javascript 或 text/javascript）
+    assert 'charset' in guess_content_type(tmp_path / 'app.js')
+    assert 'charset' not in guess_content_type(tmp_path / 'app.js', charset=False)
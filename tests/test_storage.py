@@ -0,0 +1,112 @@
+"""内存映射数据存储（src/data/storage.py）测试"""
+import os
+
+import numpy as np
+import pytest
+
+import src.data.storage as storage
+from src.data.storage import (
+    convert_npz,
+    ensure_converted,
+    feature_views,
+    is_current,
+    load_manifest,
+    open_memmap,
+    storage_paths,
+)
+
+
+@pytest.fixture
+def raw():
+    """(timesteps, sensors, features) 的PeMS格式数据"""
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, 500, size=(50, 6, 3))
+
+
+@pytest.fixture
+def npz_path(tmp_path, raw):
+    path = tmp_path / 'pems04.npz'
+    np.savez_compressed(path, data=raw)
+    return path
+
+
+def test_convert_layout_and_views(npz_path, raw, monkeypatch):
+    # 小分块，覆盖跨块统计
+    monkeypatch.setattr(storage, 'CONVERT_CHUNK_STEPS', 16)
+    manifest = convert_npz(npz_path)
+
+    paths = storage_paths(npz_path)
+    assert paths['data'].name == 'pems04.f32'
+    assert paths['manifest'].name == 'pems04.f32.json'
+    assert manifest['shape'] == [3, 50, 6]
+    assert manifest['features'] == ['flow', 'occupancy', 'speed']
+    assert manifest['dataset'] == 'PeMS04'
+    assert load_manifest(paths['manifest']) == manifest
+
+    array = open_memmap(paths['manifest'])
+    assert array.dtype == np.float32 and not array.flags.writeable
+    views = feature_views(array, manifest)
+    for index, name in enumerate(manifest['features']):
+        np.testing.assert_array_equal(views[name], raw[:, :, index].astype(np.float32))
+        assert views[name].flags.c_contiguous
+        stats = manifest['stats'][name]
+        values = raw[:, :, index].astype(np.float32).astype(np.float64)
+        assert stats['mean'] == pytest.approx(values.mean(), rel=1e-5)
+        assert stats['std'] == pytest.approx(values.std(), rel=1e-4)
+        assert stats['min'] == pytest.approx(values.min())
+        assert stats['max'] == pytest.approx(values.max())
+        assert stats['nan_count'] == 0
+
+
+def test_all_nan_feature(tmp_path, raw):
+    raw = raw.copy()
+    raw[:, :, 2] = np.nan
+    raw[0, 0, 0] = np.nan
+    path = tmp_path / 'pems08.npz'
+    np.savez(path, data=raw)
+
+    stats = convert_npz(path)['stats']
+    assert stats['speed'] == {'mean': 0.0, 'std': 0.0, 'min': None, 'max': None, 'nan_count': 300}
+    assert stats['flow']['nan_count'] == 1
+    assert stats['flow']['min'] is not None
+
+
+def test_two_dimensional_input(tmp_path):
+    path = tmp_path / 'flow_only.npz'
+    np.savez(path, data=np.arange(12, dtype=np.float64).reshape(4, 3))
+    manifest = convert_npz(path, features=['flow'])
+    assert manifest['shape'] == [1, 4, 3]
+
+    with pytest.raises(ValueError):
+        convert_npz(path, features=['flow', 'speed'])
+
+
+def test_is_current_and_ensure_converted(npz_path, raw):
+    assert not is_current(npz_path)
+    manifest = ensure_converted(npz_path)
+    assert is_current(npz_path)
+    assert ensure_converted(npz_path)['created_at'] == manifest['created_at']
+
+    # 源文件变化后需要重新转换
+    np.savez_compressed(npz_path, data=raw * 2)
+    stat = npz_path.stat()
+    os.utime(npz_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not is_current(npz_path)
+    ensure_converted(npz_path)
+    array = open_memmap(storage_paths(npz_path)['manifest'])
+    np.testing.assert_allclose(array[0], (raw[:, :, 0] * 2).astype(np.float32))
+
+
+def test_truncated_data_file_not_current(npz_path):
+    convert_npz(npz_path)
+    data_path = storage_paths(npz_path)['data']
+    with open(data_path, 'r+b') as f:
+        f.truncate(data_path.stat().st_size - 4)
+    assert not is_current(npz_path)
+
+
+def test_converted_without_source(npz_path):
+    """只部署了转换结果（没有NPZ）时仍视为可用"""
+    convert_npz(npz_path)
+    npz_path.unlink()
+    assert is_current(npz_path)